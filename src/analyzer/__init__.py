@@ -6,6 +6,12 @@ from .ast_transformer import tree_to_ast
 from .static_analyzer import analyze_ast_for_patterns
 from .complexity_engine import infer_complexity
 from .reporter import generate_report
+from .pipeline import run_pipeline
+from .batch import analyze_many
+from .streaming import analyze_stream
+from .session import AnalysisSession
+from .instrumentation import instrumented
+from .empirical import validate_empirically
 
 __all__ = [
     "normalize_source",
@@ -14,4 +20,10 @@ __all__ = [
     "analyze_ast_for_patterns",
     "infer_complexity",
     "generate_report",
+    "run_pipeline",
+    "analyze_many",
+    "analyze_stream",
+    "AnalysisSession",
+    "instrumented",
+    "validate_empirically",
 ]
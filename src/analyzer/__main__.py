@@ -0,0 +1,7 @@
+# src/analyzer/__main__.py
+"""python -m analyzer ... (ver analyzer.cli)."""
+import sys
+
+from .cli import main
+
+sys.exit(main())
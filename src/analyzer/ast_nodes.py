@@ -0,0 +1,211 @@
+# src/analyzer/ast_nodes.py
+"""
+Modelo compacto del AST: una clase con __slots__ por tipo de nodo y un
+NodeKind entero para despachar sin comparar cadenas.
+
+Los nodos se comportan como dicts de solo lectura (get, [], keys, items...)
+para que el código que espera el AST en forma de dict siga funcionando, y
+`to_dict()` devuelve exactamente el dict que produce ASTBuilder.
+"""
+from enum import IntEnum
+from typing import Any, Dict, Tuple
+
+
+class NodeKind(IntEnum):
+    PROGRAM = 1
+    CLASS = 2
+    PROCEDURE = 3
+    PARAM = 4
+    OBJECT_DECL = 5
+    VAR_DECL = 6
+    ARRAY_DECL = 7
+    ASSIGN = 8
+    IF = 9
+    WHILE = 10
+    REPEAT = 11
+    FOR = 12
+    RETURN = 13
+    CALL = 14
+    UNARY = 15
+    BINOP = 16
+    LVALUE = 17
+    ARRAY_ACCESS = 18
+    IDENTIFIER = 19
+    NUMBER = 20
+    LITERAL = 21
+
+
+# Campos que nunca contienen subárboles (mismo criterio que traversal.SKIP_KEYS).
+_SCALAR_FIELDS = frozenset(("name", "var", "op", "param_type", "var_type", "attributes"))
+
+
+class Node:
+    """Base de los nodos compactos. Las subclases definen `type`, `kind` y `__slots__`."""
+    __slots__ = ()
+    type: str = None
+    kind: NodeKind = None
+    # Campos en el orden en que aparecen en el dict equivalente.
+    fields: Tuple[str, ...] = ()
+    # Campos que pueden contener nodos, en orden inverso (para recorridos con pila).
+    child_fields_rev: Tuple[str, ...] = ()
+
+    def __init__(self, *args, **kwargs):
+        for name, value in zip(self.fields, args):
+            setattr(self, name, value)
+        for name in self.fields[len(args):]:
+            setattr(self, name, kwargs.get(name))
+
+    # --- Interfaz tipo dict (solo lectura) ---
+    def get(self, key: str, default: Any = None) -> Any:
+        if key == "type":
+            return self.type if self.type is not None else default
+        if key in self.fields:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "type" and self.type is not None:
+            return self.type
+        if key in self.fields:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key: str) -> bool:
+        return (key == "type" and self.type is not None) or key in self.fields
+
+    def keys(self):
+        return (["type"] if self.type is not None else []) + list(self.fields)
+
+    def values(self):
+        return [self[k] for k in self.keys()]
+
+    def items(self):
+        return [(k, self[k]) for k in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.fields) + (self.type is not None)
+
+    def __repr__(self):
+        inner = ", ".join(f"{k}={getattr(self, k)!r}" for k in self.fields)
+        return f"{self.__class__.__name__}({inner})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {} if self.type is None else {"type": self.type}
+        for name in self.fields:
+            out[name] = to_dict(getattr(self, name))
+        return out
+
+
+def to_dict(value: Any) -> Any:
+    """Convierte recursivamente nodos compactos (y listas de ellos) a dicts."""
+    if isinstance(value, Node):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [to_dict(v) for v in value]
+    return value
+
+
+def is_node(value: Any) -> bool:
+    """True para nodos del AST en cualquiera de los dos modelos (dict o compacto)."""
+    return isinstance(value, (dict, Node))
+
+
+NODE_CLASSES: Dict[str, type] = {}
+
+
+def _node_class(type_name, kind, fields):
+    cls = type(type_name, (Node,), {
+        "__slots__": fields,
+        "type": type_name,
+        "kind": kind,
+        "fields": fields,
+        "child_fields_rev": tuple(f for f in reversed(fields) if f not in _SCALAR_FIELDS),
+    })
+    NODE_CLASSES[type_name] = cls
+    return cls
+
+
+Program = _node_class("Program", NodeKind.PROGRAM, ("classes", "procedures"))
+Class = _node_class("Class", NodeKind.CLASS, ("name", "attributes"))
+Procedure = _node_class("Procedure", NodeKind.PROCEDURE, ("name", "params", "body"))
+ObjectDecl = _node_class("ObjectDecl", NodeKind.OBJECT_DECL, ("name",))
+VarDecl = _node_class("VarDecl", NodeKind.VAR_DECL, ("name", "var_type"))
+ArrayDecl = _node_class("ArrayDecl", NodeKind.ARRAY_DECL, ("name", "var_type", "size"))
+Assign = _node_class("Assign", NodeKind.ASSIGN, ("target", "value"))
+If = _node_class("If", NodeKind.IF, ("cond", "then", "else_"))
+While = _node_class("While", NodeKind.WHILE, ("cond", "body"))
+Repeat = _node_class("Repeat", NodeKind.REPEAT, ("body", "cond"))
+For = _node_class("For", NodeKind.FOR, ("var", "start", "end", "body"))
+Return = _node_class("Return", NodeKind.RETURN, ("value",))
+Call = _node_class("Call", NodeKind.CALL, ("name", "args"))
+Unary = _node_class("Unary", NodeKind.UNARY, ("op", "expr"))
+BinOp = _node_class("BinOp", NodeKind.BINOP, ("left", "op", "right"))
+LValue = _node_class("LValue", NodeKind.LVALUE, ("name",))
+ArrayAccess = _node_class("ArrayAccess", NodeKind.ARRAY_ACCESS, ("name", "index"))
+Identifier = _node_class("Identifier", NodeKind.IDENTIFIER, ("name",))
+Number = _node_class("Number", NodeKind.NUMBER, ("value",))
+Literal = _node_class("Literal", NodeKind.LITERAL, ("value",))
+
+
+class Param(Node):
+    """Parámetro de procedimiento. En el dict equivalente no lleva clave "type"."""
+    __slots__ = ("name", "param_type")
+    kind = NodeKind.PARAM
+    fields = ("name", "param_type")
+    child_fields_rev = ()
+
+
+# =============================================================================
+# Hash-consing de expresiones
+# =============================================================================
+
+# Expresiones: inmutables una vez construidas; con hash-consing, subárboles
+# iguales son el mismo objeto y llevan su hash estructural en `shash`.
+EXPR_TYPES = frozenset(("Identifier", "LValue", "Number", "Literal", "BinOp", "Unary",
+                        "ArrayAccess", "Call"))
+
+
+class SharedDict(dict):
+    """Expresión compartida en el AST de dicts (mismo contenido que el dict normal)."""
+    __slots__ = ("shash",)
+
+
+def _shared_class(base):
+    cls = type(f"Shared{base.type}", (base,), {"__slots__": ("shash",)})
+    globals()[cls.__name__] = cls  # para pickle
+    return cls
+
+
+# Variantes compactas con `shash`, por tipo.
+SHARED_CLASSES: Dict[str, type] = {t: _shared_class(NODE_CLASSES[t]) for t in sorted(EXPR_TYPES)}
+
+
+def _hash_part(value: Any) -> Any:
+    if is_node(value):
+        return structural_hash(value)
+    if isinstance(value, list):
+        return tuple(_hash_part(v) for v in value)
+    # 1, 1.0 y True son iguales para hash(): se distinguen por tipo.
+    return (type(value).__name__, value)
+
+
+def node_hash(typ: str, values) -> int:
+    """Hash estructural a partir del tipo y los valores de los campos, en orden."""
+    return hash((typ,) + tuple(_hash_part(v) for v in values))
+
+
+def structural_hash(node: Any) -> int:
+    """
+    Hash que sólo depende de la estructura (igual para dicts y nodos
+    compactos). Los nodos compartidos lo traen precalculado. Como hash(),
+    es estable sólo dentro del proceso.
+    """
+    shash = getattr(node, "shash", None)
+    if shash is not None:
+        return shash
+    if isinstance(node, Node):
+        return node_hash(node.type, [getattr(node, f) for f in node.fields])
+    return node_hash(node.get("type"), [v for k, v in node.items() if k != "type"])
@@ -1,25 +1,108 @@
 from lark import Transformer, Token
 
-
-def tree_to_ast(tree):
-    return ASTBuilder().transform(tree)
+from .ast_nodes import NODE_CLASSES, SHARED_CLASSES, Param, SharedDict, is_node, node_hash
+
+
+def tree_to_ast(tree, compact: bool = False, hashcons: bool = False):
+    """
+    Convierte el árbol de Lark en el AST.
+
+    Args:
+        compact: si True, produce nodos con __slots__ (ast_nodes) en lugar de
+                 dicts; `ast.to_dict()` devuelve el AST en forma de dict.
+        hashcons: si True, las expresiones estructuralmente iguales son el
+                 mismo objeto (ver ASTBuilder._expr).
+    """
+    builder = CompactASTBuilder(hashcons) if compact else ASTBuilder(hashcons)
+    return builder.transform(tree)
+
+
+class _Interner:
+    """
+    Tabla de hash-consing de un programa. La clave de un nodo usa la
+    identidad de sus hijos (ya compartidos), así que buscarlo es O(campos).
+    """
+
+    def __init__(self, make):
+        self.make = make
+        self.table = {}
+
+    def node(self, typ, fields):
+        key = [typ]
+        for value in fields.values():
+            if is_node(value):
+                if getattr(value, "shash", None) is None:
+                    # Hijo no compartido: el nodo tampoco se comparte.
+                    return self.make(typ, fields, node_hash(typ, fields.values()))
+                key.append(id(value))
+            elif isinstance(value, list):
+                if not all(getattr(v, "shash", None) is not None for v in value):
+                    return self.make(typ, fields, node_hash(typ, fields.values()))
+                key.append(tuple(id(v) for v in value))
+            else:
+                key.append((type(value), value))
+        key = tuple(key)
+        node = self.table.get(key)
+        if node is None:
+            node = self.table[key] = self.make(typ, fields, node_hash(typ, fields.values()))
+        return node
 
 
 class ASTBuilder(Transformer):
+    def __init__(self, hashcons: bool = False):
+        super().__init__()
+        self._interner = _Interner(self._shared) if hashcons else None
+
+    # --- FÁBRICA DE NODOS ---
+    # Todos los nodos se crean aquí; CompactASTBuilder la redefine.
+    def _node(self, typ, **fields):
+        node = {"type": typ}
+        node.update(fields)
+        return node
+
+    def _shared(self, typ, fields, shash):
+        node = SharedDict(type=typ)
+        node.update(fields)
+        node.shash = shash
+        return node
+
+    def _expr(self, typ, **fields):
+        """
+        Nodo de expresión. Con hash-consing, subárboles iguales dentro de un
+        programa son el mismo objeto (la igualdad es `is`) y llevan su hash
+        estructural en `shash`. No deben modificarse después.
+        """
+        if self._interner is None:
+            return self._node(typ, **fields)
+        return self._interner.node(typ, fields)
+
+    def reset(self):
+        """
+        Vacía la tabla de hash-consing. El builder del parser inline se
+        reutiliza entre programas: parser.py la vacía al terminar cada
+        parseo, también si falla o se recupera de errores.
+        """
+        if self._interner is not None:
+            self._interner.table.clear()
+
+    def _param(self, name, param_type):
+        return {"name": name, "param_type": param_type}
+
     # --- UTILS ---
     def _get_name(self, item):
         """Extrae el nombre limpio de un token o un diccionario Identifier"""
-        if isinstance(item, dict) and item.get("type") == "Identifier":
+        if is_node(item) and item.get("type") == "Identifier":
             return item["name"]
         return str(item)
 
+    def _is(self, item, typ):
+        return is_node(item) and item.get("type") == typ
+
     # --- ESTRUCTURA GENERAL ---
     def start(self, items):
-        classes = [x for x in items if isinstance(
-            x, dict) and x.get("type") == "Class"]
-        procs = [x for x in items if isinstance(
-            x, dict) and x.get("type") == "Procedure"]
-        return {"type": "Program", "classes": classes, "procedures": procs}
+        classes = [x for x in items if self._is(x, "Class")]
+        procs = [x for x in items if self._is(x, "Procedure")]
+        return self._node("Program", classes=classes, procedures=procs)
 
     # --- CLASES ---
     def class_decl(self, items):
@@ -28,19 +111,30 @@ class ASTBuilder(Transformer):
         for it in items:
             if name is None:
                 # Ignorar tokens de estructura, buscar el ID
-                if isinstance(it, (Token, dict)):
+                if isinstance(it, Token) or is_node(it):
                     s = self._get_name(it)
                     if s not in ("Clase", "{", "}"):
                         name = s
             if isinstance(it, list):
                 attrs = it
-        return {"type": "Class", "name": name, "attributes": attrs}
+        return self._node("Class", name=name, attributes=attrs)
 
     def attribute_list(self, items):
         return [self._get_name(it) for it in items]
 
     def object_decl(self, items):
-        return {"type": "ObjectDecl", "name": self._get_name(items[0])}
+        return self._node("ObjectDecl", name=self._get_name(items[0]))
+
+    def local_decl(self, items):
+        # items: [type_spec, ID, (tamaño)?]
+        var_type = self._get_name(items[0])
+        name = self._get_name(items[1])
+        if len(items) > 2:
+            return self._node("ArrayDecl", name=name, var_type=var_type, size=items[2])
+        return self._node("VarDecl", name=name, var_type=var_type)
+
+    def vector_decl(self, items):
+        return self._node("ArrayDecl", name=self._get_name(items[0]), var_type="any", size=items[1])
 
     # --- PROCEDIMIENTOS ---
     def procedure(self, items):
@@ -56,18 +150,20 @@ class ASTBuilder(Transformer):
                 params = it
             elif isinstance(it, dict) and it.get("type") == "Block":
                 body = it["body"]
-        return {"type": "Procedure", "name": name or "UNKNOWN", "params": params, "body": body}
+        return self._node("Procedure", name=name or "UNKNOWN", params=params, body=body)
 
     def param_list(self, items): return items
 
     def param(self, items):
         if len(items) == 2:
-            return {"name": self._get_name(items[1]), "param_type": self._get_name(items[0])}
-        return {"name": self._get_name(items[0]), "param_type": "any"}
+            return self._param(self._get_name(items[1]), self._get_name(items[0]))
+        return self._param(self._get_name(items[0]), "any")
 
     def type_spec(self, items): return self._get_name(items[0])
 
     # --- BLOQUES ---
+    # "Block" es un contenedor intermedio (siempre dict): los nodos padre
+    # extraen su "body" y nunca aparece en el AST final.
     def block(self, items):
         stmts = items[0] if items else []
         return stmts if isinstance(stmts, dict) else {"type": "Block", "body": stmts}
@@ -75,7 +171,7 @@ class ASTBuilder(Transformer):
     def stmt_list(self, items):
         stmts = []
         for x in items:
-            if isinstance(x, dict):
+            if is_node(x):
                 stmts.append(x)
             elif isinstance(x, list):
                 stmts.extend(x)
@@ -85,16 +181,17 @@ class ASTBuilder(Transformer):
 
     # --- SENTENCIAS ---
     def assign_stmt(self, items):
-        return {"type": "Assign", "target": items[0], "value": items[-1]}
+        return self._node("Assign", target=items[0], value=items[-1])
 
     def if_stmt(self, items):
-        return {"type": "If", "cond": items[0], "then": items[1]["body"], "else_": items[2]["body"] if len(items) > 2 else []}
+        return self._node("If", cond=items[0], then=items[1]["body"],
+                          else_=items[2]["body"] if len(items) > 2 else [])
 
     def while_stmt(self, items):
-        return {"type": "While", "cond": items[0], "body": items[1]["body"]}
+        return self._node("While", cond=items[0], body=items[1]["body"])
 
     def repeat_stmt(self, items):
-        return {"type": "Repeat", "body": items[0]["body"], "cond": items[1]}
+        return self._node("Repeat", body=items[0]["body"], cond=items[1])
 
     def for_stmt(self, items):
         # items: [ID, ASSIGN, start, TO, end, DO, block] (Lark puede filtrar algunos)
@@ -103,37 +200,41 @@ class ASTBuilder(Transformer):
         start = items[2]
         end = items[3]
         body = items[4]["body"]
-        return {"type": "For", "var": var_name, "start": start, "end": end, "body": body}
+        return self._node("For", var=var_name, start=start, end=end, body=body)
 
     def return_stmt(self, items):
-        return {"type": "Return", "value": items[0] if items else None}
+        return self._node("Return", value=items[0] if items else None)
 
     def call_stmt(self, items):
         # AQUÍ ESTABA EL ERROR: Usábamos str(items[0]) que podía ser un dict stringificado
         name = self._get_name(items[0])
         args = items[1] if len(items) > 1 else []
-        return {"type": "Call", "name": name, "args": args}
+        return self._node("Call", name=name, args=args)
 
     # --- EXPRESIONES ---
     def expr(self, items): return items[0]
+    def condition(self, items): return items[0]
     def logic_or(self, items): return self._binop_chain(items)
     def logic_and(self, items): return self._binop_chain(items)
     def comp(self, items): return self._binop_chain(items)
     def term(self, items): return self._binop_chain(items)
     def factor(self, items): return self._binop_chain(items)
 
+    # Operadores: reglas con '!' que conservan el token
+    def cmp_op(self, items): return str(items[0])
+    def add_op(self, items): return str(items[0])
+    def mul_op(self, items): return str(items[0])
+
     def atom(self, items): return items[0]
 
     def unary(self, items):
         if len(items) == 1:
             return items[0]
-        return {"type": "Unary", "op": self._get_name(items[0]), "expr": items[1]}
+        return self._expr("Unary", op=self._get_name(items[0]), expr=items[1])
 
-    def floor_op(self, items): return {
-        "type": "Unary", "op": "floor", "expr": items[0]}
+    def floor_op(self, items): return self._expr("Unary", op="floor", expr=items[0])
 
-    def ceil_op(self, items): return {
-        "type": "Unary", "op": "ceil", "expr": items[0]}
+    def ceil_op(self, items): return self._expr("Unary", op="ceil", expr=items[0])
 
     def _binop_chain(self, items):
         # Caso 0: Lista vacía (Defensivo)
@@ -150,38 +251,53 @@ class ASTBuilder(Transformer):
         for i in range(1, len(items) - 1, 2):
             op = str(items[i])
             right = items[i+1]
-            left = {"type": "BinOp", "left": left, "op": op, "right": right}
+            left = self._expr("BinOp", left=left, op=op, right=right)
 
         return left
 
     def lvalue(self, items):
         parts = [self._get_name(it) for it in items]
-        return {"type": "LValue", "name": ".".join(parts)}
+        return self._expr("LValue", name=".".join(parts))
 
     def array_access(self, items):
         first = items[0]
         name = self._get_name(first)
         index = items[1]
-        return {"type": "ArrayAccess", "name": name, "index": index}
+        return self._expr("ArrayAccess", name=name, index=index)
 
     def length_func(self, items):
-        return {"type": "Call", "name": "length", "args": [{"type": "Identifier", "name": self._get_name(items[0])}]}
+        return self._expr("Call", name="length",
+                          args=[self._expr("Identifier", name=self._get_name(items[0]))])
 
     def call_expr(self, items):
         # AQUÍ TAMBIÉN: Usar _get_name
         name = self._get_name(items[0])
         args = items[1] if len(items) > 1 else []
-        return {"type": "Call", "name": name, "args": args}
+        return self._expr("Call", name=name, args=args)
 
     def arg_list(self, items):
-        return [x for x in items if isinstance(x, dict)]
+        return [x for x in items if is_node(x)]
 
     # --- TOKENS ---
-    def NUMBER(self, token): return {"type": "Number", "value": float(
-        token) if '.' in token else int(token)}
-    def IDENTIFIER(self, token): return {
-        "type": "Identifier", "name": str(token)}
-
-    def null_val(self, _): return {"type": "Literal", "value": "NULL"}
-    def true_val(self, _): return {"type": "Literal", "value": True}
-    def false_val(self, _): return {"type": "Literal", "value": False}
+    def NUMBER(self, token): return self._expr("Number", value=float(
+        token) if '.' in token else int(token))
+    def IDENTIFIER(self, token): return self._expr("Identifier", name=str(token))
+
+    def null_val(self, _): return self._expr("Literal", value="NULL")
+    def true_val(self, _): return self._expr("Literal", value=True)
+    def false_val(self, _): return self._expr("Literal", value=False)
+
+
+class CompactASTBuilder(ASTBuilder):
+    """ASTBuilder que produce nodos con __slots__ (ver ast_nodes.py)."""
+
+    def _node(self, typ, **fields):
+        return NODE_CLASSES[typ](**fields)
+
+    def _shared(self, typ, fields, shash):
+        node = SHARED_CLASSES[typ](**fields)
+        node.shash = shash
+        return node
+
+    def _param(self, name, param_type):
+        return Param(name, param_type)
@@ -0,0 +1,134 @@
+# src/analyzer/batch.py
+"""
+Análisis por lotes en varios núcleos.
+
+El parser LALR se construye al importar analyzer.parser; el pool se crea
+después (con 'fork' cuando el sistema lo permite), de modo que los procesos
+hijos heredan las tablas ya compiladas por copy-on-write en lugar de
+recompilar la gramática.
+"""
+import multiprocessing
+import os
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from . import parser as _parser  # compila/carga los parsers antes del fork
+from .pipeline import analyze_source
+
+# Conexión a la ResultCache de este proceso (las conexiones SQLite no se
+# comparten entre procesos, así que cada worker abre la suya).
+_WORKER_CACHE = None
+
+
+def _init_worker():
+    # Con 'spawn' (Windows/macOS) el import reconstruye el parser una vez por worker.
+    from . import parser
+    parser.inline_parser()
+
+
+def _worker_cache(cache_path):
+    global _WORKER_CACHE
+    if cache_path is None:
+        return None
+    if _WORKER_CACHE is None or _WORKER_CACHE[0] != (os.getpid(), cache_path):
+        from .result_cache import ResultCache
+        _WORKER_CACHE = ((os.getpid(), cache_path), ResultCache(cache_path))
+    return _WORKER_CACHE[1]
+
+
+def _analyze_one(job) -> Dict[str, Any]:
+    index, source, include_ast, cache_path, recover = job
+    try:
+        result = analyze_source(source, cache=_worker_cache(cache_path),
+                                include_ast=include_ast, recover=recover)
+    except Exception as e:
+        return {
+            "index": index,
+            "ok": False,
+            "analysis": None,
+            "error": {"type": type(e).__name__, "message": str(e),
+                      "line": getattr(e, "line", None)},
+        }
+    record = {"index": index, "ok": True, "error": None}
+    record.update(result)
+    return record
+
+
+def _analyze_path(job) -> Dict[str, Any]:
+    index, path, include_ast, cache_path, recover = job
+    try:
+        with open(path, encoding="utf-8") as f:
+            source = f.read()
+    except (OSError, UnicodeDecodeError) as e:
+        record = {"index": index, "ok": False, "analysis": None,
+                  "error": {"type": type(e).__name__, "message": str(e), "line": None}}
+    else:
+        record = _analyze_one((index, source, include_ast, cache_path, recover))
+    record["path"] = path
+    return record
+
+
+def _mp_context():
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def analyze_many(sources: Iterable[str], workers: Optional[int] = None,
+                 chunksize: Optional[int] = None, include_ast: bool = False,
+                 cache_path: Optional[str] = None, recover: bool = False) -> List[Dict[str, Any]]:
+    """
+    Analiza muchas fuentes en paralelo.
+
+    Args:
+        sources: textos en pseudocódigo.
+        workers: número de procesos (None -> os.cpu_count(); 1 -> sin pool).
+        chunksize: fuentes por envío a cada worker (None -> automático).
+        include_ast: si True, cada registro incluye también el AST.
+        cache_path: archivo de ResultCache compartido por los workers (opcional).
+        recover: si True, una fuente con errores de sintaxis se analiza igual
+                 (sin las sentencias o procedimientos erróneos) y el registro
+                 lleva "diagnostics" (ver parser.parse_recovering).
+
+    Returns:
+        Un registro por fuente, en el mismo orden de entrada:
+        { "index", "ok", "analysis", "error" [, "ast"] [, "diagnostics"] }.
+        Una fuente que falla produce ok=False y error={type, message}
+        sin detener el resto del lote.
+    """
+    jobs = [(i, src, include_ast, cache_path, recover) for i, src in enumerate(sources)]
+    if not jobs:
+        return []
+
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, len(jobs))
+    if workers <= 1:
+        return [_analyze_one(job) for job in jobs]
+
+    if chunksize is None:
+        chunksize = max(1, len(jobs) // (workers * 4))
+
+    # El pipeline usa el parser inline: se construye antes del fork para compartirlo.
+    _parser.inline_parser()
+    with _mp_context().Pool(workers, initializer=_init_worker) as pool:
+        return list(pool.imap(_analyze_one, jobs, chunksize=chunksize))
+
+
+def iter_analyze_files(paths: Iterable[str], workers: Optional[int] = None,
+                       include_ast: bool = False, cache_path: Optional[str] = None,
+                       recover: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Como analyze_many, pero leyendo cada archivo en el worker y entregando
+    los registros (con "path") a medida que terminan, no en orden de entrada.
+    """
+    jobs = [(i, path, include_ast, cache_path, recover) for i, path in enumerate(paths)]
+    if not jobs:
+        return
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        for job in jobs:
+            yield _analyze_path(job)
+        return
+
+    _parser.inline_parser()
+    with _mp_context().Pool(workers, initializer=_init_worker) as pool:
+        yield from pool.imap_unordered(_analyze_path, jobs)
@@ -0,0 +1,235 @@
+# src/analyzer/call_graph.py
+"""
+Propagación de costos entre procedimientos a partir de las llamadas que ya
+registra analyze_ast_for_patterns (ctx["procedures"][p]["calls"], cada una
+con su "nesting": bucles que la rodean).
+
+Las componentes fuertemente conexas (Tarjan, iterativo) se obtienen en
+orden topológico inverso, así que cada procedimiento se evalúa una sola vez
+y después de todos sus callees. El costo de una llamada en profundidad k es
+n^k * costo(callee); el del procedimiento es el máximo entre su costo local
+y el de sus llamadas, o Theta(?) si alguna llamada es de costo
+desconocido. Omega sube igual con las llamadas que no están dentro de un
+IF. Una componente con más de un procedimiento es
+recursión mutua y se reporta como tal. Todo es lineal en procedimientos +
+aristas.
+"""
+import re
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Costo: (base exponencial o None, grado del polinomio, potencia del log).
+# El grado puede no ser entero (p. ej. n**1.585). None es costo desconocido.
+Cost = Optional[Tuple[Optional[str], float, int]]
+
+_POLY = re.compile(r"^(?:n(?:\*\*(\d+(?:\.\d+)?))?)?\s*(log(?:\^(\d+))? n)?$")
+_EXP_BASES = {"phi": 1.618}
+
+
+def parse_cost(theta: str) -> Cost:
+    """'Theta(n**2)' -> (None, 2, 0); 'Theta(phi^n)' -> ('phi^n', 0, 0); '?' -> None."""
+    if not theta or not theta.startswith("Theta(") or not theta.endswith(")"):
+        return None
+    inner = theta[6:-1].strip()
+    exp = None
+    if inner.endswith("^n"):
+        head, _, exp = inner.rpartition(" * ")
+        if not head:
+            return (exp, 0, 0)
+        inner = head
+    if inner == "1":
+        return (exp, 0, 0)
+    m = _POLY.match(inner)
+    if not m or not inner:
+        return None
+    degree = 0
+    if inner.startswith("n"):
+        degree = float(m.group(1)) if m.group(1) and "." in m.group(1) else int(m.group(1) or 1)
+    logs = int(m.group(3) or 1) if m.group(2) else 0
+    return (exp, degree, logs)
+
+
+def format_cost(cost: Cost) -> str:
+    if cost is None:
+        return "Theta(?)"
+    exp, degree, logs = cost
+    parts = []
+    if abs(degree - round(degree)) < 1e-9:
+        degree = int(round(degree))
+    else:
+        degree = round(degree, 3)
+    if degree == 1:
+        parts.append("n")
+    elif degree:
+        parts.append(f"n**{degree}")
+    if logs == 1:
+        parts.append("log n")
+    elif logs > 1:
+        parts.append(f"log^{logs} n")
+    poly = " ".join(parts) or "1"
+    if exp is None:
+        return f"Theta({poly})"
+    return f"Theta({exp})" if poly == "1" else f"Theta({poly} * {exp})"
+
+
+def _rank(cost: Cost):
+    exp, degree, logs = cost
+    base = 0.0
+    if exp is not None:
+        head = exp[:-2]
+        base = _EXP_BASES.get(head) or (float(head) if head.replace(".", "", 1).isdigit() else 2.0)
+    return (base, degree, logs)
+
+
+def times_n(cost: Cost, k: int) -> Cost:
+    if cost is None or k <= 0:
+        return cost
+    exp, degree, logs = cost
+    return (exp, degree + k, logs)
+
+
+def max_cost(a: Cost, b: Cost) -> Cost:
+    if a is None or b is None:
+        return None
+    return a if _rank(a) >= _rank(b) else b
+
+
+def build_call_graph(procedures: Dict[str, Any]) -> Dict[str, List[Tuple[str, int, bool]]]:
+    """
+    Procedimiento -> [(callee, nesting, siempre)], sólo hacia procedimientos
+    definidos. `siempre` indica que la llamada no está dentro de un IF.
+    """
+    graph = {}
+    for name, info in procedures.items():
+        graph[name] = [(c["name"], c.get("nesting", 0), not c.get("branch"))
+                       for c in info.get("calls", [])
+                       if c.get("name") in procedures and c.get("name") != name]
+    return graph
+
+
+def strongly_connected(graph: Dict[str, List[Tuple]],
+                       roots: Optional[Iterable[str]] = None) -> List[List[str]]:
+    """Tarjan iterativo. Devuelve las SCC en orden topológico inverso (callees primero)."""
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    on_stack = set()
+    stack: List[str] = []
+    sccs: List[List[str]] = []
+    counter = 0
+
+    for root in (graph if roots is None else roots):
+        if root in index:
+            continue
+        work = [(root, 0)]
+        while work:
+            node, i = work[-1]
+            if i == 0:
+                index[node] = low[node] = counter
+                counter += 1
+                stack.append(node)
+                on_stack.add(node)
+            edges = graph[node]
+            if i < len(edges):
+                work[-1] = (node, i + 1)
+                succ = edges[i][0]
+                if succ not in index:
+                    work.append((succ, 0))
+                elif succ in on_stack:
+                    low[node] = min(low[node], index[succ])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                scc = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    scc.append(member)
+                    if member == node:
+                        break
+                sccs.append(scc)
+    return sccs
+
+
+def propagate_costs(procedures: Dict[str, Any], local: Callable[[str, Cost], Dict[str, Any]],
+                    targets: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Combina el resultado local de cada procedimiento con el costo de sus
+    llamadas. `local(nombre, llamadas)` se llama una vez por procedimiento;
+    `llamadas` es el mayor costo conocido de sus llamadas (n^k * callee), o
+    None si no hay, para que un procedimiento recursivo lo sume a f(n).
+    Sólo se evalúan `targets` (por defecto todos) y lo que alcanzan.
+    """
+    graph = build_call_graph(procedures)
+    order = strongly_connected(graph, targets)
+    final: Dict[str, Dict[str, Any]] = {}
+    cost: Dict[str, Cost] = {}
+    omega: Dict[str, Cost] = {}
+
+    for scc in order:
+        members = set(scc)
+        mutual = len(scc) > 1
+        for name in scc:
+            if mutual:
+                res = dict(local(name, None))
+                others = sorted(members - {name})
+                res.update(big_o="Theta(?)", big_theta="Theta(?)", big_omega="Theta(?)",
+                           cotas_fuertes="desconocido", recurrence=None,
+                           mutual_recursion=sorted(scc))
+                res["reasoning"] = list(res.get("reasoning", [])) + [
+                    f"Recursión mutua con {', '.join(others)}: costo no resuelto."]
+                cost[name] = omega[name] = None
+                final[name] = res
+                continue
+
+            calls = None
+            for callee, nesting, _ in graph[name]:
+                site = times_n(cost[callee], nesting)
+                if site is not None:
+                    calls = site if calls is None else max_cost(calls, site)
+            res = dict(local(name, calls))
+            own = parse_cost(res.get("big_theta"))
+            total = own
+            # Mejor caso: cuentan las llamadas fuera de todo IF, salvo que un
+            # RETURN dentro de un bucle pueda cortar antes de llegar a ellas.
+            own_low = parse_cost(res.get("big_omega"))
+            low = own_low
+            count_low = not procedures[name].get("early_exits")
+            notes = []
+            unknown = False
+            for callee, nesting, always in graph[name]:
+                if always and count_low and low is not None:
+                    site_low = times_n(omega[callee], nesting)
+                    if site_low is not None and max_cost(low, site_low) != low:
+                        low = site_low
+                site = times_n(cost[callee], nesting)
+                if site is None:
+                    notes.append(f"  -> Llamada a '{callee}' de costo desconocido.")
+                    unknown = True
+                    continue
+                if total is not None and max_cost(total, site) != total:
+                    notes.append(f"  -> Llamada a '{callee}' ({format_cost(cost[callee])}) "
+                                 f"dentro de {nesting} bucle(s): {format_cost(site)}.")
+                    total = site
+            if unknown:
+                # Sin el costo del callee no hay cota superior; Omega local sigue valiendo.
+                total = None
+                res.update(big_o="Theta(?)", big_theta="Theta(?)", cotas_fuertes="desconocido")
+            elif total != own and own is not None and total is not None:
+                theta = format_cost(total)
+                res.update(big_o=theta, big_theta=theta,
+                           cotas_fuertes=f"c1*g(n) <= T(n) <= c2*g(n), g(n) = {theta[6:-1]}")
+                if res.get("recurrence"):
+                    # Sólo pasa con callees exponenciales, que no entran en f(n).
+                    notes.append("  -> Cota inferior: el costo de las llamadas no se integra en la recurrencia.")
+            if low != own_low:
+                res["big_omega"] = format_cost(low)
+                notes.append(f"  -> Las llamadas se ejecutan en todo camino: Omega = {res['big_omega']}.")
+            if notes:
+                res["reasoning"] = list(res.get("reasoning", [])) + \
+                    ["Costo de llamadas (grafo de llamadas):"] + notes
+            cost[name] = total
+            omega[name] = parse_cost(res.get("big_omega"))
+            final[name] = res
+    return final
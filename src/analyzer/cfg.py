@@ -0,0 +1,328 @@
+# src/analyzer/cfg.py
+"""
+Grafo de flujo de control (CFG) de un procedimiento.
+
+Se construye una vez por procedimiento y lo leen el análisis de bucles, las
+métricas (complejidad ciclomática, salidas tempranas) y TraceGenerator. El
+contexto de static_analyzer lo guarda fuera de sus datos
+(PatternContext.cfg), así que vive lo que ese contexto.
+
+Representación con arreglos paralelos indexados por bloque b:
+    kind[b]   "entry" | "exit" | "block" | "cond" | "loop" | "until"
+    stmts[b]  sentencias simples del bloque, en orden (Assign, Call, Return...)
+    node[b]   If / For / While / Repeat que controla el bloque (cond, loop, until)
+    succ[b]   sucesores; label[b][i] es la etiqueta de la arista succ[b][i]
+    pred[b]   predecesores
+    depth[b]  bucles que encierran el bloque (la cabecera cuenta como dentro)
+    head[b]   cabecera del bucle más interno que lo encierra, o -1
+    end[b]    en cond y loop, fin (exclusivo) de su región: los bloques de
+              un IF o de un bucle son el rango contiguo [b, end[b]); -1 en el resto
+
+El bloque 0 es la entrada y el 1 la salida; RETURN salta a la salida.
+FOR/WHILE tienen una cabecera "loop" (Do/Done, True/False); REPEAT una
+cabecera "loop" vacía y la condición "until" (F vuelve, T sale). Los
+bloques "block" vacíos son uniones o inicios de rama.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from .ast_nodes import is_node
+
+ENTRY, EXIT = 0, 1
+
+# Etiquetas (entrada al cuerpo, vuelta a la cabecera, salida) por tipo de bucle.
+LOOP_LABELS = {"For": ("Do", "Next", "Done"), "While": ("True", "Loop", "False")}
+
+
+class CFG:
+    def __init__(self, proc: Dict[str, Any]):
+        self.proc = proc
+        self.name = proc.get("name")
+        self.kind: List[str] = []
+        self.stmts: List[List[Any]] = []
+        self.node: List[Any] = []
+        self.succ: List[List[int]] = []
+        self.label: List[List[str]] = []
+        self.pred: List[List[int]] = []
+        self.depth: List[int] = []
+        self.head: List[int] = []
+        self.end: List[int] = []
+        self._rpo: Optional[List[int]] = None
+        self._idom: Optional[List[int]] = None
+        self._dom_range: Optional[Tuple[List[int], List[int]]] = None
+
+    def __len__(self) -> int:
+        return len(self.kind)
+
+    def add_block(self, kind: str, node=None, depth: int = 0, head: int = -1) -> int:
+        self.kind.append(kind)
+        self.stmts.append([])
+        self.node.append(node)
+        self.succ.append([])
+        self.label.append([])
+        self.pred.append([])
+        self.depth.append(depth)
+        self.head.append(head)
+        self.end.append(-1)
+        return len(self.kind) - 1
+
+    def add_edge(self, a: int, b: int, label: str = "") -> None:
+        self.succ[a].append(b)
+        self.label[a].append(label)
+        self.pred[b].append(a)
+
+    def edges(self):
+        """(origen, destino, etiqueta) de todas las aristas."""
+        for a, (succ, labels) in enumerate(zip(self.succ, self.label)):
+            for b, lab in zip(succ, labels):
+                yield a, b, lab
+
+    # --- Bucles (estructura del AST) ---
+    @property
+    def loop_headers(self) -> List[int]:
+        return [b for b, k in enumerate(self.kind) if k == "loop"]
+
+    @property
+    def max_loop_depth(self) -> int:
+        return max((self.depth[h] for h in self.loop_headers), default=0)
+
+    # --- Recorridos ---
+    def reverse_postorder(self) -> List[int]:
+        """Bloques alcanzables desde la entrada, en postorden inverso."""
+        if self._rpo is None:
+            seen = [False] * len(self)
+            seen[ENTRY] = True
+            post = []
+            stack = [(ENTRY, iter(self.succ[ENTRY]))]
+            while stack:
+                b, it = stack[-1]
+                for s in it:
+                    if not seen[s]:
+                        seen[s] = True
+                        stack.append((s, iter(self.succ[s])))
+                        break
+                else:
+                    stack.pop()
+                    post.append(b)
+            post.reverse()
+            self._rpo = post
+        return self._rpo
+
+    def reachable(self) -> List[bool]:
+        mask = [False] * len(self)
+        for b in self.reverse_postorder():
+            mask[b] = True
+        return mask
+
+    # --- Dominadores ---
+    def dominators(self) -> List[int]:
+        """
+        Dominador inmediato de cada bloque (-1 si no es alcanzable; la
+        entrada es su propio dominador). Cooper–Harvey–Kennedy sobre el
+        postorden inverso: en código estructurado converge en dos pasadas.
+        """
+        if self._idom is None:
+            rpo = self.reverse_postorder()
+            order = [-1] * len(self)
+            for i, b in enumerate(rpo):
+                order[b] = i
+            idom = [-1] * len(self)
+            idom[ENTRY] = ENTRY
+
+            def intersect(a, b):
+                while a != b:
+                    while order[a] > order[b]:
+                        a = idom[a]
+                    while order[b] > order[a]:
+                        b = idom[b]
+                return a
+
+            changed = True
+            while changed:
+                changed = False
+                for b in rpo[1:]:
+                    new = -1
+                    for p in self.pred[b]:
+                        if idom[p] == -1:
+                            continue
+                        new = p if new == -1 else intersect(p, new)
+                    if idom[b] != new:
+                        idom[b] = new
+                        changed = True
+            self._idom = idom
+        return self._idom
+
+    def dominates(self, a: int, b: int) -> bool:
+        """¿Todo camino de la entrada a b pasa por a? O(1) tras la primera consulta."""
+        if self._dom_range is None:
+            idom = self.dominators()
+            children: List[List[int]] = [[] for _ in range(len(self))]
+            for b_, d in enumerate(idom):
+                if d != -1 and b_ != ENTRY:
+                    children[d].append(b_)
+            pre, post = [-1] * len(self), [-1] * len(self)
+            clock = 0
+            stack = [(ENTRY, False)]
+            while stack:
+                x, done = stack.pop()
+                if done:
+                    post[x] = clock
+                    clock += 1
+                    continue
+                pre[x] = clock
+                clock += 1
+                stack.append((x, True))
+                stack.extend((c, False) for c in children[x])
+            self._dom_range = (pre, post)
+        pre, post = self._dom_range
+        if pre[a] == -1 or pre[b] == -1:
+            return False
+        return pre[a] <= pre[b] and post[b] <= post[a]
+
+    def back_edges(self) -> List[Tuple[int, int]]:
+        """Aristas u -> h con h dominando a u."""
+        reach = self.reachable()
+        return [(a, b) for a, b, _ in self.edges() if reach[a] and self.dominates(b, a)]
+
+    def natural_loops(self) -> Dict[int, List[int]]:
+        """Cabecera -> bloques de su bucle natural (unión sobre sus aristas de retorno)."""
+        loops: Dict[int, set] = {}
+        for u, h in self.back_edges():
+            body = loops.setdefault(h, {h})
+            stack = [u]
+            while stack:
+                x = stack.pop()
+                if x in body:
+                    continue
+                body.add(x)
+                stack.extend(self.pred[x])
+        return {h: sorted(body) for h, body in loops.items()}
+
+    # --- Métricas ---
+    def cyclomatic(self) -> int:
+        """E - N + 2 sobre la parte alcanzable (cada RETURN extra suma una salida)."""
+        reach = self.reachable()
+        nodes = sum(reach)
+        edges = sum(1 for a, _, _ in self.edges() if reach[a])
+        return edges - nodes + 2
+
+    def exits(self) -> List[int]:
+        """Bloques alcanzables que saltan a la salida."""
+        reach = self.reachable()
+        return [b for b in self.pred[EXIT] if reach[b]]
+
+    def min_path(self, weight: List[int], costliest=frozenset()) -> Optional[int]:
+        """
+        Menor suma de `weight` en un camino de la entrada a la salida, o None
+        si la salida no se alcanza. Los cuerpos de FOR y WHILE se recorren
+        una vez (no se saltan) y en los bloques de `costliest` se toma el
+        sucesor más caro. Las aristas hacia delante van a bloques de índice
+        mayor (o a la salida), así que basta una pasada en orden inverso.
+        """
+        inf = float("inf")
+        dist = [inf] * len(self)
+        dist[EXIT] = 0
+        for b in list(range(len(self) - 1, EXIT, -1)) + [ENTRY]:
+            node = self.node[b]
+            succ = self.succ[b]
+            if self.kind[b] == "loop" and node.get("type") in LOOP_LABELS:
+                succ = succ[:1]
+            options = []
+            for s in succ:
+                if s > b or s == EXIT:
+                    options.append(dist[s])
+                elif self.node[s].get("type") in LOOP_LABELS:
+                    # Vuelta a la cabecera: tras una pasada se sale del bucle.
+                    options.append(dist[self.succ[s][1]])
+            if options:
+                pick = max if b in costliest else min
+                dist[b] = weight[b] + pick(options)
+        return None if dist[ENTRY] == inf else int(dist[ENTRY])
+
+    def early_exits(self) -> List[int]:
+        """Bloques con un RETURN dentro de algún bucle (salida temprana)."""
+        return [b for b in self.exits() if self.depth[b] > 0 and self.stmts[b]
+                and _is_return(self.stmts[b][-1])]
+
+
+def _is_return(stmt) -> bool:
+    return is_node(stmt) and stmt.get("type") == "Return"
+
+
+def build_cfg(proc: Dict[str, Any]) -> CFG:
+    """CFG de `proc` (dict o ast_nodes.Procedure)."""
+    cfg = CFG(proc)
+    cfg.add_block("entry")
+    cfg.add_block("exit")
+    first = cfg.add_block("block")
+    cfg.add_edge(ENTRY, first)
+    body = proc.get("body") or []
+    last = _walk(cfg, body if isinstance(body, list) else [body], first, 0, -1)
+    if last != -1:
+        cfg.add_edge(last, EXIT)
+    return cfg
+
+
+def _walk(cfg: CFG, stmts, cur: int, depth: int, head: int) -> int:
+    """Agrega `stmts` a partir del bloque `cur`; devuelve el bloque final o -1 si no hay salida."""
+    for stmt in stmts:
+        if not is_node(stmt):
+            continue
+        if cur == -1:
+            # Código tras un RETURN: bloque sin predecesores.
+            cur = cfg.add_block("block", depth=depth, head=head)
+        typ = stmt.get("type")
+
+        if typ == "If":
+            cond = cfg.add_block("cond", stmt, depth, head)
+            cfg.add_edge(cur, cond)
+            ends = []
+            for field, lab in (("then", "T"), ("else_", "F")):
+                start = cfg.add_block("block", depth=depth, head=head)
+                cfg.add_edge(cond, start, lab)
+                end = _walk(cfg, stmt.get(field) or [], start, depth, head)
+                if end != -1:
+                    ends.append(end)
+            cfg.end[cond] = len(cfg)
+            if not ends:
+                cur = -1
+                continue
+            cur = cfg.add_block("block", depth=depth, head=head)
+            for end in ends:
+                cfg.add_edge(end, cur)
+
+        elif typ in LOOP_LABELS:
+            enter, back, leave = LOOP_LABELS[typ]
+            h = cfg.add_block("loop", stmt, depth + 1, head)
+            cfg.add_edge(cur, h)
+            start = cfg.add_block("block", depth=depth + 1, head=h)
+            cfg.add_edge(h, start, enter)
+            end = _walk(cfg, stmt.get("body") or [], start, depth + 1, h)
+            if end != -1:
+                cfg.add_edge(end, h, back)
+            cfg.end[h] = len(cfg)
+            cur = cfg.add_block("block", depth=depth, head=head)
+            cfg.add_edge(h, cur, leave)
+
+        elif typ == "Repeat":
+            h = cfg.add_block("loop", stmt, depth + 1, head)
+            cfg.add_edge(cur, h)
+            start = cfg.add_block("block", depth=depth + 1, head=h)
+            cfg.add_edge(h, start)
+            end = _walk(cfg, stmt.get("body") or [], start, depth + 1, h)
+            if end == -1:
+                cfg.end[h] = len(cfg)
+                cur = -1
+                continue
+            until = cfg.add_block("until", stmt, depth + 1, h)
+            cfg.add_edge(end, until)
+            cfg.add_edge(until, h, "F")
+            cfg.end[h] = len(cfg)
+            cur = cfg.add_block("block", depth=depth, head=head)
+            cfg.add_edge(until, cur, "T")
+
+        else:
+            cfg.stmts[cur].append(stmt)
+            if typ == "Return":
+                cfg.add_edge(cur, EXIT)
+                cur = -1
+    return cur
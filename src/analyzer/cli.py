@@ -0,0 +1,149 @@
+# src/analyzer/cli.py
+"""
+Línea de comandos: analiza archivos, directorios y globs de pseudocódigo
+en varios procesos y escribe un resultado por procedimiento en cuanto su
+archivo termina. La unidad de streaming es el archivo: el costo de un
+procedimiento depende de los que llama en el mismo archivo
+(call_graph.propagate_costs), así que todos quedan listos a la vez.
+
+Uso:
+    python -m analyzer examples/ src/**/*.pseudo -j 8 --format jsonl
+    python -m analyzer algoritmo.pseudo --format text
+
+Formatos:
+    jsonl   una línea JSON por procedimiento (reporter.JsonlReporter):
+            {"file", "procedure", "ok": true, "big_o", "big_omega", "big_theta",
+             "recurrence", ... [, "reasoning"] [, "ast"]}
+            según --fields (analysis, reasoning, ast, full; por defecto
+            reasoning), y una por archivo que no parsea:
+            {"file", "procedure": null, "ok": false, "error": {"type", "message", "line"}}
+            Con --recover, los archivos con errores se analizan igual y cada
+            diagnóstico es una línea {"file", "procedure", "ok": false,
+            "error": {"line", "column", "type", "message", ...}}.
+    text    format_analysis_text, con una cabecera por archivo
+    md      format_analysis_markdown, con una cabecera por archivo
+
+Código de salida: 0 si todo se analizó, 1 si algún archivo falló (errores
+de sintaxis, aun recuperados con --recover, o de lectura), 2 si algún argumento no corresponde a ningún
+archivo.
+"""
+import argparse
+import glob
+import os
+import sys
+from typing import Iterable, List, Optional, Tuple
+
+from .batch import iter_analyze_files
+from .reporter import FIELD_SETS, JsonlReporter, format_analysis_markdown, format_analysis_text
+
+EXTENSION = ".pseudo"
+FORMATS = ("jsonl", "text", "md")
+
+
+def expand_inputs(args: Iterable[str], extension: str = EXTENSION) -> Tuple[List[str], List[str]]:
+    """
+    (archivos, argumentos sin coincidencias). Los directorios se recorren
+    recursivamente buscando `extension`; los argumentos con *, ? o [ se
+    expanden como globs (** incluido). Sin duplicados, en orden de aparición.
+    """
+    files, missing, seen = [], [], set()
+
+    def add(path):
+        key = os.path.normpath(path)
+        if key not in seen:
+            seen.add(key)
+            files.append(path)
+
+    for arg in args:
+        if os.path.isdir(arg):
+            found = sorted(os.path.join(root, name)
+                           for root, _, names in os.walk(arg)
+                           for name in names if name.endswith(extension))
+        elif glob.has_magic(arg):
+            found = sorted(p for p in glob.glob(arg, recursive=True) if os.path.isfile(p))
+        elif os.path.isfile(arg):
+            found = [arg]
+        else:
+            found = []
+        if not found:
+            missing.append(arg)
+        for path in found:
+            add(path)
+    return files, missing
+
+
+def _write_record(out, record, fmt: str, jsonl: Optional[JsonlReporter] = None) -> bool:
+    """Escribe el resultado de un archivo; devuelve False si falló o tuvo errores de sintaxis."""
+    path = record["path"]
+    if not record["ok"]:
+        err = record["error"]
+        if jsonl is not None:
+            jsonl.write(None, error=err, file=path)
+        else:
+            where = f":{err['line']}" if err.get("line") else ""
+            out.write(f"{path}{where}: {err['type']}: {err['message']}\n\n")
+        return False
+
+    procs = record["analysis"]["procedures"]
+    diagnostics = record.get("diagnostics", [])
+    if jsonl is not None:
+        jsonl.write_analysis(record.get("ast"), record["analysis"], file=path)
+        for diag in diagnostics:
+            jsonl.write(diag["procedure"], error=diag, file=path)
+    elif fmt == "text":
+        out.write(f"== {path} ==\n")
+        _write_diagnostics(out, path, diagnostics)
+        out.write(format_analysis_text({"procedures": procs}) + "\n")
+    else:
+        out.write(f"## {path}\n\n")
+        _write_diagnostics(out, path, diagnostics)
+        out.write(format_analysis_markdown({"procedures": procs}) + "\n")
+    return not diagnostics
+
+
+def _write_diagnostics(out, path: str, diagnostics) -> None:
+    for diag in diagnostics:
+        out.write(f"{path}:{diag['line']}:{diag['column']}: {diag['type']}: {diag['message']}\n")
+    if diagnostics:
+        out.write("\n")
+
+
+def main(argv: Optional[List[str]] = None, out=None) -> int:
+    out = out or sys.stdout
+    ap = argparse.ArgumentParser(prog="analyzer",
+                                 description="Análisis de complejidad de pseudocódigo.")
+    ap.add_argument("inputs", nargs="+", help="archivos, directorios o globs")
+    ap.add_argument("-j", "--jobs", type=int, default=None,
+                    help="procesos (por defecto, uno por núcleo; 1 = sin pool)")
+    ap.add_argument("-f", "--format", choices=FORMATS, default="jsonl")
+    ap.add_argument("--fields", choices=sorted(FIELD_SETS), default="reasoning",
+                    help="campos de cada línea JSON (sólo con --format jsonl)")
+    ap.add_argument("--ext", default=EXTENSION, help="extensión buscada en directorios")
+    ap.add_argument("--cache", metavar="PATH", help="ResultCache SQLite compartida")
+    ap.add_argument("--recover", action="store_true",
+                    help="analizar lo recuperable de los archivos con errores de sintaxis")
+    args = ap.parse_args(argv)
+
+    files, missing = expand_inputs(args.inputs, args.ext)
+    for arg in missing:
+        print(f"analyzer: sin archivos para '{arg}'", file=sys.stderr)
+    if missing and not files:
+        return 2
+
+    jsonl = JsonlReporter(out, args.fields) if args.format == "jsonl" else None
+    include_ast = jsonl is not None and "ast" in jsonl.fields
+    failed = 0
+    for record in iter_analyze_files(files, workers=args.jobs, include_ast=include_ast,
+                                     cache_path=args.cache, recover=args.recover):
+        if not _write_record(out, record, args.format, jsonl):
+            failed += 1
+        out.flush()
+
+    if failed:
+        print(f"analyzer: {failed} de {len(files)} archivo(s) con errores", file=sys.stderr)
+        return 1
+    return 2 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,12 +2,20 @@
 Motor de complejidad 2.0 (Razonamiento Formal):
 Produce O, Ω, Θ basándose en técnicas formales de las notas de clase:
 - Sumatorias y Series (para bucles dependientes).
-- Teorema Maestro (identificación de a, b, f(n)).
-- Ecuaciones Características (para recurrencias lineales).
+- Teorema Maestro / Akra–Bazzi y Ecuaciones Características, resueltos en
+  analyzer.recurrence a partir de la forma de cada llamada recursiva.
 """
 
 from typing import Dict, Any, List
-import re
+
+from . import recurrence
+from .ast_nodes import is_node
+from .call_graph import Cost, format_cost, max_cost, propagate_costs
+from .expr_printer import canonical, display
+from .traversal import free_symbols
+
+# Forma parte de la clave de result_cache: incrementar cuando cambie la salida.
+ENGINE_VERSION = "2.6"
 
 
 def _nesting_to_theta(k: int) -> str:
@@ -20,228 +28,293 @@ def _nesting_to_theta(k: int) -> str:
 
 def infer_complexity(context: Dict[str, Any], proc_name=None) -> Dict[str, Any]:
     procs = context.get("procedures", {})
-    targets = {proc_name: procs[proc_name]} if proc_name else procs
-    out = {"procedures": {}}
-
-    for name, info in targets.items():
-        loops = info.get("loops", [])
-        recursions = info.get("recursions", [])
-
-        # --- Ajuste de Anidamiento (Sanity Check) ---
-        raw_nesting = info.get("max_nesting", 0)
-        loop_count = len(loops)
-        max_nesting = min(raw_nesting, loop_count) if loop_count > 0 else 0
-        if raw_nesting > 0 and loop_count >= raw_nesting:
-            max_nesting = raw_nesting
-
-        reasoning: List[str] = []
-
-        # ============================================================================
-        # 1. ANÁLISIS RECURSIVO (Técnicas Avanzadas)
-        # ============================================================================
-        if recursions:
+    targets = [proc_name] if proc_name else list(procs)
+    # Cada procedimiento alcanzable se evalúa una vez (en orden topológico
+    # inverso del grafo de llamadas) y el costo de sus llamadas se propaga.
+    results = propagate_costs(procs, lambda name, calls: infer_procedure(name, procs[name], calls),
+                              targets)
+    return {"procedures": {name: results[name] for name in targets}}
+
+
+def infer_procedure(name: str, info: Dict[str, Any], calls: Cost = None) -> Dict[str, Any]:
+    """
+    Resultado local de un procedimiento. `calls` es el costo de sus llamadas
+    a otros procedimientos (ver call_graph.propagate_costs); en un
+    procedimiento recursivo entra en f(n) de la recurrencia.
+    """
+    loops = info.get("loops", [])
+    recursions = info.get("recursions", [])
+
+    # --- Ajuste de Anidamiento (Sanity Check) ---
+    raw_nesting = info.get("max_nesting", 0)
+    loop_count = len(loops)
+    max_nesting = min(raw_nesting, loop_count) if loop_count > 0 else 0
+    if raw_nesting > 0 and loop_count >= raw_nesting:
+        max_nesting = raw_nesting
+
+    reasoning: List[str] = []
+
+    # ============================================================================
+    # 1. ANÁLISIS RECURSIVO (Técnicas Avanzadas)
+    # ============================================================================
+    if recursions:
+        reasoning.append(
+            f"Detectadas {len(recursions)} llamadas recursivas en '{name}'.")
+        # El anidamiento de los bucles da el costo de combinación f(n) = n^k;
+        # las llamadas a otros procedimientos se suman a f(n) si son polinomiales.
+        f = (None, max_nesting, 0)
+        if calls is not None and calls[0] is None and max_cost(f, calls) != f:
+            f = calls
+            reasoning.append(f"  -> f(n) incluye el costo de las llamadas: {format_cost(calls)}.")
+        pred = _solve_recurrence(info, f_degree=f[1], name=name, f_logs=f[2])
+        pred["reasoning"] = reasoning + pred["reasoning"]
+        return pred
+
+    # ============================================================================
+    # 2. ANÁLISIS ITERATIVO (Sumatorias)
+    # ============================================================================
+    if loops:
+        reasoning.append(
+            f"Estructura iterativa detectada. Profundidad máxima: {max_nesting}.")
+
+        # Detección de Series Aritméticas (Bucles Dependientes)
+        # Ejemplo: FOR j <- 1 TO i (depende de i)
+        dependent_vars = {}
+        is_dependent = False
+        uses_n = False
+
+        # Primera pasada: registrar variables de bucles (en minúsculas -> nombre)
+        for lp in loops:
+            if lp.get("var"):
+                dependent_vars[lp.get("var").lower()] = lp.get("var")
+
+        # Segunda pasada: verificar dependencias con los símbolos de start/end
+        for lp in loops:
+            syms = _loop_symbols(lp)
+            # Chequear si usa 'n'
+            if "n" in syms:
+                uses_n = True
+
+            # Chequear si depende de otro bucle (Serie Aritmética)
+            own = (lp.get("var") or "").lower()
+            for var in sorted(syms.intersection(dependent_vars)):
+                if var != own:  # No contar autoreferencia
+                    is_dependent = True
+                    reasoning.append(
+                        f"  -> Dependencia detectada: El bucle '{lp.get('var')}' depende de '{dependent_vars[var]}'.")
+
+        theta = _nesting_to_theta(max_nesting)
+
+        if is_dependent and max_nesting >= 2:
             reasoning.append(
-                f"Detectadas {len(recursions)} llamadas recursivas en '{name}'.")
-            # Pasamos 'loops' para saber si hay costo de combinación (f(n))
-            pred = _solve_recurrence(info, has_loops=(len(loops) > 0))
-            pred["reasoning"] = reasoning + pred["reasoning"]
-            out["procedures"][name] = pred
-            continue
+                "  -> Identificado patrón de Serie Aritmética (Triangular).")
+            reasoning.append(
+                "  -> Aplicando fórmula de suma: Sum(i) = n(n+1)/2 = Theta(n^2).")
+            # La complejidad sigue siendo n^k, pero el razonamiento es más formal
+            big_theta, big_o, big_omega = theta, theta, theta
 
-        # ============================================================================
-        # 2. ANÁLISIS ITERATIVO (Sumatorias)
-        # ============================================================================
-        if loops:
+        elif uses_n:
             reasoning.append(
-                f"Estructura iterativa detectada. Profundidad máxima: {max_nesting}.")
-
-            # Detección de Series Aritméticas (Bucles Dependientes)
-            # Ejemplo: FOR j <- 1 TO i (depende de i)
-            dependent_vars = set()
-            is_dependent = False
-            uses_n = False
-
-            # Primera pasada: registrar variables de bucles
-            for lp in loops:
-                if lp.get("var"):
-                    dependent_vars.add(lp.get("var"))
-
-            # Segunda pasada: verificar dependencias en start/end
-            for lp in loops:
-                s, e = lp.get("start"), lp.get("end")
-                # Chequear si usa 'n'
-                if _mentions_symbol(s, "n") or _mentions_symbol(e, "n"):
-                    uses_n = True
-
-                # Chequear si depende de otro bucle (Serie Aritmética)
-                for var in dependent_vars:
-                    if var != lp.get("var"):  # No contar autoreferencia
-                        if _mentions_symbol(s, var) or _mentions_symbol(e, var):
-                            is_dependent = True
-                            reasoning.append(
-                                f"  -> Dependencia detectada: El bucle '{lp.get('var')}' depende de '{var}'.")
-
-            theta = _nesting_to_theta(max_nesting)
-
-            if is_dependent and max_nesting >= 2:
-                reasoning.append(
-                    "  -> Identificado patrón de Serie Aritmética (Triangular).")
-                reasoning.append(
-                    f"  -> Aplicando fórmula de suma: Sum(i) = n(n+1)/2 = Theta(n^2).")
-                # La complejidad sigue siendo n^k, pero el razonamiento es más formal
-                big_theta, big_o, big_omega = theta, theta, theta
-
-            elif uses_n:
-                reasoning.append(
-                    "  -> Límites constantes respecto a 'n' (Serie Geométrica o Constante).")
-                reasoning.append("  -> Producto cartesiano de iteraciones.")
-                big_theta, big_o = theta, theta
-                big_omega = "Theta(n)" if max_nesting == 1 else theta
-            else:
-                reasoning.append(
-                    "  -> Símbolo 'n' no encontrado en límites. Posible O(1) o variable desconocida.")
-                big_theta, big_o, big_omega = theta, theta, "Theta(1)"
-
-            out["procedures"][name] = {
-                "big_o": big_o, "big_omega": big_omega, "big_theta": big_theta,
-                "cotas_fuertes": f"c1*n^{max_nesting} <= T(n) <= c2*n^{max_nesting}",
-                "recurrence": None, "reasoning": reasoning,
-            }
-            continue
+                "  -> Límites constantes respecto a 'n' (Serie Geométrica o Constante).")
+            reasoning.append("  -> Producto cartesiano de iteraciones.")
+            big_theta, big_o = theta, theta
+            big_omega = "Theta(n)" if max_nesting == 1 else theta
+        else:
+            reasoning.append(
+                "  -> Símbolo 'n' no encontrado en límites. Posible O(1) o variable desconocida.")
+            big_theta, big_o, big_omega = theta, theta, "Theta(1)"
 
-        # --- CONSTANTE ---
-        reasoning.append(
-            "No se detectaron estructuras de control dependientes de N.")
-        out["procedures"][name] = {
-            "big_o": "Theta(1)", "big_omega": "Theta(1)", "big_theta": "Theta(1)",
-            "cotas_fuertes": "T(n) = c", "recurrence": None, "reasoning": reasoning,
+        # Salidas tempranas (del CFG): un RETURN dentro de un bucle puede
+        # cortar el recorrido en la primera iteración.
+        early = info.get("early_exits") or []
+        if early and big_omega != "Theta(1)":
+            reasoning.append(
+                f"  -> Salida temprana: RETURN dentro de un bucle {early[0]['loop']} "
+                "(mejor caso Theta(1)).")
+            big_omega = "Theta(1)"
+
+        return {
+            "big_o": big_o, "big_omega": big_omega, "big_theta": big_theta,
+            "cotas_fuertes": f"c1*n^{max_nesting} <= T(n) <= c2*n^{max_nesting}",
+            "recurrence": None, "reasoning": reasoning,
         }
 
-    return out
+    # --- CONSTANTE ---
+    reasoning.append(
+        "No se detectaron estructuras de control dependientes de N.")
+    return {
+        "big_o": "Theta(1)", "big_omega": "Theta(1)", "big_theta": "Theta(1)",
+        "cotas_fuertes": "T(n) = c", "recurrence": None, "reasoning": reasoning,
+    }
+
 
 # =============================================================================
 # SOLVERS MATEMÁTICOS
 # =============================================================================
 
 
-def _solve_recurrence(info: Dict[str, Any], has_loops: bool) -> Dict[str, Any]:
+def _solve_recurrence(info: Dict[str, Any], f_degree: float, name: str = "T",
+                      f_logs: int = 0) -> Dict[str, Any]:
+    """
+    Construye T(n) = sum a_i T(shrink_i(n)) + Theta(n^f_degree log^f_logs n) con las
+    llamadas del peor camino (ramas excluyentes de un IF no se suman) y la
+    resuelve con analyzer.recurrence.
+    """
     recs = info.get("recursions", [])
     if not recs:
         return _unknown_recursion()
-
-    # Extraer argumentos para análisis
-    args_txt_all = []
-
-    def txt(a):
-        if isinstance(a, dict):
-            t = a.get("type")
-            if t in ("Identifier", "LValue"):
-                return a.get("name", "")
-            if t == "Number":
-                return str(a.get("value", ""))
-            if t == "BinOp":
-                op = a.get("op") if a.get("op") else "+"
-                return f"({txt(a.get('left'))}{op}{txt(a.get('right'))})"
-            if t == "Unary":
-                return f"{a.get('op')}{txt(a.get('expr'))}"
-        return str(a)
-
+    if any(r.get("nesting", 0) > 0 for r in recs):
+        return _unknown_recursion("  -> Llamada recursiva dentro de un bucle: no es una recurrencia de la forma soportada.")
+
+    params = info.get("params")
+    midpoints = info.get("midpoints", {})
+    path = _worst_path(recs)
+    fewest = info.get("min_recursions")
+    shrinks = [_call_shrink(r.get("args", []), params, midpoints) for r in path]
+    for r, shrink in zip(path, shrinks):
+        if shrink is None:
+            return _unknown_recursion(
+                f"  -> No se reconoce cómo se reduce el tamaño en {_call_text(name, r)}.")
+    kinds = {kind for kind, _ in shrinks}
+    if len(kinds) > 1:
+        return _unknown_recursion("  -> Mezcla de llamadas por división y por sustracción.")
+
+    terms = [(1, x) for _, x in shrinks]
+    if kinds == {"div"}:
+        sol = recurrence.divide_and_conquer(terms, f_degree, f_logs)
+        text = recurrence.recurrence_text("divide", recurrence.canonical_divide(terms), f_degree, f_logs)
+    else:
+        sol = recurrence.subtractive(terms, f_degree, f_logs)
+        text = recurrence.recurrence_text("subtract", recurrence.canonical_subtract(terms), f_degree, f_logs)
+
+    theta = format_cost(sol.cost)
+    reasoning = _call_lines(name, path, shrinks) + list(sol.steps)
+    if len(path) < len(recs):
+        reasoning.insert(0, f"  -> Peor camino: {len(path)} de {len(recs)} llamadas (ramas excluyentes).")
+    guards = frozenset(info.get("size_guards") or ())
+    if fewest == 0:
+        omega = "Theta(1)"
+        reasoning.append("  -> Existe un camino sin llamadas recursivas: Omega(1).")
+    else:
+        omega = theta
+        if any(if_id in guards for r in recs for if_id, _ in r.get("branch") or ()):
+            reasoning.append("  -> El IF sobre el tamaño es el caso base: no cuenta para el mejor caso.")
+    return {
+        "big_o": theta, "big_theta": theta, "big_omega": omega,
+        "recurrence": text,
+        "cotas_fuertes": f"c1*g(n) <= T(n) <= c2*g(n), g(n) = {theta[6:-1]}",
+        "reasoning": reasoning,
+    }
+
+
+def _worst_path(recs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Llamadas del camino con más llamadas. Las ramas (`branch`) forman un
+    trie: en cada IF se elige la rama de más llamadas; una rama ausente
+    cuenta como cero. El mejor caso (`min_recursions`) lo calcula
+    static_analyzer sobre el CFG.
+    """
+    root = {"calls": [], "ifs": {}}
     for r in recs:
-        for arg in r.get("args", []):
-            args_txt_all.append(txt(arg))
-
-    joined = " ".join(args_txt_all).lower()
-
-    # Parametros estimados para Teorema Maestro: T(n) = aT(n/b) + f(n)
-    a = len(recs)  # Número de llamadas recursivas
-
-    # --- CASO 1: DIVIDE Y VENCERÁS (Teorema Maestro) ---
-    if "/2" in joined or "mid" in joined or "mitad" in joined:
-        b = 2  # Asumimos división por 2 típica
-
-        # Determinar f(n) basado en si hay bucles en el cuerpo
-        if has_loops:
-            # f(n) = Theta(n) -> Merge Sort, Quick Sort
-            # Caso 2: n^(log_b a) = n^1 vs f(n) = n -> O(n log n)
-            return {
-                "big_o": "Theta(n log n)", "big_theta": "Theta(n log n)", "big_omega": "Theta(n log n)",
-                "recurrence": f"T(n) = {a}T(n/{b}) + O(n)",
-                "cotas_fuertes": "c1*n*log(n) <= T(n) <= c2*n*log(n)",
-                "reasoning": [
-                    f"Forma del Teorema Maestro: T(n) = aT(n/b) + f(n)",
-                    f"  -> a = {a} (llamadas), b = {b} (división)",
-                    f"  -> f(n) es O(n) debido a bucles presentes (Merge/Partition).",
-                    f"  -> log_b(a) = log_2({a}) = {1 if a==2 else '?'}",
-                    "  -> Caso 2: f(n) es Theta(n^log_b a) * log^k n -> Resultado Theta(n log n)"
-                ]
-            }
-        else:
-            # f(n) = Theta(1) -> Binary Search
-            # Caso 1: n^(log_b a) vs f(n)=1.
-            # Si a=1 (Binary Search) -> n^0 = 1. f(n) = 1. -> O(log n)? No, Case 2 master theorem con k=0.
-            return {
-                "big_o": "Theta(log n)", "big_theta": "Theta(log n)", "big_omega": "Theta(1)",
-                "recurrence": f"T(n) = {a}T(n/{b}) + O(1)",
-                "cotas_fuertes": "c1*log(n) <= T(n) <= c2*log(n)",
-                "reasoning": [
-                    f"Forma del Teorema Maestro: T(n) = {a}T(n/{b}) + O(1)",
-                    "  -> No hay bucles significativos fuera de la recursión (f(n) = O(1)).",
-                    "  -> Aplicando Teorema Maestro (Caso 2 con k=0 para a=1) -> Theta(log n)."
-                ]
-            }
-
-    # --- CASO 2: RECURRENCIA LINEAL HOMOGÉNEA (Ecuación Característica) ---
-    # Detectar patrones tipo T(n-1) y T(n-2)
-    has_n1 = bool(re.search(r"n.*1", joined))  # n-1
-    has_n2 = bool(re.search(r"n.*2", joined))  # n-2
-
-    if has_n1 and has_n2:
-        return {
-            "big_o": "Theta(phi^n)", "big_theta": "Theta(phi^n)", "big_omega": "Theta(phi^n)",
-            "recurrence": "T(n) = T(n-1) + T(n-2)",
-            "cotas_fuertes": "T(n) ~ 1.618^n",
-            "reasoning": [
-                "Recurrencia Lineal Homogénea de Segundo Orden detectada.",
-                "  -> Forma: c1*T(n-1) + c2*T(n-2)",
-                "  -> Ecuación Característica: r^2 - r - 1 = 0",
-                "  -> Raíces: (1 ± sqrt(5)) / 2",
-                "  -> La raíz dominante es Phi (1.618...) -> Crecimiento Exponencial."
-            ]
-        }
+        node = root
+        for if_id, field in r.get("branch") or ():
+            arms = node["ifs"].setdefault(if_id, {})
+            node = arms.setdefault(field, {"calls": [], "ifs": {}})
+        node["calls"].append(r)
+
+    def worst(node):
+        out = list(node["calls"])
+        for arms in node["ifs"].values():
+            out.extend(max((worst(a) for a in arms.values()), key=len))
+        return out
+
+    return worst(root)
+
+
+def _call_text(name: str, rec: Dict[str, Any]) -> str:
+    return f"{name}({', '.join(display(a) for a in rec.get('args', []))})"
+
+
+def _call_lines(name: str, path, shrinks) -> List[str]:
+    """Una línea por llamada distinta del peor camino; las iguales (misma forma canónica) se agrupan."""
+    groups: Dict[str, List] = {}
+    for rec, shrink in zip(path, shrinks):
+        key = ",".join(canonical(a) for a in rec.get("args", []))
+        groups.setdefault(key, [rec, shrink, 0])[2] += 1
+    lines = []
+    for rec, (kind, x), count in groups.values():
+        x = int(x) if float(x).is_integer() else round(x, 3)
+        size = f"n-{x}" if kind == "sub" else f"n/{x}"
+        times = f"{count} x " if count > 1 else ""
+        lines.append(f"  -> {times}{_call_text(name, rec)}: T({size}).")
+    return lines
+
+
+def _name_of(node):
+    if is_node(node) and node.get("type") in ("Identifier", "LValue"):
+        return node.get("name")
+    return None
+
+
+def _number_of(node):
+    if is_node(node) and node.get("type") == "Number":
+        return node.get("value")
+    return None
+
+
+def _arg_shrink(arg, param, midpoints):
+    """('sub', d) si arg es param - d; ('div', b) si arg es param / b, a*param / c o un punto medio."""
+    if not is_node(arg):
+        return None
+    name = _name_of(arg)
+    if name is not None:
+        return ("div", midpoints[name]) if name in midpoints else None
+    if arg.get("type") != "BinOp":
+        return None
+    op, left, right = arg.get("op"), arg.get("left"), arg.get("right")
+    lname, rnum = _name_of(left), _number_of(right)
+    is_param = lname is not None and (param is None or lname == param)
+
+    if op in ("+", "-") and lname in midpoints and rnum is not None:
+        return ("div", midpoints[lname])
+    if op == "-" and is_param and rnum is not None and rnum > 0:
+        return ("sub", rnum)
+    if op in ("/", "div") and rnum is not None:
+        if is_param and rnum > 1:
+            return ("div", rnum)
+        # (a * param) / c con c > a: fracción a/c del tamaño.
+        if is_node(left) and left.get("type") == "BinOp" and left.get("op") == "*":
+            a = _number_of(left.get("left")) or _number_of(left.get("right"))
+            other = left.get("right") if _number_of(left.get("left")) is not None else left.get("left")
+            oname = _name_of(other)
+            if a and oname is not None and (param is None or oname == param) and rnum > a:
+                return ("div", rnum / a)
+    return None
+
+
+def _call_shrink(args, params, midpoints):
+    """Primera reducción reconocida entre los argumentos de una llamada."""
+    for i, arg in enumerate(args):
+        param = params[i] if params is not None and i < len(params) else None
+        if params is not None and param is None:
+            continue
+        shrink = _arg_shrink(arg, param, midpoints)
+        if shrink is not None:
+            return shrink
+    return None
 
-    # --- CASO 3: RECURSIÓN LINEAL SIMPLE ---
-    if has_n1 or "n" in joined:
-        return {
-            "big_o": "Theta(n)", "big_theta": "Theta(n)", "big_omega": "Theta(n)",
-            "recurrence": "T(n) = T(n-1) + c",
-            "cotas_fuertes": "T(n) = c*n",
-            "reasoning": [
-                "Reducción lineal del problema (T(n-1)).",
-                "  -> Profundidad de la pila de recursión: n",
-                "  -> Costo por nivel: O(1) (sin bucles anidados detectados)."
-            ]
-        }
 
-    return _unknown_recursion()
+def _unknown_recursion(detail: str = None):
+    reasoning = ["Patrón de recursión no reconocido."]
+    if detail:
+        reasoning.append(detail)
+    return {"big_o": "Theta(?)", "big_theta": "Theta(?)", "big_omega": "Theta(?)",
+            "cotas_fuertes": "desconocido", "recurrence": None, "reasoning": reasoning}
 
 
-def _unknown_recursion():
-    return {"big_o": "Theta(?)", "big_theta": "Theta(?)", "big_omega": "Theta(?)",
-            "cotas_fuertes": "desconocido", "recurrence": None, "reasoning": ["Patrón de recursión no reconocido."]}
-
-
-def _mentions_symbol(node: Any, symbol: str) -> bool:
-    if node is None:
-        return False
-
-    def stringify(n):
-        if isinstance(n, dict):
-            if n.get("type") in ("Identifier", "LValue"):
-                return n.get("name", "")
-            s = ""
-            for v in n.values():
-                if isinstance(v, (list, dict)):
-                    s += stringify(v) + " "
-            return s
-        return str(n)
-    return symbol.lower() in stringify(node).lower()
+def _loop_symbols(lp: Dict[str, Any]):
+    """Símbolos libres de los límites del bucle (precalculados por LoopDetector)."""
+    syms = lp.get("symbols")
+    if syms is None:
+        syms = free_symbols(lp.get("start"), lp.get("end"))
+    return syms
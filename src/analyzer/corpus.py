@@ -0,0 +1,464 @@
+# src/analyzer/corpus.py
+"""
+Generador determinista de corpus sintéticos de pseudocódigo.
+
+Los programas se derivan de las reglas de grammar.lark que compiló el
+parser (GrammarSampler): cada sentencia, bloque y lista sale de una
+producción concreta de la gramática, con sus literales. El esqueleto de cada
+procedimiento (bucles, llamadas recursivas, caso base) elige la producción
+por sus símbolos; el relleno son derivaciones aleatorias de `statement` sin
+las reglas que cambian el costo (bucles, RETURN, llamadas). Al crear el
+generador se comprueba que la gramática sigue teniendo todas las reglas que
+se emiten.
+
+Formas de procedimiento (`kind`), con `depth` = bucles 1..n anidados:
+    loops            `depth` bucles FOR/WHILE/REPEAT anidados
+    linear           P(n - 1) + `depth` bucles          T(n) = T(n-1) + n^depth
+    divide_conquer   dos mitades + `depth` bucles       T(n) = 2T(n/2) + n^depth
+    binary           P(n - 1) + P(n - 2)                T(n) = T(n-1) + T(n-2) + 1
+
+La complejidad esperada (expected_cost) se calcula con esos parámetros, sin
+pasar por el motor, y se publica en el manifiesto.
+
+La salida se escribe procedimiento a procedimiento: la memoria no depende
+del tamaño del corpus.
+"""
+import json
+import random
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .call_graph import Cost, format_cost
+from .parser import LARK_PARSER
+
+# Reglas de grammar.lark que emite el generador.
+EMITTED_RULES = (
+    "class_decl", "attribute_list", "procedure", "param_list", "param", "block",
+    "stmt_list", "statement", "assign_stmt", "if_stmt", "for_stmt", "while_stmt",
+    "repeat_stmt", "call_stmt", "call_expr", "arg_list", "return_stmt", "var_decl",
+    "condition", "expr", "lvalue", "array_access",
+)
+
+RECURSION_PATTERNS = ("linear", "divide_conquer", "binary")
+
+# Reglas que el relleno no deriva: cambiarían el costo del procedimiento.
+FILLER_BANNED = frozenset((
+    "for_stmt", "while_stmt", "repeat_stmt", "return_stmt", "call_stmt", "call_expr",
+))
+
+# Producciones que el parser LALR no acepta en todos los contextos: con
+# `Clase v[n]` se queda en var_decl -> CLASE IDENTIFIER y no espera el `[`.
+EXCLUDED = {"type_spec": (("CLASE",),)}
+
+MAX_IF_DEPTH = 2        # IF anidados en el relleno
+MAX_DEPTH = 48          # profundidad de derivación antes de cerrar por lo más corto
+RECURSIVE_WEIGHT = 0.3  # peso de las producciones que se repiten (ver _grows)
+
+# Marcas de formato entre tokens: salto de línea, sangrar, desangrar.
+_NL, _IN, _OUT = "\n", "\x01", "\x02"
+_LAYOUT = {
+    "BEGIN": ((_NL,), (_IN,)),
+    "END": ((_OUT, _NL), ()),
+    "ELSE": ((_NL,), ()),
+    "REPEAT": ((), (_IN,)),
+    "UNTIL": ((_OUT, _NL), ()),
+}
+_TIGHT_BEFORE = frozenset((")", "]", ",", ";", ".", "..", "["))
+_TIGHT_AFTER = frozenset(("(", "[", ".", ".."))
+
+
+def grammar_literals(parser=LARK_PARSER) -> Dict[str, List[str]]:
+    """Literales de las reglas de un solo token (!cmp_op, !add_op, ...)."""
+    terminals = {t.name: t.pattern.value for t in parser.terminals}
+    out: Dict[str, List[str]] = {}
+    for rule in parser.rules:
+        name = rule.origin.name
+        if name in ("cmp_op", "add_op", "mul_op", "type_spec") and len(rule.expansion) == 1:
+            out.setdefault(name, []).append(terminals[rule.expansion[0].name])
+    return out
+
+
+def _check_grammar(parser=LARK_PARSER):
+    names = {str(rule.origin.name) for rule in parser.rules}
+    missing = [r for r in EMITTED_RULES if r not in names]
+    if missing:
+        raise ValueError(f"grammar.lark ya no define las reglas: {', '.join(missing)}")
+
+
+def expected_cost(kind: str, depth: int) -> Cost:
+    """Costo de un procedimiento generado, a partir de su forma y sus bucles."""
+    if kind == "loops":
+        return (None, depth, 0)
+    if kind == "linear":
+        return (None, depth + 1, 0)
+    if kind == "binary":
+        return ("phi^n", 0, 0)
+    # divide_conquer, teorema maestro con a = b = 2
+    if depth < 1:
+        return (None, 1, 0)
+    return (None, depth, 1 if depth == 1 else 0)
+
+
+class _Derivation:
+    """Estado de una derivación aleatoria: nombres visibles y presupuestos."""
+
+    def __init__(self, rng, names, writable, expr_len):
+        self.rng = rng
+        self.names = names
+        self.writable = writable
+        self.expr_len = expr_len
+        self.atoms = 0
+        self.depth = 0
+        self.expr_depth = 0
+        self.if_depth = 0
+        self.fresh = 0
+
+    def exhausted(self) -> bool:
+        return self.depth >= MAX_DEPTH or (self.expr_depth > 0 and self.atoms >= self.expr_len)
+
+    def terminal(self, name, owner) -> str:
+        if name == "ASSIGN":
+            return "<-"
+        if name == "NUMBER":
+            return str(self.rng.randint(0, 99))
+        if name != "IDENTIFIER":
+            raise ValueError(f"terminal sin generador: {name}")
+        if owner in ("array_access", "length_func"):
+            return "A"
+        if owner in ("var_decl", "attribute_list"):
+            self.fresh += 1
+            return f"{'v' if owner == 'var_decl' else 'a'}{self.fresh}"
+        return self.rng.choice(self.names)
+
+
+class GrammarSampler:
+    """
+    Producciones de grammar.lark tal como las compiló Lark (con los ?, * y +
+    ya expandidos en reglas auxiliares `__...`).
+
+    - build(origin, (símbolo, tokens), ...): la producción de `origin` cuyos
+      símbolos no literales son exactamente esos, con sus literales.
+    - seq(origin, item, items): una lista `item*` o `item ("," item)*`.
+    - derive(symbol, state): derivación aleatoria; pasado el presupuesto de
+      la expresión se cierra por la producción más corta.
+    """
+
+    def __init__(self, parser=LARK_PARSER):
+        self.literals = {t.name: t.pattern.value for t in parser.terminals
+                         if t.pattern.type == "str"}
+        self.keywords = frozenset(v for v in self.literals.values() if v.isalpha())
+        self.rules: Dict[str, List[Tuple[str, ...]]] = {}
+        for rule in parser.rules:
+            self.rules.setdefault(rule.origin.name, []).append(
+                tuple(s.name for s in rule.expansion))
+        self.min_size = self._min_sizes()
+
+    def _min_sizes(self) -> Dict[str, float]:
+        size = {name: float("inf") for name in self.rules}
+        changed = True
+        while changed:
+            changed = False
+            for name, expansions in self.rules.items():
+                best = min(sum(size.get(s, 1) for s in exp) for exp in expansions)
+                if best < size[name]:
+                    size[name] = best
+                    changed = True
+        return size
+
+    def literal(self, name) -> List[str]:
+        text = self.literals[name]
+        before, after = _LAYOUT.get(text, ((), ()))
+        return [*before, text, *after]
+
+    def production(self, origin, slots: Sequence[str]) -> Tuple[str, ...]:
+        for exp in self.rules.get(origin, ()):
+            if tuple(s for s in exp if s not in self.literals) == tuple(slots):
+                return exp
+        raise ValueError(f"grammar.lark: {origin} no tiene la producción {' '.join(slots)}")
+
+    def build(self, origin, *children: Tuple[str, List[str]]) -> List[str]:
+        exp = self.production(origin, [name for name, _ in children])
+        parts = iter(tokens for _, tokens in children)
+        out = [_NL] if origin == "statement" else []
+        for sym in exp:
+            out += self.literal(sym) if sym in self.literals else next(parts)
+        return out
+
+    def seq(self, origin, item, items: List[List[str]]) -> List[str]:
+        if not items:
+            self.production(origin, ())
+            return []
+        sep = self._separator(origin, item)
+        out = list(items[0])
+        for tokens in items[1:]:
+            out += sep + tokens
+        return out
+
+    def _separator(self, origin, item) -> List[str]:
+        for exp in self.rules.get(origin, ()):
+            for helper in (s for s in exp if s.startswith("__")):
+                for sub in self.rules[helper]:
+                    if sub and sub[-1] == item and helper not in sub:
+                        return [t for s in sub[:-1] for t in self.literal(s)]
+        raise ValueError(f"grammar.lark: {origin} no es una lista de {item}")
+
+    def derive(self, sym, state: _Derivation, banned=frozenset(), owner=None) -> List[str]:
+        if sym in self.literals:
+            return self.literal(sym)
+        if sym not in self.rules:
+            return [state.terminal(sym, owner)]
+        if sym == "statement" and state.if_depth >= MAX_IF_DEPTH:
+            banned = banned | {"if_stmt"}
+        options = [exp for exp in self.rules[sym]
+                   if not banned.intersection(exp) and exp not in EXCLUDED.get(sym, ())]
+        if state.exhausted():
+            exp = min(options, key=lambda e: sum(self.min_size.get(s, 1) for s in e))
+        else:
+            weights = [RECURSIVE_WEIGHT if self._grows(sym, exp, state) else 1.0
+                       for exp in options]
+            exp = state.rng.choices(options, weights)[0]
+        if sym == "expr" and state.expr_depth == 0:
+            state.atoms = 0
+        state.atoms += sym == "atom"
+        state.depth += 1
+        state.expr_depth += sym == "expr"
+        state.if_depth += sym == "if_stmt"
+        out = [_NL] if sym == "statement" else []
+        for i, s in enumerate(exp):
+            if sym == "assign_stmt" and i == 0 and s == "lvalue":
+                # el destino de una asignación es una variable de relleno
+                state.names, names = state.writable, state.names
+                out += self.derive(s, state, banned, sym)
+                state.names = names
+                continue
+            out += self.derive(s, state, banned, owner if sym.startswith("__") else sym)
+        state.depth -= 1
+        state.expr_depth -= sym == "expr"
+        state.if_depth -= sym == "if_stmt"
+        return out
+
+    @staticmethod
+    def _grows(sym, exp, state) -> bool:
+        """La producción se repite (recursiva, o un operador más dentro de una expresión)."""
+        return sym in exp or (state.expr_depth > 0 and any(s.startswith("__") for s in exp))
+
+    def render(self, tokens: List[str]) -> List[str]:
+        """Tokens con marcas de formato -> líneas sangradas."""
+        lines: List[str] = []
+        line: List[str] = []
+        level = indent = 0
+        prev = None
+        for tok in tokens:
+            if tok == _NL:
+                if line:
+                    lines.append("    " * indent + "".join(line))
+                    line = []
+            elif tok == _IN:
+                level += 1
+            elif tok == _OUT:
+                level -= 1
+            else:
+                if not line:
+                    indent = level
+                    line.append(tok)
+                elif self._tight(prev, tok):
+                    line.append(tok)
+                else:
+                    line.append(" " + tok)
+                prev = tok
+        if line:
+            lines.append("    " * indent + "".join(line))
+        return lines
+
+    def _tight(self, prev, tok) -> bool:
+        if tok in _TIGHT_BEFORE or prev in _TIGHT_AFTER:
+            return True
+        return tok == "(" and prev not in self.keywords and (prev[-1].isalnum() or prev[-1] == "_")
+
+
+class CorpusGenerator:
+    """
+    Args:
+        seed: semilla; la misma semilla y parámetros producen el mismo corpus.
+        procs: número de procedimientos.
+        stmts: sentencias de relleno por procedimiento.
+        depth: profundidad máxima de anidamiento de bucles.
+        expr_len: operandos por expresión de relleno.
+        recursion: fracción de procedimientos recursivos.
+        patterns: formas recursivas a usar (ver RECURSION_PATTERNS).
+        classes: número de declaraciones de clase al principio.
+    """
+
+    def __init__(self, seed: int = 0, procs: int = 100, stmts: int = 10, depth: int = 3,
+                 expr_len: int = 3, recursion: float = 0.25,
+                 patterns: Tuple[str, ...] = RECURSION_PATTERNS, classes: int = 0):
+        _check_grammar()
+        unknown = set(patterns) - set(RECURSION_PATTERNS)
+        if unknown:
+            raise ValueError(f"patrones de recursión desconocidos: {sorted(unknown)}")
+        self.seed = seed
+        self.procs = procs
+        self.stmts = stmts
+        self.depth = depth
+        self.expr_len = max(1, expr_len)
+        self.recursion = recursion
+        self.patterns = tuple(patterns)
+        self.classes = classes
+        self.g = GrammarSampler()
+
+    # --- API ---
+    def iter_program(self) -> Iterator[Tuple[str, Optional[Dict[str, Any]]]]:
+        """
+        Produce (texto, registro del manifiesto) en orden; las clases van
+        primero y su registro es None.
+        """
+        rng = random.Random(self.seed)
+        line = 1
+        for c in range(self.classes):
+            lines = self.g.render(self._class(rng, f"C{c}"))
+            line += len(lines) + 1
+            yield "\n".join(lines) + "\n\n", None
+
+        constant_procs: List[str] = []
+        for idx in range(self.procs):
+            if self.patterns and rng.random() < self.recursion:
+                kind = rng.choice(self.patterns)
+                depth = 0 if kind == "binary" else rng.randint(0, min(self.depth, 2))
+            else:
+                kind = "loops"
+                depth = rng.randint(0, self.depth)
+            name = f"P{idx}"
+            lines = self.g.render(self._procedure(rng, name, kind, depth, constant_procs))
+            record = {"name": name, "line": line, "kind": kind, "depth": depth,
+                      "expected": {"big_theta": format_cost(expected_cost(kind, depth))}}
+            line += len(lines) + 1
+            if kind == "loops" and depth == 0:
+                constant_procs.append(name)
+            yield "\n".join(lines) + "\n\n", record
+
+    def write(self, path: str, manifest_path: Optional[str] = None) -> int:
+        """Escribe el corpus (y el manifiesto JSON Lines). Devuelve los bytes escritos."""
+        written = 0
+        manifest = open(manifest_path, "w", encoding="utf-8") if manifest_path else None
+        try:
+            with open(path, "w", encoding="utf-8") as out:
+                for text, record in self.iter_program():
+                    out.write(text)
+                    written += len(text.encode("utf-8"))
+                    if manifest is not None and record is not None:
+                        manifest.write(json.dumps(record) + "\n")
+        finally:
+            if manifest is not None:
+                manifest.close()
+        return written
+
+    def source(self) -> str:
+        return "".join(text for text, _ in self.iter_program())
+
+    # --- esqueleto, con producciones de la gramática ---
+    def _class(self, rng, name):
+        state = _Derivation(rng, [], [], self.expr_len)
+        attrs = [[state.terminal("IDENTIFIER", "attribute_list")]
+                 for _ in range(rng.randint(1, 4))]
+        return self.g.build("class_decl", ("IDENTIFIER", [name]),
+                            ("attribute_list", self.g.seq("attribute_list", "IDENTIFIER", attrs)))
+
+    def _procedure(self, rng, name, kind, depth, callees):
+        g = self.g
+        if kind == "divide_conquer":
+            params = ["A", "lo", "hi"]
+        elif kind == "loops":
+            params = ["A", "n"]
+        else:
+            params = ["n"]
+        names = [p for p in params if p != "A"]
+        state = _Derivation(rng, names, [f"x{k}" for k in range(10)] + ["t"], self.expr_len)
+
+        if kind == "loops":
+            pre = self.stmts // 3
+            body = self._filler(state, pre, callees)
+            body += self._loop_nest(state, depth, "1", "n", self.stmts - pre, callees)
+            body.append(self._stmt("return_stmt", ("expr", g.derive("expr", state, FILLER_BANNED))))
+        elif kind == "binary":
+            calls = [self._call_expr(name, [["n", "-", "1"]]), ["+"],
+                     self._call_expr(name, [["n", "-", "2"]])]
+            body = [self._base_case("n <= 1".split(), "n".split())]
+            body += self._filler(state, self.stmts, callees)
+            body.append(self._assign(["x"], [t for part in calls for t in part]))
+            body.append(self._stmt("return_stmt", ("expr", ["x"])))
+        elif kind == "linear":
+            body = [self._base_case("n <= 1".split(), ["1"])]
+            body += self._filler(state, self.stmts, callees)
+            body.append(self._call_stmt(name, [["n", "-", "1"]]))
+            if depth:
+                body += self._loop_nest(state, depth, "1", "n", 1, callees)
+            body.append(self._stmt("return_stmt", ("expr", g.derive("expr", state, FILLER_BANNED))))
+        else:
+            body = [self._base_case("lo >= hi".split(), None)]
+            body.append(self._assign(["mid"], "( lo + hi ) div 2".split()))
+            body.append(self._call_stmt(name, [["A"], ["lo"], ["mid"]]))
+            body.append(self._call_stmt(name, [["A"], "mid + 1".split(), ["hi"]]))
+            body += self._loop_nest(state, depth, "lo", "hi", max(1, self.stmts), callees)
+        param_list = g.seq("param_list", "param", [g.build("param", ("IDENTIFIER", [p]))
+                                                     for p in params])
+        return g.build("procedure", ("IDENTIFIER", [name]), ("param_list", param_list),
+                       ("block", self._block(body)))
+
+    def _block(self, stmts):
+        return self.g.build("block", ("stmt_list", self._stmt_list(stmts)))
+
+    def _stmt_list(self, stmts):
+        return self.g.seq("stmt_list", "statement", stmts)
+
+    def _stmt(self, origin, *children):
+        return self.g.build("statement", (origin, self.g.build(origin, *children)))
+
+    def _assign(self, target, value):
+        target = self.g.build("lvalue", ("IDENTIFIER", target))
+        return self._stmt("assign_stmt", ("lvalue", target), ("ASSIGN", ["<-"]), ("expr", value))
+
+    def _call_expr(self, name, args):
+        return self.g.build("call_expr", ("IDENTIFIER", [name]),
+                            ("arg_list", self.g.seq("arg_list", "expr", args)))
+
+    def _call_stmt(self, name, args):
+        return self._stmt("call_stmt", ("IDENTIFIER", [name]),
+                          ("arg_list", self.g.seq("arg_list", "expr", args)))
+
+    def _base_case(self, cond, value):
+        ret = self._stmt("return_stmt", ("expr", value)) if value else self._stmt("return_stmt")
+        return self._stmt("if_stmt", ("condition", self.g.build("condition", ("expr", cond))),
+                          ("block", self._block([ret])))
+
+    def _loop_nest(self, state, depth, lo, hi, inner, callees):
+        """`depth` bucles anidados de lo a hi con el relleno en el más interno."""
+        if depth == 0:
+            return self._filler(state, max(1, inner), callees)
+        g = self.g
+        var = f"i{depth}"
+        state.names = state.names + [var]
+        body = self._loop_nest(state, depth - 1, lo, hi, inner, callees)
+        state.names = state.names[:-1]
+        form = state.rng.choice(("for", "for", "while", "repeat"))
+        if form == "for":
+            return [self._stmt("for_stmt", ("IDENTIFIER", [var]), ("ASSIGN", ["<-"]),
+                               ("expr", [lo]), ("expr", [hi]), ("block", self._block(body)))]
+        body.append(self._assign([var], [var, "+", "1"]))
+        if form == "while":
+            loop = self._stmt("while_stmt",
+                              ("condition", g.build("condition", ("expr", [var, "<=", hi]))),
+                              ("block", self._block(body)))
+        else:
+            loop = self._stmt("repeat_stmt", ("stmt_list", self._stmt_list(body)),
+                              ("condition", g.build("condition", ("expr", [var, ">", hi]))))
+        return [self._assign([var], [lo]), loop]
+
+    # --- relleno O(1), derivado de `statement` ---
+    def _filler(self, state, count, callees):
+        out = []
+        for _ in range(count):
+            if callees and state.rng.random() < 0.1:
+                args = [["A"], self.g.derive("expr", state, FILLER_BANNED)]
+                out.append(self._call_stmt(state.rng.choice(callees), args))
+            else:
+                out.append(self.g.derive("statement", state, FILLER_BANNED))
+        return out
@@ -1,21 +1,172 @@
 import graphviz
-from typing import Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+import hashlib
 import os
+import subprocess
+import threading
+
+from .call_graph import format_cost
+from .cfg import CFG, ENTRY, EXIT, build_cfg
+from .expr_printer import display
+
+# Diseño según los nodos visibles: splines ortogonales sólo en grafos
+# chicos (son la parte cara de `dot`); en los grandes, aristas rectas y
+# menos iteraciones de rangos y cruces.
+LAYOUTS = (
+    (150, {"splines": "ortho", "nodesep": "0.5", "ranksep": "0.5"}),
+    (600, {"splines": "polyline", "nodesep": "0.35", "ranksep": "0.35"}),
+    (None, {"splines": "line", "nodesep": "0.25", "ranksep": "0.25",
+            "nslimit": "2", "nslimit1": "2", "mclimit": "0.2", "searchsize": "10"}),
+)
+NODE_BUDGET = 400        # nodos visibles por diagrama antes de resumir regiones
+RENDER_TIMEOUT = 60.0    # segundos por render
+FALLBACK_BUDGET = 60     # vista resumida que se dibuja si se agota el tiempo
+
+
+def _layout(nodes: int) -> Dict[str, str]:
+    for limit, attrs in LAYOUTS:
+        if limit is None or nodes <= limit:
+            return attrs
+
+
+def _pipe(engine: str, fmt: str, data: bytes, timeout: Optional[float]) -> bytes:
+    # graphviz.pipe no acepta timeout: se ejecuta el motor directamente.
+    # Al vencer, subprocess.run lo mata y lanza subprocess.TimeoutExpired.
+    return subprocess.run([engine, f"-T{fmt}"], input=data, capture_output=True,
+                          timeout=timeout, check=True).stdout
+
+
+def _render(job):
+    """Renderiza un DOT con el ejecutable de Graphviz (bytes del formato pedido)."""
+    source, fmt, engine, timeout = job
+    if fmt in ("dot", "gv"):
+        return source.encode("utf-8")
+    return _pipe(engine, fmt, source.encode("utf-8"), timeout)
+
+
+def _digest(source: str, fmt: str, engine: str, view: str = "full") -> str:
+    """Hash de lo que produjo un diagrama; `view` es "full" o "collapsed"."""
+    return hashlib.sha256(f"{engine}\0{fmt}\0{view}\0{source}".encode("utf-8")).hexdigest()
+
+
+class _View:
+    """
+    Nivel de detalle de un CFG. Los IF y bucles de nivel >= `cut` (1 = los
+    del cuerpo del procedimiento) se dibujan como un único nodo resumen;
+    `cut` baja desde max_depth + 1 hasta que los nodos visibles caben en
+    `budget`. Si ni así caben, cada bloque se compacta en una caja y, como
+    último recurso, todo el cuerpo queda en un resumen (cut = 0).
+
+    rep[b]        bloque que representa a b en el diagrama (b si es visible)
+    summaries     bloque resumen -> fin (exclusivo) de su rango
+    compact       una caja por bloque en lugar de una por sentencia
+    nodes         nodos visibles (START y END incluidos)
+    """
+
+    def __init__(self, cfg: CFG, budget: Optional[int], max_depth: Optional[int]):
+        self.cfg = cfg
+        n = len(cfg)
+        self.level = _region_levels(cfg)
+        self.drawn = [sum(1 for s in cfg.stmts[b] if s.get("type") in _DRAWN) for b in range(n)]
+        top = max(self.level, default=0) + 1
+        self.cut = top if max_depth is None else max(0, min(top, max_depth + 1))
+        self.compact = False
+        while True:
+            self._collapse()
+            if budget is None or self.nodes <= budget or self.cut == 0:
+                break
+            if self.cut > 1:
+                self.cut -= 1
+            elif not self.compact:
+                self.compact = True
+            else:
+                self.cut = 0
+
+    def _collapse(self):
+        cfg, n = self.cfg, len(self.cfg)
+        rep = list(range(n))
+        self.summaries: Dict[int, int] = {}
+        if self.cut == 0:
+            first = EXIT + 1
+            rep[first:] = [first] * (n - first)
+            self.summaries[first] = n
+        else:
+            owner, stop = -1, -1
+            for b in range(n):
+                if b < stop:
+                    rep[b] = owner
+                elif self.level[b] >= self.cut:
+                    owner, stop = b, cfg.end[b]
+                    self.summaries[b] = stop
+        self.rep = rep
+
+        nodes = 0
+        for b in range(n):
+            if rep[b] != b:
+                continue
+            if b in self.summaries or cfg.kind[b] != "block":
+                nodes += 1
+            else:
+                nodes += 1 if self.compact else max(1, self.drawn[b])
+        self.nodes = nodes
+
+
+# Sentencias que tienen nodo propio en el diagrama.
+_DRAWN = ("Assign", "Return", "Call")
+
+
+def _region_levels(cfg: CFG) -> List[int]:
+    """Nivel de anidamiento de cada IF / bucle (1 = cuerpo del procedimiento); 0 en el resto."""
+    level = [0] * len(cfg)
+    open_ends: List[int] = []
+    for b in range(len(cfg)):
+        while open_ends and b >= open_ends[-1]:
+            open_ends.pop()
+        if cfg.end[b] != -1:
+            open_ends.append(cfg.end[b])
+            level[b] = len(open_ends)
+    return level
 
 
 class TraceGenerator:
     """
     Generador de Diagramas de Flujo de Control (CFG) de alta calidad.
-    - Usa estilos ortogonales.
-    - Reconstruye expresiones del AST para las etiquetas.
+    - Usa estilos ortogonales (en grafos chicos; ver LAYOUTS).
+    - Dibuja el CFG de cada procedimiento (analyzer.cfg); las aristas de
+      retorno de los bucles no restringen el orden de los rangos.
+    - Reconstruye expresiones del AST para las etiquetas (expr_printer.display).
     - Aplica paleta de colores semántica.
+
+    El DOT de cada procedimiento se construye en el proceso actual y el
+    render (un proceso `dot` por diagrama) corre en un pool de hilos. Junto a
+    cada archivo se guarda `<archivo>.sha256` con el hash de su DOT: si no
+    cambió, el diagrama no se vuelve a renderizar.
+
+    Nivel de detalle: los IF y bucles anidados más allá de `max_depth`, o
+    los necesarios para no pasar de `node_budget` nodos, se dibujan como un
+    nodo resumen con sus sentencias y su costo estimado. Cada render tiene
+    `timeout` segundos; si se agota, se dibuja la vista resumida.
     """
 
-    def __init__(self, ast: Dict[str, Any], output_format='png'):
+    def __init__(self, ast: Dict[str, Any], output_format='png', output_dir: Optional[str] = None,
+                 engine: str = "dot", context: Optional[Dict[str, Any]] = None,
+                 max_depth: Optional[int] = None, node_budget: Optional[int] = NODE_BUDGET,
+                 timeout: Optional[float] = RENDER_TIMEOUT):
         self.ast = ast
+        # Salida de analyze_ast_for_patterns (opcional). El CFG no viaja en
+        # sus datos: cfg_for lo toma de PatternContext.cfg si está.
+        self.context = context
         self.format = output_format
+        # None -> <cwd>/docs/diagrams al generar.
+        self.output_dir = output_dir
+        self.engine = engine
+        self.max_depth = max_depth
+        self.node_budget = node_budget
+        self.timeout = timeout
         self.graph = None
         self.node_count = 0
+        self._lock = threading.Lock()
 
         # Paleta de Colores "Engineering"
         self.style = {
@@ -31,51 +182,151 @@ class TraceGenerator:
             "loop":    {"shape": "hexagon",  "style": "filled", "fillcolor": "#B3E5FC", "fontname": "Consolas-Bold"},
             # Violeta
             "call":    {"shape": "component", "style": "filled", "fillcolor": "#E1BEE7", "fontname": "Consolas"},
+            # Gris: región resumida
+            "summary": {"shape": "box3d", "style": "filled", "fillcolor": "#ECEFF1", "fontname": "Consolas"},
             "edge":    {"fontname": "Arial", "fontsize": "10", "color": "#546E7A"}
         }
 
-    def generate(self):
-        procs = self.ast.get("procedures", [])
-        base_output_dir = os.path.join(os.getcwd(), 'docs', 'diagrams')
-        if not os.path.exists(base_output_dir):
-            os.makedirs(base_output_dir, exist_ok=True)
+    def sources(self) -> Dict[str, str]:
+        """Nombre del procedimiento -> fuente DOT."""
+        return {proc.get("name", "Unknown"): self.build_graph(proc).source
+                for proc in self.ast.get("procedures", [])}
 
-        for proc in procs:
+    def render_bytes(self, output_format: str = "svg", workers: Optional[int] = None) -> Dict[str, bytes]:
+        """
+        Modo en memoria: nombre -> bytes del diagrama ("dot" devuelve la
+        fuente DOT sin invocar Graphviz). No toca el disco.
+        """
+        procs = self.ast.get("procedures", [])
+        jobs = [(proc, self.build_graph(proc).source, output_format) for proc in procs]
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+            rendered = pool.map(lambda job: self._render_proc(*job)[0], jobs)
+            return dict(zip((p.get("name", "Unknown") for p in procs), rendered))
+
+    def generate(self, workers: Optional[int] = None, force: bool = False) -> Dict[str, str]:
+        """
+        Escribe `<output_dir>/<proc>_trace.<formato>` por procedimiento.
+
+        Returns:
+            nombre -> "rendered" | "collapsed" (se agotó `timeout` y se
+            escribió la vista resumida) | "skipped" (hash sin cambios) | "error"
+        """
+        base_output_dir = self.output_dir or os.path.join(os.getcwd(), 'docs', 'diagrams')
+        os.makedirs(base_output_dir, exist_ok=True)
+
+        status, pending = {}, []
+        for proc in self.ast.get("procedures", []):
             proc_name = proc.get("name", "Unknown")
-            # Configuración Global del Grafo
-            self.graph = graphviz.Digraph(
-                f'cluster_{proc_name}', format=self.format)
-            self.graph.attr(
-                rankdir='TB',
-                splines='ortho',     # Líneas ortogonales (rectas)
-                nodesep='0.5',
-                ranksep='0.5',
-                fontname='Helvetica',
-                label=f'CFG: {proc_name}',
-                labelloc='t'
-            )
-            self.node_count = 0
-
-            # --- Inicio ---
-            params = ", ".join([p['name'] for p in proc.get('params', [])])
-            start_label = f"START\n{proc_name}({params})"
-            start_node = self._add_node(start_label, **self.style["start"])
-
-            # --- Cuerpo ---
-            last_node = self._visit_block(proc.get("body", []), start_node)
-
-            # --- Fin ---
-            end_node = self._add_node("END", **self.style["end"])
-            if last_node:
-                self.graph.edge(last_node, end_node, **self.style["edge"])
-
-            # --- Render ---
-            output_path = os.path.join(base_output_dir, f"{proc_name}_trace")
+            source = self.build_graph(proc).source
+            output_path = os.path.join(base_output_dir, f"{proc_name}_trace.{self.format}")
+            digest = _digest(source, self.format, self.engine)
+            if not force and os.path.exists(output_path) and _read(output_path + ".sha256") == digest:
+                status[proc_name] = "skipped"
+                continue
+            pending.append((proc, proc_name, source, output_path, digest))
+
+        def render_one(item):
+            proc, proc_name, source, output_path, digest = item
             try:
-                self.graph.render(output_path, cleanup=True)
-                print(f" ✨ Diagrama PRO generado: {output_path}.{self.format}")
-            except graphviz.backend.ExecutableNotFound:
-                print("⚠️ ERROR: Graphviz no está instalado o no está en el PATH.")
+                data, collapsed = self._render_proc(proc, source, self.format)
+            except FileNotFoundError:
+                return proc_name, "error", "⚠️ ERROR: Graphviz no está instalado o no está en el PATH."
+            except subprocess.CalledProcessError as e:
+                return proc_name, "error", f"⚠️ ERROR al renderizar {proc_name}: {e}"
+            except subprocess.TimeoutExpired:
+                return proc_name, "error", f"⚠️ ERROR: {proc_name} superó {self.timeout} s incluso resumido."
+            _write(output_path, data)
+            # El hash se escribe después del diagrama: si se interrumpe, se re-renderiza.
+            # El de la vista resumida no coincide con el de la completa, que
+            # se vuelve a intentar en la próxima pasada.
+            if collapsed:
+                digest = _digest(source, self.format, self.engine, "collapsed")
+            _write(output_path + ".sha256", digest.encode("ascii"))
+            if collapsed:
+                return proc_name, "collapsed", f" ⏱️ Diagrama resumido (timeout): {output_path}"
+            return proc_name, "rendered", f" ✨ Diagrama PRO generado: {output_path}"
+
+        if pending:
+            with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+                for proc_name, result, message in pool.map(render_one, pending):
+                    status[proc_name] = result
+                    print(message)
+        return status
+
+    def _render_proc(self, proc, source: str, fmt: str):
+        """(bytes, resumido). Si el render supera `timeout`, se reintenta con la vista resumida."""
+        try:
+            return _render((source, fmt, self.engine, self.timeout)), False
+        except subprocess.TimeoutExpired:
+            # build_graph usa el estado del generador: un hilo a la vez.
+            with self._lock:
+                fallback = self.build_graph(proc, fallback=True).source
+            return _render((fallback, fmt, self.engine, self.timeout)), True
+
+    def build_graph(self, proc, cfg: Optional[CFG] = None, fallback: bool = False):
+        """
+        Construye el Digraph (DOT) de un procedimiento a partir de su CFG, sin
+        renderizarlo. Con `fallback` usa el presupuesto FALLBACK_BUDGET y el
+        diseño más barato (la vista que se dibuja cuando se agota el tiempo).
+        """
+        proc_name = proc.get("name", "Unknown")
+        cfg = cfg or self.cfg_for(proc)
+        view = _View(cfg, FALLBACK_BUDGET if fallback else self.node_budget,
+                     0 if fallback else self.max_depth)
+
+        # Configuración Global del Grafo
+        self.graph = graphviz.Digraph(
+            f'cluster_{proc_name}', format=self.format)
+        self.graph.attr(
+            rankdir='TB',
+            fontname='Helvetica',
+            label=f'CFG: {proc_name}',
+            labelloc='t',
+            **(LAYOUTS[-1][1] if fallback else _layout(view.nodes))
+        )
+        self.node_count = 0
+
+        # --- Inicio ---
+        params = ", ".join([p['name'] for p in proc.get('params', [])])
+        start_label = f"START\n{proc_name}({params})"
+
+        # --- Cuerpo: un grupo de nodos por bloque visible del CFG ---
+        rep = view.rep
+        ends = [None] * len(cfg)
+        ends[ENTRY] = (self._add_node(start_label, **self.style["start"]),) * 2
+        for b in range(len(cfg)):
+            if b in (ENTRY, EXIT) or rep[b] != b:
+                continue
+            if b in view.summaries:
+                node = self._summary_node(cfg, b, view.summaries[b])
+                ends[b] = (node, node)
+            else:
+                ends[b] = self._draw_block(cfg, b, view.compact)
+
+        # --- Fin ---
+        ends[EXIT] = (self._add_node("END", **self.style["end"]),) * 2
+
+        back = set(cfg.back_edges())
+        drawn = set()
+        for a, b, label in cfg.edges():
+            ra, rb = rep[a], rep[b]
+            # Aristas internas de una región resumida, o repetidas al resumir.
+            if ra == rb or (ra, rb) in drawn:
+                continue
+            drawn.add((ra, rb))
+            attrs = dict(self.style["edge"])
+            if label and ra == a:
+                attrs["label"] = label
+            if (a, b) in back:
+                attrs["constraint"] = "false"
+            self.graph.edge(ends[ra][1], ends[rb][0], **attrs)
+        return self.graph
+
+    def cfg_for(self, proc) -> CFG:
+        """El CFG que ya construyó el análisis (`context`), o uno nuevo."""
+        cached = getattr(self.context, "cfg", None)
+        cfg = cached(proc) if cached is not None else None
+        return cfg if cfg is not None else build_cfg(proc)
 
     def _add_node(self, label, **kwargs):
         node_id = f"node_{self.node_count}"
@@ -85,161 +336,98 @@ class TraceGenerator:
         self.graph.node(node_id, label=clean_label, **kwargs)
         return node_id
 
-    def _visit_block(self, stmts, previous_node):
-        current = previous_node
-        for stmt in stmts:
-            typ = stmt.get("type")
-
-            # 1. ASIGNACIÓN
-            if typ == "Assign":
-                target = self._expr_to_str(stmt.get('target'))
-                value = self._expr_to_str(stmt.get('value'))
-                label = f"{target} 🡨 {value}"
-                node = self._add_node(label, **self.style["process"])
-                self.graph.edge(current, node, **self.style["edge"])
-                current = node
-
-            # 2. IF / ELSE
-            elif typ == "If":
-                cond_txt = self._expr_to_str(stmt.get('cond'))
-                cond_node = self._add_node(
-                    f"¿{cond_txt}?", **self.style["decision"])
-                self.graph.edge(current, cond_node, **self.style["edge"])
-
-                # True Path
-                true_start = self._add_node(
-                    "THEN", shape="point", width="0.01")
-                self.graph.edge(cond_node, true_start,
-                                label="T", **self.style["edge"])
-                true_end = self._visit_block(stmt.get("then", []), true_start)
-
-                # False Path
-                false_start = self._add_node(
-                    "ELSE", shape="point", width="0.01")
-                self.graph.edge(cond_node, false_start,
-                                label="F", **self.style["edge"])
-                false_end = self._visit_block(
-                    stmt.get("else_", []), false_start)
-
-                # Join
-                join_node = self._add_node(
-                    "", shape="circle", width="0.1", style="filled", fillcolor="black")
-
-                if true_end:
-                    self.graph.edge(true_end, join_node)
-                else:
-                    self.graph.edge(true_start, join_node)  # Si bloque vacío
-
-                if false_end:
-                    self.graph.edge(false_end, join_node)
-                else:
-                    self.graph.edge(false_start, join_node)  # Si bloque vacío
-
-                current = join_node
-
-            # 3. FOR LOOP
-            elif typ == "For":
-                var = stmt.get('var')
-                start = self._expr_to_str(stmt.get('start'))
-                end = self._expr_to_str(stmt.get('end'))
-
-                # Nodo Header
-                loop_header = self._add_node(
-                    f"FOR {var} 🡨 {start} TO {end}", **self.style["loop"])
-                self.graph.edge(current, loop_header, **self.style["edge"])
-
-                # Cuerpo
-                body_start = self._add_node("", shape="point", width="0.01")
-                self.graph.edge(loop_header, body_start,
-                                label="Do", **self.style["edge"])
-                body_end = self._visit_block(stmt.get("body", []), body_start)
-
-                # Retorno al ciclo
-                if body_end:
-                    self.graph.edge(body_end, loop_header, label="Next",
-                                    constraint="false", **self.style["edge"])
-                else:
-                    self.graph.edge(body_start, loop_header, label="Next",
-                                    constraint="false", **self.style["edge"])
-
-                # Salida
-                exit_node = self._add_node(
-                    "", shape="circle", width="0.1", style="filled", fillcolor="black")
-                self.graph.edge(loop_header, exit_node,
-                                label="Done", **self.style["edge"])
-                current = exit_node
-
-            # 4. WHILE LOOP
-            elif typ == "While":
-                cond = self._expr_to_str(stmt.get('cond'))
-                loop_header = self._add_node(
-                    f"WHILE {cond}", **self.style["loop"])
-                self.graph.edge(current, loop_header, **self.style["edge"])
-
-                body_start = self._add_node("", shape="point", width="0.01")
-                self.graph.edge(loop_header, body_start,
-                                label="True", **self.style["edge"])
-                body_end = self._visit_block(stmt.get("body", []), body_start)
-
-                if body_end:
-                    self.graph.edge(body_end, loop_header, label="Loop",
-                                    constraint="false", **self.style["edge"])
-                else:
-                    self.graph.edge(body_start, loop_header, label="Loop",
-                                    constraint="false", **self.style["edge"])
-
-                exit_node = self._add_node(
+    def _head_label(self, cfg, b) -> str:
+        """Etiqueta de un bloque cond / until / loop."""
+        kind, stmt = cfg.kind[b], cfg.node[b]
+        if kind == "cond":
+            return f"¿{display(stmt.get('cond'))}?"
+        if kind == "until":
+            return f"¿UNTIL {display(stmt.get('cond'))}?"
+        typ = stmt.get("type")
+        if typ == "For":
+            return (f"FOR {stmt.get('var')} 🡨 {display(stmt.get('start'))} "
+                    f"TO {display(stmt.get('end'))}")
+        if typ == "While":
+            return f"WHILE {display(stmt.get('cond'))}"
+        return "REPEAT"
+
+    def _summary_node(self, cfg, b, stop: int):
+        """
+        Nodo que resume los bloques [b, stop): cabecera, número de
+        sentencias y costo estimado por los bucles que contiene.
+        """
+        blocks = range(b, stop)
+        count = sum(len(cfg.stmts[x]) + (cfg.kind[x] in ("cond", "loop")) for x in blocks)
+        if cfg.kind[b] in ("cond", "loop"):
+            head = self._head_label(cfg, b)
+            outer = cfg.depth[b] - (cfg.kind[b] == "loop")
+        else:
+            head, outer = "CUERPO", 0
+        loops = max(cfg.depth[x] for x in blocks) - outer
+        label = f"{head}\n[{count} sentencias · {format_cost((None, loops, 0))}]"
+        return self._add_node(label, **self.style["summary"])
+
+    def _draw_block(self, cfg, b, compact: bool = False):
+        """Nodos DOT del bloque b: (primero, último)."""
+        kind = cfg.kind[b]
+        if kind in ("cond", "until"):
+            node = self._add_node(self._head_label(cfg, b), **self.style["decision"])
+            return node, node
+        if kind == "loop":
+            node = self._add_node(self._head_label(cfg, b), **self.style["loop"])
+            return node, node
+
+        labels = [lab for lab in map(self._stmt_label, cfg.stmts[b]) if lab is not None]
+        if compact and len(labels) > 1:
+            # Vista compacta: una sola caja por bloque.
+            node = self._add_node(f"{labels[0][0]} …\n[{len(labels)} sentencias]",
+                                  **self.style["summary"])
+            return node, node
+        first = last = None
+        for label, style in labels:
+            node = self._add_node(label, **style)
+            if last is None:
+                first = node
+            else:
+                self.graph.edge(last, node, **self.style["edge"])
+            last = node
+        if first is None:
+            # Bloque vacío: unión (círculo negro) o inicio de rama (punto).
+            if len(cfg.pred[b]) > 1:
+                first = last = self._add_node(
                     "", shape="circle", width="0.1", style="filled", fillcolor="black")
-                self.graph.edge(loop_header, exit_node,
-                                label="False", **self.style["edge"])
-                current = exit_node
-
-            # 5. RETURN
-            elif typ == "Return":
-                val = self._expr_to_str(stmt.get('value'))
-                label = f"RETURN {val}" if val else "RETURN"
-                node = self._add_node(
-                    label, shape="parallelogram", style="filled", fillcolor="#FFCDD2")
-                self.graph.edge(current, node, **self.style["edge"])
-                current = node
-
-            # 6. CALL
-            elif typ == "Call":
-                name = stmt.get('name')
-                args = ", ".join([self._expr_to_str(a)
-                                 for a in stmt.get('args', [])])
-                node = self._add_node(
-                    f"CALL {name}({args})", **self.style["call"])
-                self.graph.edge(current, node, **self.style["edge"])
-                current = node
-
-        return current
-
-    # --- ESTA ES LA FUNCIÓN QUE FALTABA ---
-    def _expr_to_str(self, node):
-        """Reconstruye una expresión AST a string legible"""
-        if not isinstance(node, dict):
-            return str(node)
-
-        t = node.get("type")
-        if t == "Identifier":
-            return node.get("name")
-        if t == "LValue":
-            return node.get("name")
-        if t == "Number":
-            return str(node.get("value"))
-        if t == "Literal":
-            return str(node.get("value"))
-        if t == "BinOp":
-            op = node.get('op') or "?"
-            return f"{self._expr_to_str(node['left'])} {op} {self._expr_to_str(node['right'])}"
-        if t == "Unary":
-            return f"{node['op']}{self._expr_to_str(node['expr'])}"
-        if t == "Call":
-            args = ", ".join([self._expr_to_str(a)
-                             for a in node.get('args', [])])
-            return f"{node.get('name')}({args})"
-        if t == "ArrayAccess":
-            return f"{node.get('name')}[{self._expr_to_str(node.get('index'))}]"
-
-        return "?"
+            else:
+                first = last = self._add_node("", shape="point", width="0.01")
+        return first, last
+
+    def _stmt_label(self, stmt):
+        """(etiqueta, estilo) de una sentencia simple, o None si no se dibuja."""
+        typ = stmt.get("type")
+        if typ == "Assign":
+            target = display(stmt.get('target'))
+            value = display(stmt.get('value'))
+            return f"{target} 🡨 {value}", self.style["process"]
+        if typ == "Return":
+            val = display(stmt.get('value')) if stmt.get('value') is not None else ""
+            label = f"RETURN {val}" if val else "RETURN"
+            return label, {"shape": "parallelogram", "style": "filled", "fillcolor": "#FFCDD2"}
+        if typ == "Call":
+            args = ", ".join([display(a) for a in stmt.get('args', [])])
+            return f"CALL {stmt.get('name')}({args})", self.style["call"]
+        return None
+
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, encoding="ascii") as f:
+            return f.read().strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _write(path: str, data: bytes) -> None:
+    # Escritura atómica: nunca queda un diagrama a medio escribir.
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
@@ -0,0 +1,540 @@
+# src/analyzer/empirical.py
+"""
+Validación empírica de big_theta ejecutando los procedimientos.
+
+Cada Procedure se compila una vez a closures de Python (una por nodo) que
+cuentan operaciones elementales: una por sentencia ejecutada y una por
+evaluación de la condición de un bucle. El procedimiento se ejecuta para un
+barrido geométrico de tamaños n (en paralelo, un tamaño por tarea) con
+entradas generadas a partir de los parámetros:
+
+    - arreglos (parámetros indexados, usados en length() o de tipo list):
+      n enteros pseudoaleatorios en las posiciones 0..n;
+    - límites inferiores (left, lo, low, i, row, col, ...): 1;
+    - valores buscados (x, key, target, ...): -1, que no aparece en el arreglo;
+    - el resto: n.
+
+Las ejecuciones que superan `max_ops` (o la pila) se descartan; como el
+costo crece con n, el barrido se corta en el primer tamaño que se pasa.
+Los procesos del pool suben el límite de recursión a RECURSION_LIMIT al
+arrancar; en el proceso actual (workers=1) se respeta el límite vigente.
+validate_empirically usa un solo pool para todos los procedimientos.
+
+Con los puntos (n, ops) se ajusta log(ops) = log c + log g(n) para cada
+clase candidata (1, log n, n, n log n, n^2, n^3, 2^n, phi^n y la propia
+big_theta si no está entre ellas) y se elige la de menor error cuadrático
+medio (sólo con n >= 2: log log n no está definido en 1). Con NumPy el ajuste es una sola operación matricial; sin NumPy se
+calcula igual en Python puro.
+"""
+import math
+import os
+import random
+import sys
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional
+    np = None
+
+from .ast_nodes import is_node, to_dict
+from .call_graph import Cost, format_cost, parse_cost
+from .recurrence import PHI
+
+DEFAULT_SIZES = tuple(sorted({round(4 * 2 ** (i / 2)) for i in range(17)}))  # 4 .. 1024
+DEFAULT_MAX_OPS = 1_000_000
+MIN_POINTS = 4
+RECURSION_LIMIT = 50_000
+# Margen (en error log) con el que la clase declarada se considera compatible.
+TOLERANCE = 0.05
+
+CANDIDATES: Tuple[Cost, ...] = (
+    (None, 0, 0), (None, 0, 1), (None, 1, 0), (None, 1, 1),
+    (None, 2, 0), (None, 3, 0), ("2^n", 0, 0), ("phi^n", 0, 0),
+)
+
+_LOWER_NAMES = frozenset(("left", "lo", "low", "l", "start", "inicio", "first", "i", "row", "col", "p", "from"))
+_KEY_NAMES = frozenset(("x", "key", "target", "value", "val", "elem", "item", "clave", "valor"))
+
+
+class _Budget(Exception):
+    """Se superó max_ops."""
+
+
+class _Array(dict):
+    """Arreglo disperso: las posiciones no asignadas valen 0."""
+    __slots__ = ("size",)
+
+    def __missing__(self, key):
+        return 0
+
+    def __len__(self):
+        return getattr(self, "size", None) or dict.__len__(self)
+
+
+# =============================================================================
+# COMPILACIÓN A CLOSURES
+# =============================================================================
+
+def _div(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        return a // b
+    return a / b
+
+
+_BINOPS: Dict[str, Callable[[Any, Any], Any]] = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": _div,
+    "div": lambda a, b: a // b,
+    "mod": lambda a, b: a % b,
+    "<": lambda a, b: a < b,
+    ">": lambda a, b: a > b,
+    "<=": lambda a, b: a <= b,
+    "≤": lambda a, b: a <= b,
+    ">=": lambda a, b: a >= b,
+    "≥": lambda a, b: a >= b,
+    "=": lambda a, b: a == b,
+    "<>": lambda a, b: a != b,
+    "≠": lambda a, b: a != b,
+}
+
+_UNARY: Dict[str, Callable[[Any], Any]] = {
+    "-": lambda a: -a,
+    "not": lambda a: not a,
+    "floor": math.floor,
+    "ceil": math.ceil,
+}
+
+
+class _Compiler:
+    """
+    Traduce los procedimientos de un programa a funciones de Python. Las
+    sentencias devuelven None o, tras un RETURN, una tupla (valor,).
+    """
+
+    def __init__(self, procedures: Iterable[Any], max_ops: int):
+        self.ops = 0
+        self.max_ops = max_ops
+        self._procs = {p.get("name"): p for p in procedures}
+        self._compiled: Dict[str, Callable] = {}
+
+    def tick(self):
+        self.ops += 1
+        if self.ops > self.max_ops:
+            raise _Budget()
+
+    def procedure(self, name: str) -> Callable:
+        fn = self._compiled.get(name)
+        if fn is None:
+            proc = self._procs[name]
+            params = [p.get("name") for p in proc.get("params", []) or []]
+            self._compiled[name] = lambda *args: fn(*args)  # recursión durante la compilación
+            body = self.block(proc.get("body", []))
+
+            def fn(*args):
+                ret = body(dict(zip(params, args)))
+                return ret[0] if ret is not None else None
+
+            self._compiled[name] = fn
+        return fn
+
+    # --- SENTENCIAS ---
+    def block(self, stmts) -> Callable:
+        compiled = tuple(self.stmt(s) for s in stmts or [] if is_node(s))
+
+        def run(env):
+            for s in compiled:
+                ret = s(env)
+                if ret is not None:
+                    return ret
+            return None
+        return run
+
+    def stmt(self, node) -> Callable:
+        typ = node.get("type")
+        tick = self.tick
+
+        if typ == "Assign":
+            store = self.store(node.get("target"))
+            value = self.expr(node.get("value"))
+
+            def assign(env):
+                tick()
+                store(env, value(env))
+            return assign
+
+        if typ == "If":
+            cond = self.expr(node.get("cond"))
+            then, else_ = self.block(node.get("then")), self.block(node.get("else_"))
+
+            def if_(env):
+                tick()
+                return then(env) if cond(env) else else_(env)
+            return if_
+
+        if typ == "For":
+            var = node.get("var")
+            start, end = self.expr(node.get("start")), self.expr(node.get("end"))
+            body = self.block(node.get("body"))
+
+            def for_(env):
+                tick()
+                i, last = start(env), end(env)
+                while i <= last:
+                    tick()
+                    env[var] = i
+                    ret = body(env)
+                    if ret is not None:
+                        return ret
+                    i = env[var] + 1
+                return None
+            return for_
+
+        if typ == "While":
+            cond = self.expr(node.get("cond"))
+            body = self.block(node.get("body"))
+
+            def while_(env):
+                tick()
+                while cond(env):
+                    tick()
+                    ret = body(env)
+                    if ret is not None:
+                        return ret
+                return None
+            return while_
+
+        if typ == "Repeat":
+            cond = self.expr(node.get("cond"))
+            body = self.block(node.get("body"))
+
+            def repeat(env):
+                while True:
+                    tick()
+                    ret = body(env)
+                    if ret is not None:
+                        return ret
+                    if cond(env):
+                        return None
+            return repeat
+
+        if typ == "Return":
+            value = self.expr(node.get("value")) if node.get("value") is not None else (lambda env: None)
+
+            def return_(env):
+                tick()
+                return (value(env),)
+            return return_
+
+        if typ == "Call":
+            call = self.expr(node)
+
+            def call_stmt(env):
+                tick()
+                call(env)
+            return call_stmt
+
+        if typ in ("ArrayDecl", "VarDecl", "ObjectDecl"):
+            name = node.get("name")
+            make = {"ArrayDecl": _Array, "VarDecl": int, "ObjectDecl": dict}[typ]
+
+            def decl(env):
+                tick()
+                env[name] = make()
+            return decl
+
+        def noop(env):
+            tick()
+        return noop
+
+    def store(self, target) -> Callable:
+        if target.get("type") == "ArrayAccess":
+            name, index = target.get("name"), self.expr(target.get("index"))
+
+            def store_item(env, value):
+                arr = env.get(name)
+                if not isinstance(arr, dict):
+                    arr = env[name] = _Array()
+                arr[index(env)] = value
+            return store_item
+        name = target.get("name")
+
+        def store_var(env, value):
+            env[name] = value
+        return store_var
+
+    # --- EXPRESIONES ---
+    def expr(self, node) -> Callable:
+        if not is_node(node):
+            return lambda env: node
+        typ = node.get("type")
+
+        if typ in ("Number", "Literal"):
+            value = node.get("value")
+            value = None if value == "NULL" else value
+            return lambda env: value
+
+        if typ in ("Identifier", "LValue"):
+            name = node.get("name")
+            return lambda env: env.get(name, 0)
+
+        if typ == "ArrayAccess":
+            name, index = node.get("name"), self.expr(node.get("index"))
+
+            def item(env):
+                arr = env.get(name)
+                return arr[index(env)] if isinstance(arr, dict) else 0
+            return item
+
+        if typ == "BinOp":
+            op = node.get("op")
+            left, right = self.expr(node.get("left")), self.expr(node.get("right"))
+            if op == "and":
+                return lambda env: left(env) and right(env)
+            if op == "or":
+                return lambda env: left(env) or right(env)
+            fn = _BINOPS.get(op)
+            if fn is None:
+                return lambda env: 0
+            return lambda env: fn(left(env), right(env))
+
+        if typ == "Unary":
+            fn, inner = _UNARY.get(node.get("op"), lambda a: a), self.expr(node.get("expr"))
+            return lambda env: fn(inner(env))
+
+        if typ == "Call":
+            name = node.get("name")
+            args = tuple(self.expr(a) for a in node.get("args", []) or [])
+            if name == "length" and len(args) == 1:
+                arg = args[0]
+                return lambda env: len(arg(env) or ())
+            if name not in self._procs:
+                return lambda env: 0
+            target = self.procedure(name)
+            return lambda env: target(*[a(env) for a in args])
+
+        return lambda env: 0
+
+
+# =============================================================================
+# ENTRADAS Y MEDICIÓN
+# =============================================================================
+
+def _array_names(proc) -> set:
+    """Nombres usados como arreglo en el cuerpo (A[i], length(A))."""
+    names = set()
+    stack = [proc.get("body", [])]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, list):
+            stack.extend(item)
+            continue
+        if not is_node(item):
+            continue
+        typ = item.get("type")
+        if typ == "ArrayAccess":
+            names.add(item.get("name"))
+        elif typ == "Call" and item.get("name") == "length":
+            names.update(a.get("name") for a in item.get("args", []) if is_node(a))
+        for key, value in item.items():
+            if isinstance(value, (list, dict)) or is_node(value):
+                stack.append(value)
+    return names
+
+
+def generate_inputs(proc, n: int, seed: int = 0) -> List[Any]:
+    """Argumentos de `proc` para tamaño n (deterministas para (seed, n))."""
+    rng = random.Random(seed * 1_000_003 + n)
+    arrays = _array_names(proc)
+    args = []
+    for p in proc.get("params", []) or []:
+        name = p.get("name")
+        low = name.lower()
+        if name in arrays or p.get("param_type") == "list":
+            arr = _Array((i, rng.randint(0, 4 * n)) for i in range(n + 1))
+            arr.size = n
+            args.append(arr)
+        elif low in _LOWER_NAMES:
+            args.append(1)
+        elif low in _KEY_NAMES:
+            args.append(-1)
+        else:
+            args.append(n)
+    return args
+
+
+def measure(program, proc_name: str, n: int, seed: int = 0,
+            max_ops: int = DEFAULT_MAX_OPS) -> Optional[int]:
+    """Operaciones de `proc_name` para tamaño n, o None si excede max_ops o la pila."""
+    procs = program.get("procedures", []) if is_node(program) else program
+    compiler = _Compiler(procs, max_ops)
+    proc = compiler._procs[proc_name]
+    fn = compiler.procedure(proc_name)
+    args = generate_inputs(proc, n, seed)
+    try:
+        fn(*args)
+    except (_Budget, RecursionError):
+        return None
+    except (ArithmeticError, TypeError, ValueError, KeyError):
+        # Entrada generada incompatible con el procedimiento.
+        return None
+    return compiler.ops
+
+
+def _init_worker():
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), RECURSION_LIMIT))
+
+
+def _pool(workers: int):
+    from .batch import _mp_context
+    return _mp_context().Pool(workers, initializer=_init_worker)
+
+
+def _workers(workers: Optional[int], jobs: int) -> int:
+    return min(workers or os.cpu_count() or 1, jobs)
+
+
+def _measure_job(job):
+    procs, proc_name, n, seed, max_ops = job
+    return n, measure(procs, proc_name, n, seed, max_ops)
+
+
+def sweep(program, proc_name: str, sizes: Sequence[int] = DEFAULT_SIZES, seed: int = 0,
+          max_ops: int = DEFAULT_MAX_OPS, workers: Optional[int] = None,
+          pool=None) -> List[Tuple[int, int]]:
+    """
+    [(n, ops)] en orden creciente de n, hasta el primer tamaño que no termina.
+    Con `pool` (de validate_empirically) o workers != 1 cada tamaño se mide
+    en un proceso del pool.
+    """
+    procs = to_dict(program.get("procedures", []) if is_node(program) else program)
+    jobs = [(procs, proc_name, n, seed, max_ops) for n in sorted(sizes)]
+
+    if pool is not None:
+        # Pool compartido: los tamaños mayores que queden en curso terminan
+        # solos al agotar max_ops.
+        return _collect(pool.imap(_measure_job, jobs))
+    workers = _workers(workers, len(jobs))
+    if workers <= 1:
+        return _collect(map(_measure_job, jobs))
+    with _pool(workers) as own:
+        return _collect(own.imap(_measure_job, jobs))  # al salir se terminan los mayores
+
+
+def _collect(results) -> List[Tuple[int, int]]:
+    points = []
+    for n, ops in results:
+        if ops is None:
+            break
+        points.append((n, ops))
+    return points
+
+
+# =============================================================================
+# AJUSTE
+# =============================================================================
+
+def _cost_params(cost: Cost) -> Tuple[float, float, float]:
+    """(grado, potencia del log, log de la base exponencial) de un costo."""
+    exp, degree, logs = cost
+    log_base = 0.0
+    if exp is not None:
+        head = exp[:-2]
+        log_base = math.log(PHI if head == "phi" else float(head))
+    return float(degree), float(logs), log_base
+
+
+def fit_growth(points: Sequence[Tuple[int, int]], extra: Iterable[Cost] = ()) -> Dict[str, float]:
+    """
+    Error RMS de log(ops) - log(c * g(n)) para cada clase candidata (con c
+    óptimo), indexado por format_cost. Menor es mejor. Los puntos con n < 2
+    se ignoran.
+    """
+    points = _fittable(points)
+    classes = list(CANDIDATES)
+    for cost in extra:
+        if cost is not None and cost not in classes:
+            classes.append(cost)
+    labels = [format_cost(c) for c in classes]
+    params = [_cost_params(c) for c in classes]
+    ns = [n for n, _ in points]
+    logy = [math.log(max(ops, 1)) for _, ops in points]
+
+    if np is not None:
+        n_arr = np.asarray(ns, dtype=float)
+        feats = np.vstack([np.log(n_arr), np.log(np.log(n_arr)), n_arr])   # 3 x P
+        logg = np.asarray(params) @ feats                                    # C x P
+        resid = np.asarray(logy) - logg
+        resid -= resid.mean(axis=1, keepdims=True)
+        rms = np.sqrt((resid ** 2).mean(axis=1))
+        return dict(zip(labels, (float(r) for r in rms)))
+
+    out = {}
+    feats = [(math.log(n), math.log(math.log(n)), float(n)) for n in ns]
+    for label, (d, j, b) in zip(labels, params):
+        resid = [y - (d * ln + j * lln + b * n) for y, (ln, lln, n) in zip(logy, feats)]
+        mean = sum(resid) / len(resid)
+        out[label] = math.sqrt(sum((r - mean) ** 2 for r in resid) / len(resid))
+    return out
+
+
+def _fittable(points: Sequence[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    return [p for p in points if p[0] >= 2]
+
+
+def check(points: Sequence[Tuple[int, int]], big_theta: Optional[str]) -> Dict[str, Any]:
+    """
+    Compara big_theta con el ajuste. status: "agrees", "disagrees" o
+    "inconclusive" (pocos puntos o big_theta desconocida).
+    """
+    claimed = parse_cost(big_theta) if big_theta else None
+    record: Dict[str, Any] = {"status": "inconclusive", "fit": None, "claimed": big_theta,
+                              "points": [list(p) for p in points]}
+    fittable = _fittable(points)
+    if len(fittable) < MIN_POINTS or fittable[-1][0] <= fittable[0][0]:
+        record["note"] = f"sólo {len(fittable)} tamaños (n >= 2) terminaron dentro del presupuesto"
+        return record
+    residuals = fit_growth(fittable, [claimed] if claimed else [])
+    best = min(residuals, key=residuals.get)
+    record.update(fit=best, residuals={k: round(v, 4) for k, v in residuals.items()})
+    if claimed is None:
+        record["note"] = "big_theta desconocida: sólo se informa el ajuste"
+        return record
+    label = format_cost(claimed)
+    ok = label == best or residuals[label] <= residuals[best] + TOLERANCE
+    record["status"] = "agrees" if ok else "disagrees"
+    return record
+
+
+def validate_empirically(program, analysis: Dict[str, Any], proc_name: Optional[str] = None,
+                         sizes: Sequence[int] = DEFAULT_SIZES, seed: int = 0,
+                         max_ops: int = DEFAULT_MAX_OPS, workers: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Agrega "empirical" (ver check) a cada procedimiento de `analysis` (salida
+    de infer_complexity) y, si el ajuste contradice big_theta, una advertencia
+    en su razonamiento. Modifica y devuelve `analysis`. Con workers != 1 se
+    crea un solo pool para todos los procedimientos.
+    """
+    procs = analysis.get("procedures", {})
+    names = [proc_name] if proc_name else list(procs)
+    workers = _workers(workers, len(sizes))
+    if workers <= 1 or not names:
+        _validate(program, procs, names, sizes, seed, max_ops, None)
+    else:
+        with _pool(workers) as pool:
+            _validate(program, procs, names, sizes, seed, max_ops, pool)
+    return analysis
+
+
+def _validate(program, procs, names, sizes, seed, max_ops, pool):
+    for name in names:
+        info = procs[name]
+        points = sweep(program, name, sizes=sizes, seed=seed, max_ops=max_ops, workers=1, pool=pool)
+        record = check(points, info.get("big_theta"))
+        info["empirical"] = record
+        if record["status"] == "disagrees":
+            info["reasoning"] = list(info.get("reasoning", [])) + [
+                f"ADVERTENCIA: la ejecución sugiere {record['fit']}, no {info.get('big_theta')} "
+                f"({len(points)} tamaños, n <= {points[-1][0]})."]
@@ -0,0 +1,176 @@
+# src/analyzer/expr_printer.py
+"""
+Impresión de expresiones del AST, compartida por diagramas, motor e informes.
+
+- display(node): forma legible, la de las etiquetas de los diagramas
+  ("A[i] = x", "left + right div 2").
+- canonical(node): forma normalizada para comparar patrones. Totalmente
+  parentizada (distingue "(a - b) - c" de "a - (b - c)"), sin espacios,
+  operadores en minúsculas y números enteros sin ".0". Dos expresiones
+  con la misma estructura tienen la misma forma canónica; no al revés
+  (2 y 2.0, DIV y div, o un Identifier y un LValue del mismo nombre dan
+  la misma cadena).
+
+Ambas se memorizan por nodo (identidad del objeto): la misma cota de un
+bucle o el mismo argumento se imprimen una sola vez aunque aparezcan en
+varias etiquetas o consultas. Los nodos se tratan como inmutables; la
+memoria guarda una referencia a cada nodo para que su id no se reutilice y
+se vacía al llegar a MAX_ENTRIES.
+"""
+from typing import Any, Callable, Dict, Tuple
+
+from .ast_nodes import is_node
+
+MAX_ENTRIES = 1 << 16
+
+# Hojas: no se memorizan (imprimirlas cuesta menos que buscarlas).
+_NAMES = frozenset(("Identifier", "LValue"))
+_VALUES = frozenset(("Number", "Literal"))
+_LEAVES = _NAMES | _VALUES
+
+_DISPLAY: Dict[int, Tuple[Any, str]] = {}
+_CANONICAL: Dict[int, Tuple[Any, str]] = {}
+
+
+def display(node) -> str:
+    hit = _DISPLAY.get(id(node))
+    if hit is not None and hit[0] is node:
+        return hit[1]
+    if not is_node(node):
+        return str(node)
+    t = node.get("type")
+    if t in _NAMES:
+        return node.get("name")
+    if t in _VALUES:
+        return str(node.get("value"))
+    return _memoized(node, _DISPLAY, _display, display, str)
+
+
+def canonical(node) -> str:
+    hit = _CANONICAL.get(id(node))
+    if hit is not None and hit[0] is node:
+        return hit[1]
+    if not is_node(node):
+        return _canonical_atom(node)
+    t = node.get("type")
+    if t in _NAMES:
+        return node.get("name")
+    if t in _VALUES:
+        return _canonical_atom(node.get("value"))
+    return _memoized(node, _CANONICAL, _canonical, canonical, _canonical_atom)
+
+
+def cache_info() -> Dict[str, int]:
+    return {"display": len(_DISPLAY), "canonical": len(_CANONICAL)}
+
+
+def cache_clear() -> None:
+    _DISPLAY.clear()
+    _CANONICAL.clear()
+
+
+def _children(node):
+    t = node.get("type")
+    if t == "BinOp":
+        return (node.get("left"), node.get("right"))
+    if t == "Unary":
+        return (node.get("expr"),)
+    if t == "Call":
+        return node.get("args") or ()
+    if t == "ArrayAccess":
+        index = node.get("index")
+        return index if isinstance(index, list) else (index,)
+    return ()
+
+
+def _memoized(node, memo, render: Callable, recurse: Callable, atom: Callable) -> str:
+    try:
+        text = render(node, recurse)
+    except RecursionError:
+        return _print(node, memo, render, atom)
+    if len(memo) >= MAX_ENTRIES:
+        memo.clear()
+    memo[id(node)] = (node, text)
+    return text
+
+
+def _print(root, memo, render: Callable, atom: Callable) -> str:
+    """
+    Postorden con pila explícita, para expresiones tan profundas (cadenas
+    largas de BinOp) que la versión recursiva agota la pila de Python.
+    """
+    done: Dict[int, str] = {}
+
+    def sub(x):
+        text = done.get(id(x))
+        if text is not None:
+            return text
+        return render(x, sub) if is_node(x) else atom(x)
+
+    stack = [root]
+    while stack:
+        x = stack.pop()
+        k = id(x)
+        if k in done:
+            continue
+        hit = memo.get(k)
+        if hit is not None and hit[0] is x:
+            done[k] = hit[1]
+            continue
+        children = _children(x)
+        pending = [c for c in children if id(c) not in done and is_node(c) and c.get("type") not in _LEAVES]
+        if pending:
+            stack.append(x)
+            stack.extend(pending)
+            continue
+        text = render(x, sub)
+        done[k] = text
+        if len(memo) >= MAX_ENTRIES:
+            memo.clear()
+        memo[k] = (x, text)
+    return done[id(root)]
+
+
+def _display(node, sub) -> str:
+    t = node.get("type")
+    if t in ("Identifier", "LValue"):
+        return node.get("name")
+    if t in ("Number", "Literal"):
+        return str(node.get("value"))
+    if t == "BinOp":
+        return f"{sub(node['left'])} {node.get('op') or '?'} {sub(node['right'])}"
+    if t == "Unary":
+        return f"{node['op']}{sub(node['expr'])}"
+    if t == "Call":
+        return f"{node.get('name')}({', '.join(sub(a) for a in node.get('args', []))})"
+    if t == "ArrayAccess":
+        return f"{node.get('name')}[{']['.join(sub(i) for i in _children(node))}]"
+    return "?"
+
+
+def _canonical_atom(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _canonical(node, sub) -> str:
+    t = node.get("type")
+    if t in ("Identifier", "LValue"):
+        return node.get("name")
+    if t in ("Number", "Literal"):
+        return _canonical_atom(node.get("value"))
+    if t == "BinOp":
+        op = (node.get("op") or "?").lower()
+        if op.isalpha():
+            return f"({sub(node['left'])} {op} {sub(node['right'])})"
+        return f"({sub(node['left'])}{op}{sub(node['right'])})"
+    if t == "Unary":
+        op = node["op"].lower()
+        sep = " " if op.isalpha() else ""
+        return f"({op}{sep}{sub(node['expr'])})"
+    if t == "Call":
+        return f"{node.get('name')}({','.join(sub(a) for a in node.get('args', []))})"
+    if t == "ArrayAccess":
+        return f"{node.get('name')}[{']['.join(sub(i) for i in _children(node))}]"
+    return "?"
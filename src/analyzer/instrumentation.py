@@ -0,0 +1,119 @@
+# src/analyzer/instrumentation.py
+"""
+Instrumentación opcional por etapa: tiempo de pared, tiempo de CPU y
+memoria (pico y neto, con tracemalloc), más contadores de tamaño de entrada.
+
+Uso:
+    with instrumented() as inst:
+        ast, ctx, out = run_pipeline(source)
+        report = format_analysis_json(ast, out)   # incluye meta["instrumentation"]
+    inst.to_dict()
+
+Sólo se mide dentro de un bloque `instrumented()`. Fuera de él, stage()
+devuelve un contexto vacío compartido y count() retorna enseguida, así que
+el pipeline no paga nada apreciable.
+"""
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, List, Optional
+
+# Etapas que registra el pipeline, en orden.
+STAGES = ("preprocess", "parse", "ast_transform", "patterns", "inference", "reporting")
+
+_current: ContextVar[Optional["Instrumentation"]] = ContextVar("analyzer_instrumentation", default=None)
+_NULL = nullcontext()
+
+
+class Instrumentation:
+    """
+    Acumula mediciones por etapa y contadores.
+
+    Args:
+        memory: si True mide memoria con tracemalloc (lo arranca si hace falta).
+        split_parse: si True el pipeline parsea en dos pasos (parse_source +
+                     tree_to_ast) para medir "parse" y "ast_transform" por
+                     separado; si False usa el parseo inline y todo cae en "parse".
+        hooks: funciones hook(stage, registro) llamadas al cerrar cada etapa.
+    """
+
+    def __init__(self, memory: bool = True, split_parse: bool = True,
+                 hooks: Optional[List[Callable[[str, Dict[str, Any]], None]]] = None):
+        self.memory = memory
+        self.split_parse = split_parse
+        self.hooks = list(hooks or [])
+        self.stages: Dict[str, Dict[str, Any]] = {}
+        self.counters: Dict[str, int] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        mem = self.memory and tracemalloc.is_tracing()
+        if mem:
+            start_mem = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            rec = {"wall_ms": (time.perf_counter() - wall0) * 1000,
+                   "cpu_ms": (time.process_time() - cpu0) * 1000}
+            if mem:
+                current, peak = tracemalloc.get_traced_memory()
+                rec["peak_kib"] = (peak - start_mem) / 1024
+                rec["net_kib"] = (current - start_mem) / 1024
+            self._add(name, rec)
+
+    def _add(self, name, rec):
+        acc = self.stages.get(name)
+        if acc is None:
+            acc = self.stages[name] = {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0}
+        acc["calls"] += 1
+        acc["wall_ms"] += rec["wall_ms"]
+        acc["cpu_ms"] += rec["cpu_ms"]
+        if "peak_kib" in rec:
+            acc["peak_kib"] = max(acc.get("peak_kib", 0.0), rec["peak_kib"])
+            acc["net_kib"] = acc.get("net_kib", 0.0) + rec["net_kib"]
+        for hook in self.hooks:
+            hook(name, rec)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def to_dict(self) -> Dict[str, Any]:
+        stages = {}
+        for name, acc in self.stages.items():
+            stages[name] = {k: round(v, 3) if isinstance(v, float) else v for k, v in acc.items()}
+        return {"stages": stages, "counters": dict(self.counters)}
+
+
+@contextmanager
+def instrumented(memory: bool = True, split_parse: bool = True, hooks=None):
+    """Activa una Instrumentation para el bloque (y la devuelve)."""
+    inst = Instrumentation(memory=memory, split_parse=split_parse, hooks=hooks)
+    started = memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    token = _current.set(inst)
+    try:
+        yield inst
+    finally:
+        _current.reset(token)
+        if started:
+            tracemalloc.stop()
+
+
+def current() -> Optional[Instrumentation]:
+    return _current.get()
+
+
+def stage(name: str):
+    """Contexto de medición de una etapa; vacío si no hay instrumentación activa."""
+    inst = _current.get()
+    return _NULL if inst is None else inst.stage(name)
+
+
+def count(name: str, n: int = 1) -> None:
+    inst = _current.get()
+    if inst is not None:
+        inst.count(name, n)
@@ -1,25 +1,303 @@
 # src/analyzer/llm_verifier.py
 """
 Módulo opcional para consultar un LLM para verificación.
-Implementación segura: no incluye dependencias concretas; usa requests to OpenAI-like endpoints
-si el usuario provee una API key vía variables de entorno y la función la recibe.
+Implementación segura: no incluye dependencias concretas; habla HTTP/1.1 con
+endpoints tipo OpenAI (chat/completions) usando sólo asyncio.
+
+- LLMVerifier: cliente asíncrono con semáforo de concurrencia, pool de
+  conexiones keep-alive, varios procedimientos por petición (`batch_size`),
+  reintentos con backoff exponencial y caché por hash(resumen del AST +
+  prompt + modelo). La caché puede ser un dict (por defecto) o una
+  ResultCache para persistir entre ejecuciones.
+- query_llm_for_analysis: la interfaz síncrona original (una consulta).
+- mock_llm_server.MockLLMServer: servidor local compatible para pruebas y
+  benchmarks sin red.
 
 Notas de seguridad:
  - NUNCA debes subir API keys al repo.
  - Al ejecutar en CI, configura secrets.OPENAI_API_KEY en GitHub.
 """
-from typing import Dict, Any, Optional
-import os
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
+import hashlib
 import json
+import os
+import ssl
+from urllib.parse import urlsplit
+
+from .ast_nodes import to_dict
+
+DEFAULT_URL = "https://api.openai.com/v1/chat/completions"
+DEFAULT_MODEL = "gpt-4o-mini"
+
+SYSTEM_PROMPT = (
+    "Eres un verificador de complejidad algorítmica. Recibirás un JSON "
+    '{"procedures": [{"id", "summary"}]} donde summary contiene el AST de un '
+    "procedimiento en pseudocódigo y la cota que propone un analizador estático. "
+    'Responde sólo con JSON: {"results": [{"id", "O", "Omega", "Theta", '
+    '"analysis_text"}]}, un elemento por procedimiento.'
+)
+
+# Estados HTTP que justifican reintentar.
+RETRY_STATUS = frozenset((408, 429, 500, 502, 503, 504))
+
+
+class LLMError(Exception):
+    """Fallo definitivo de una petición (tras agotar los reintentos)."""
+
+
+def procedure_summary(proc: Dict[str, Any], info: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Resumen que se envía (y se hashea) por procedimiento: AST + cota propuesta."""
+    info = info or {}
+    return {
+        "name": proc.get("name"),
+        "ast": to_dict(proc),
+        "claimed": {"O": info.get("big_o"), "Omega": info.get("big_omega"),
+                    "Theta": info.get("big_theta")},
+    }
+
+
+def summary_key(summary: Dict[str, Any], prompt: str, model: str) -> str:
+    h = hashlib.sha256(json.dumps(summary, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    h.update(b"\0" + prompt.encode("utf-8"))
+    h.update(b"\0" + model.encode("utf-8"))
+    return h.hexdigest()
+
+
+# =============================================================================
+# HTTP/1.1 CON KEEP-ALIVE
+# =============================================================================
+
+class _ConnectionPool:
+    """Hasta `size` conexiones persistentes a un mismo host."""
+
+    def __init__(self, url: str, size: int):
+        parts = urlsplit(url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.https else 80)
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path += "?" + parts.query
+        self.size = size
+        self.opened = 0
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def request(self, body: bytes, headers: Dict[str, str], timeout: float) -> Tuple[int, bytes]:
+        async with self._slots:
+            conn = self._idle.pop() if self._idle else None
+            if conn is None:
+                conn = await asyncio.wait_for(self._open(), timeout)
+            try:
+                status, data, keep = await asyncio.wait_for(
+                    self._exchange(conn, body, headers), timeout)
+            except BaseException:
+                conn[1].close()
+                raise
+            if keep:
+                self._idle.append(conn)
+            else:
+                conn[1].close()
+            return status, data
+
+    async def _open(self):
+        ctx = ssl.create_default_context() if self.https else None
+        conn = await asyncio.open_connection(self.host, self.port, ssl=ctx)
+        self.opened += 1
+        return conn
+
+    async def _exchange(self, conn, body, headers):
+        reader, writer = conn
+        head = [f"POST {self.path} HTTP/1.1", f"Host: {self.host}",
+                f"Content-Length: {len(body)}", "Connection: keep-alive"]
+        head += [f"{k}: {v}" for k, v in headers.items()]
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
 
-# Esta implementación es un "adapter" que puedes extender según la API del proveedor.
-# Aquí devolvemos un stub si no hay api_key para no romper el flujo.
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("conexión cerrada por el servidor")
+        status = int(status_line.split()[1])
+        resp_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = line.decode("latin-1").partition(":")
+            resp_headers[k.strip().lower()] = v.strip()
+
+        if resp_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readline()
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            data = b"".join(chunks)
+        else:
+            data = await reader.readexactly(int(resp_headers.get("content-length", 0)))
+        keep = resp_headers.get("connection", "").lower() != "close"
+        return status, data, keep
+
+    def close(self):
+        for _, writer in self._idle:
+            writer.close()
+        self._idle.clear()
+
+
+# =============================================================================
+# VERIFICADOR
+# =============================================================================
+
+class LLMVerifier:
+    """
+    Uso:
+        verifier = LLMVerifier(url, api_key=..., batch_size=10)
+        llm = verifier.verify_analysis(ast, analysis)     # {"procedures": {...}}
+        report = format_analysis_json(ast, analysis, llm)
+
+    Args:
+        concurrency: peticiones en vuelo como máximo (semáforo).
+        pool_size: conexiones keep-alive (por defecto = concurrency).
+        batch_size: procedimientos por petición (1 si el proveedor no admite lotes).
+        retries / backoff: reintentos ante errores de red o estados 408/429/5xx,
+            esperando backoff * 2^intento segundos.
+        cache: dict o ResultCache; se consulta antes de enviar.
+    """
+
+    def __init__(self, url: str = DEFAULT_URL, api_key: Optional[str] = None,
+                 model: str = DEFAULT_MODEL, prompt: str = SYSTEM_PROMPT,
+                 concurrency: int = 16, pool_size: Optional[int] = None,
+                 batch_size: int = 10, retries: int = 3, backoff: float = 0.2,
+                 timeout: float = 60.0, cache=None):
+        self.url = url
+        self.api_key = api_key
+        self.model = model
+        self.prompt = prompt
+        self.concurrency = concurrency
+        self.pool_size = pool_size or concurrency
+        self.batch_size = max(1, batch_size)
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = {} if cache is None else cache
+        self._cache_put = getattr(self.cache, "put", None) or self.cache.__setitem__
+        self.requests = 0
+        self.retried = 0
+        self.cache_hits = 0
+        self.connections = 0
+
+    # --- API síncrona ---
+    def verify_analysis(self, program, analysis: Dict[str, Any],
+                        proc_name: Optional[str] = None) -> Dict[str, Any]:
+        """Verifica los procedimientos de `analysis` (salida de infer_complexity)."""
+        procs = {p.get("name"): p for p in program.get("procedures", [])}
+        names = [proc_name] if proc_name else list(analysis.get("procedures", {}))
+        summaries = [procedure_summary(procs[n], analysis["procedures"][n]) for n in names]
+        results = asyncio.run(self.verify(summaries))
+        return {"procedures": dict(zip(names, results))}
+
+    # --- API asíncrona ---
+    async def verify(self, summaries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Un resultado por resumen, en el mismo orden."""
+        keys = [summary_key(s, self.prompt, self.model) for s in summaries]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(summaries)
+        pending: Dict[str, List[int]] = {}
+        for i, key in enumerate(keys):
+            hit = self.cache.get(key)
+            if hit is not None:
+                self.cache_hits += 1
+                results[i] = hit
+            else:
+                # Resúmenes repetidos en la misma llamada se envían una vez.
+                pending.setdefault(key, []).append(i)
+
+        order = list(pending)
+        batches = [order[i:i + self.batch_size] for i in range(0, len(order), self.batch_size)]
+        pool = _ConnectionPool(self.url, self.pool_size)
+        limit = asyncio.Semaphore(self.concurrency)
+
+        async def run(batch):
+            async with limit:
+                items = [(key, summaries[pending[key][0]]) for key in batch]
+                for key, res in zip(batch, await self._send(pool, items)):
+                    if "error" not in res:
+                        self._cache_put(key, res)
+                    for i in pending[key]:
+                        results[i] = res
+
+        try:
+            await asyncio.gather(*(run(b) for b in batches))
+        finally:
+            self.connections += pool.opened
+            pool.close()
+        return results
+
+    async def _send(self, pool: _ConnectionPool, items) -> List[Dict[str, Any]]:
+        payload = {
+            "model": self.model,
+            "temperature": 0,
+            "messages": [
+                {"role": "system", "content": self.prompt},
+                {"role": "user", "content": json.dumps(
+                    {"procedures": [{"id": key[:16], "summary": s} for key, s in items]},
+                    ensure_ascii=False)},
+            ],
+        }
+        body = json.dumps(payload).encode("utf-8")
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                self.retried += 1
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+            self.requests += 1
+            try:
+                status, data = await pool.request(body, headers, self.timeout)
+            except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+                error = f"{type(e).__name__}: {e}"
+                continue
+            if status in RETRY_STATUS:
+                error = f"HTTP {status}"
+                continue
+            if status != 200:
+                error = f"HTTP {status}"
+                break
+            try:
+                return _parse_results(data, [key[:16] for key, _ in items])
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                error = f"respuesta no válida: {e}"
+                break
+        return [{"error": error or "sin respuesta"} for _ in items]
+
+
+def _parse_results(data: bytes, ids: List[str]) -> List[Dict[str, Any]]:
+    content = json.loads(data)["choices"][0]["message"]["content"]
+    by_id = {r["id"]: r for r in json.loads(content)["results"]}
+    out = []
+    for i in ids:
+        r = by_id.get(i)
+        if r is None:
+            out.append({"error": "el proveedor no devolvió este procedimiento"})
+            continue
+        out.append({
+            "analysis_text": r.get("analysis_text", ""),
+            "suggested_complexity": {"O": r.get("O"), "Omega": r.get("Omega"), "Theta": r.get("Theta")},
+        })
+    return out
 
 
 def query_llm_for_analysis(code_or_ast: str, prompt: Optional[str] = None, api_key: Optional[str] = None) -> Dict[str, Any]:
     """
     Llama al LLM y pide un análisis de complejidad.
     Si api_key es None -> devuelve un stub con consejo y sin contactar la API.
+    El endpoint se toma de LLM_API_URL (por defecto el de OpenAI).
 
     Args:
       code_or_ast: cadena con el pseudocódigo o el AST JSON
@@ -37,12 +315,9 @@ def query_llm_for_analysis(code_or_ast: str, prompt: Optional[str] = None, api_k
             "notes": "Provide OPENAI_API_KEY to enable LLM verification."
         }
 
-    # Example placeholder: user can implement actual HTTP call here to OpenAI/Gemini.
-    # For safety we don't ship a concrete API client here (to avoid accidental credentials leak).
-    # Provide a clear template for how to implement:
-    template = {
-        "analysis_text": "LLM call not implemented in this adapter. Implement provider specific call.",
-        "suggested_complexity": {"O": None, "Omega": None, "Theta": None},
-        "notes": "Implement API call in llm_verifier.query_llm_for_analysis using your provider."
-    }
-    return template
+    verifier = LLMVerifier(os.environ.get("LLM_API_URL", DEFAULT_URL), api_key=api_key,
+                           prompt=SYSTEM_PROMPT + ("\n" + prompt if prompt else ""), batch_size=1)
+    result = asyncio.run(verifier.verify([{"source": code_or_ast}]))[0]
+    if "error" in result:
+        raise LLMError(result["error"])
+    return result
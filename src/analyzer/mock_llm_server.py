@@ -0,0 +1,135 @@
+# src/analyzer/mock_llm_server.py
+"""
+Servidor HTTP local que imita un endpoint chat/completions para probar
+LLMVerifier sin red ni API key.
+
+Responde a cada procedimiento del lote con la cota que propone el
+analizador (summary.claimed) o "Theta(?)" si no la trae. HTTP/1.1 con
+keep-alive y un hilo por conexión; `latency` simula el tiempo de respuesta
+del proveedor y `fail_first` devuelve 503 a las primeras peticiones para
+ejercitar los reintentos.
+
+Uso:
+    with MockLLMServer(latency=0.05) as server:
+        LLMVerifier(server.url).verify_analysis(ast, analysis)
+
+    python -m analyzer.mock_llm_server --port 8089 --latency 0.05
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with server.lock:
+            server.requests += 1
+            fail = server.requests <= server.fail_first
+        if server.latency:
+            time.sleep(server.latency)
+        if fail:
+            return self._reply(503, {"error": {"message": "overloaded"}})
+        try:
+            payload = json.loads(body)
+            procs = json.loads(payload["messages"][-1]["content"]).get("procedures", [])
+        except (ValueError, KeyError, IndexError, AttributeError):
+            return self._reply(400, {"error": {"message": "bad request"}})
+
+        results = []
+        for p in procs:
+            claimed = (p.get("summary") or {}).get("claimed") or {}
+            theta = claimed.get("Theta") or "Theta(?)"
+            results.append({
+                "id": p.get("id"),
+                "O": claimed.get("O") or theta,
+                "Omega": claimed.get("Omega") or theta,
+                "Theta": theta,
+                "analysis_text": "mock: se confirma la cota del analizador.",
+            })
+        with server.lock:
+            server.procedures += len(procs)
+        content = json.dumps({"results": results})
+        self._reply(200, {"choices": [{"message": {"role": "assistant", "content": content}}]})
+
+    def _reply(self, status, obj):
+        data = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockLLMServer:
+    """
+    Atributos (contadores desde el arranque): requests, procedures, connections.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 fail_first: int = 0):
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.lock = threading.Lock()
+        self._httpd.latency = latency
+        self._httpd.fail_first = fail_first
+        self._httpd.requests = self._httpd.procedures = self._httpd.connections = 0
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    requests = property(lambda self: self._httpd.requests)
+    procedures = property(lambda self: self._httpd.procedures)
+    connections = property(lambda self: self._httpd.connections)
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Servidor chat/completions simulado.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8089)
+    ap.add_argument("--latency", type=float, default=0.0, help="segundos por petición")
+    ap.add_argument("--fail-first", type=int, default=0, help="peticiones iniciales con 503")
+    args = ap.parse_args()
+    server = MockLLMServer(args.host, args.port, args.latency, args.fail_first)
+    print(f"Escuchando en {server.url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,23 +1,113 @@
 # parser.py - Cargador del parser usando grammar.lark
-from lark import Lark, Transformer, v_args
+from lark import Lark, Token, Transformer, Tree, v_args
+from lark.exceptions import UnexpectedCharacters, UnexpectedInput, UnexpectedToken
+from lark.lexer import LexerThread
+import lark
+import hashlib
+import io
 import pkgutil
 import os
 
+from .preprocessor import LineMap, iter_normalized_lines
+
 # Si tu proyecto ya carga grammar desde archivo, ajusta la ruta aquí:
 THIS_DIR = os.path.dirname(__file__)
 GRAMMAR_PATH = os.path.join(THIS_DIR, "grammar.lark")
 
-# Construye el parser LALR con la gramática corregida
+# Opciones del parser LALR. Forman parte de la clave de caché: si cambian,
+# las tablas guardadas en disco dejan de ser válidas.
+LARK_OPTIONS = {
+    "start": "start",
+    "parser": "lalr",
+    "propagate_positions": True,
+    "maybe_placeholders": False,
+}
+
+# Modo "inline": el AST se construye durante el parseo, sin árbol intermedio,
+# así que no hace falta propagar posiciones a los nodos del árbol.
+INLINE_OPTIONS = dict(LARK_OPTIONS, propagate_positions=False)
+
 with open(GRAMMAR_PATH, "r", encoding="utf-8") as f:
     GRAMMAR = f.read()
 
-LARK_PARSER = Lark(
-    GRAMMAR,
-    start="start",
-    parser="lalr",
-    propagate_positions=True,
-    maybe_placeholders=False
-)
+
+def grammar_hash(grammar: str = GRAMMAR, options: dict = None) -> str:
+    """
+    Huella de la gramática + opciones + versión de Lark.
+    Se usa como clave de las tablas LALR persistidas.
+    """
+    opts = LARK_OPTIONS if options is None else options
+    key = grammar + repr(sorted(opts.items())) + lark.__version__
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+GRAMMAR_HASH = grammar_hash()
+
+# Modo de construcción del parser (variable de entorno ANALYZER_PARSER_MODE):
+#   "cache"   -> (defecto) tablas LALR cacheadas en disco, invalidadas por hash.
+#   "tables"  -> módulo pre-generado _parser_tables.py (ver scripts/build_parser_tables.py);
+#                si no existe o está desactualizado se usa "cache".
+#   "compile" -> compila la gramática siempre (comportamiento original).
+PARSER_MODE = os.environ.get("ANALYZER_PARSER_MODE", "cache")
+
+
+def _cache_dir() -> str:
+    base = os.environ.get("ANALYZER_CACHE_DIR")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache", "analizador_complejidades")
+    return base
+
+
+def _cache_path(options: dict = None):
+    """Ruta del archivo de caché, o None si el directorio no es utilizable."""
+    directory = _cache_dir()
+    try:
+        os.makedirs(directory, exist_ok=True)
+    except OSError:
+        return None
+    if not os.access(directory, os.W_OK):
+        return None
+    key = GRAMMAR_HASH if options is None else grammar_hash(GRAMMAR, options)
+    return os.path.join(directory, f"grammar_{key}.lark_cache")
+
+
+def _load_from_tables():
+    """Carga el parser desde el módulo pre-generado, si coincide el hash."""
+    try:
+        from . import _parser_tables
+    except ImportError:
+        return None
+    if getattr(_parser_tables, "GRAMMAR_HASH", None) != GRAMMAR_HASH:
+        return None
+    return Lark.load(io.BytesIO(_parser_tables.DATA))
+
+
+def build_parser(mode: str = None, transformer=None) -> Lark:
+    """
+    Construye el parser LALR según el modo indicado (ver PARSER_MODE).
+
+    Con `transformer`, Lark lo aplica en cada reducción (modo inline) y
+    parse() devuelve directamente su resultado.
+    """
+    mode = mode or PARSER_MODE
+    options = LARK_OPTIONS if transformer is None else INLINE_OPTIONS
+    if mode == "tables":
+        # Lark.load no admite un transformer: los parsers inline usan la caché.
+        parser = _load_from_tables() if transformer is None else None
+        if parser is not None:
+            return parser
+        mode = "cache"
+
+    cache = None
+    if mode == "cache":
+        cache = _cache_path(None if transformer is None else options)
+    # Lark valida su propia huella dentro del archivo: si la gramática cambia
+    # se recompila y se sobrescribe la caché.
+    return Lark(GRAMMAR, cache=cache or False, transformer=transformer, **options)
+
+
+# Construye el parser LALR con la gramática corregida
+LARK_PARSER = build_parser()
 
 
 def parse_source(source: str):
@@ -25,3 +115,400 @@ def parse_source(source: str):
     Parsea el código fuente normalizado y devuelve el árbol de Lark.
     """
     return LARK_PARSER.parse(source)
+
+
+# Parsers inline, construidos bajo demanda (uno por modelo de nodos y modo).
+_INLINE_PARSERS = {}
+
+
+def inline_parser(compact: bool = False, hashcons: bool = False) -> Lark:
+    """Parser que construye el AST durante el parseo (se crea una vez)."""
+    key = (compact, hashcons)
+    parser = _INLINE_PARSERS.get(key)
+    if parser is None:
+        from .ast_transformer import ASTBuilder, CompactASTBuilder
+        builder = CompactASTBuilder(hashcons) if compact else ASTBuilder(hashcons)
+        parser = build_parser(transformer=builder)
+        _INLINE_PARSERS[key] = parser
+    return parser
+
+
+def parse_to_ast(source: str, compact: bool = False, hashcons: bool = False):
+    """
+    Parsea y construye el AST en una sola pasada: el ASTBuilder se ejecuta
+    en cada reducción LALR, sin materializar el árbol de Lark.
+    Equivale a tree_to_ast(parse_source(source), compact, hashcons).
+
+    Los nodos no llevan posiciones de origen; los errores de sintaxis sí
+    conservan línea y columna (vienen de los tokens).
+    """
+    parser = inline_parser(compact, hashcons)
+    try:
+        return parser.parse(source)
+    finally:
+        _reset(parser)
+
+
+def _reset(parser) -> None:
+    """Vacía la tabla de hash-consing del builder inline (ASTBuilder.reset)."""
+    reset = getattr(parser.options.transformer, "reset", None)
+    if reset is not None:
+        reset()
+
+
+def parse_stream(source, to_ast: bool = False, compact: bool = False,
+                 line_map: LineMap = None, hashcons: bool = False):
+    """
+    Preprocesa y parsea de forma incremental: `source` (str, archivo abierto
+    o iterable de fragmentos) se normaliza línea a línea y los tokens de cada
+    línea se entregan al parser interactivo a medida que llegan, sin armar
+    nunca el texto completo.
+
+    Args:
+        to_ast: si True usa el parser inline y devuelve el AST (ver parse_to_ast).
+        line_map: LineMap opcional que se llena durante el parseo.
+
+    Los tokens (y por tanto los errores de sintaxis) llevan la línea de la
+    fuente original, no la de la versión normalizada.
+    """
+    line_map = line_map if line_map is not None else LineMap()
+
+    def numbered():
+        for line in iter_normalized_lines(source, line_map=line_map):
+            yield line_map.original_line(len(line_map)), line
+
+    return parse_lines(numbered(), to_ast, compact, hashcons)
+
+
+def parse_lines(lines, to_ast: bool = False, compact: bool = False, hashcons: bool = False):
+    """
+    Parsea líneas ya normalizadas, dadas como pares (línea original, texto).
+    Ver parse_stream.
+    """
+    parser = inline_parser(compact, hashcons) if to_ast else LARK_PARSER
+    try:
+        return _feed_lines(parser, lines)
+    finally:
+        _reset(parser)
+
+
+def _feed_lines(parser, lines):
+    ip = parser.parse_interactive("")
+    lexer = ip.lexer_thread.lexer
+
+    lineno = 1
+    for lineno, line in lines:
+        thread = LexerThread.from_text(lexer, line + "\n")
+        try:
+            # El lexer contextual consulta el estado actual del parser en cada token.
+            for tok in thread.lex(ip.parser_state):
+                tok.line = tok.end_line = lineno
+                ip.feed_token(tok)
+        except UnexpectedInput as e:
+            # Los errores del lexer cuentan líneas desde el fragmento actual.
+            e.line = lineno
+            if getattr(e, "token", None) is not None:
+                e.token.line = e.token.end_line = lineno
+            raise
+    try:
+        return ip.feed_eof()
+    except UnexpectedInput as e:
+        e.line = lineno
+        raise
+
+
+# =============================================================================
+# Parseo con recuperación de errores
+# =============================================================================
+
+# Puntos de resincronización. Tras un error se descartan los tokens hasta el
+# siguiente de estos: con ";" cae la sentencia, con END también las
+# construcciones que ese END no cierra, y con PROCEDURE el procedimiento.
+SYNC_TOKENS = frozenset(("SEMICOLON", "END", "PROCEDURE"))
+
+# Una sentencia empieza después de los primeros terminales o con uno de los
+# segundos. Tras la condición de un UNTIL, empieza con un nombre o un tipo
+# pegado a un operando (dos operandos nunca van seguidos en una expresión).
+# Las declaraciones de nivel superior empiezan con _UNIT_TOKENS.
+_AFTER_STATEMENT = frozenset(("SEMICOLON", "BEGIN", "REPEAT", "END"))
+_STATEMENT_KEYWORDS = frozenset(("IF", "FOR", "WHILE", "REPEAT", "CALL", "RETURN"))
+_DECLARATION_START = frozenset(("IDENTIFIER", "CLASE", "INT", "FLOAT", "LIST"))
+_OPERAND_END = frozenset(("IDENTIFIER", "NUMBER", "RPAR", "RSQB", "T", "F", "NULL"))
+_NOT_STATEMENT = frozenset(("END", "UNTIL", "ELSE"))
+_OPEN, _CLOSE = frozenset(("BEGIN", "REPEAT")), frozenset(("END", "UNTIL"))
+_UNIT_TOKENS = frozenset(("PROCEDURE", "CLASE"))
+
+# Terminal que sólo puede iniciar una sentencia: si el parser lo acepta donde
+# está el error, el error está al principio de una sentencia.
+_STATEMENT_PROBE = "IF"
+_BAD_CHAR = "__BAD_CHAR__"
+
+
+def parse_recovering(source, to_ast: bool = True, compact: bool = False,
+                     hashcons: bool = False):
+    """
+    Como parse_stream, pero sin detenerse en el primer error de sintaxis:
+    la sentencia con el error se descarta hasta el siguiente ";" o END, y
+    un procedimiento cuya cabecera (o estructura) no se puede recuperar se
+    descarta hasta el siguiente PROCEDURE.
+
+    Returns:
+        (programa parcial, diagnósticos). Cada diagnóstico es un dict
+        {line, column, type, message, token, expected, procedure}: línea
+        original, columna (1-based) en la línea normalizada, terminales
+        esperados y procedimiento en curso (None fuera de uno).
+    """
+    line_map = LineMap()
+
+    def numbered():
+        for line in iter_normalized_lines(source, line_map=line_map):
+            yield line_map.original_line(len(line_map)), line
+
+    return recover_lines(numbered(), to_ast, compact, hashcons)
+
+
+def recover_lines(lines, to_ast: bool = True, compact: bool = False, hashcons: bool = False):
+    """parse_recovering sobre líneas ya normalizadas (ver parse_lines)."""
+    parser = inline_parser(compact, hashcons) if to_ast else LARK_PARSER
+    try:
+        return _recover(parser, lines)
+    finally:
+        _reset(parser)
+
+
+def _recover(parser, lines):
+    rec = _Recovery(parser)
+    lexer = rec.ip.lexer_thread.lexer
+    after_procedure = False
+
+    lineno, tok = 1, None
+    for lineno, line in lines:
+        for tok in _lex_line(lexer, line, lineno, lambda: rec.ip.parser_state):
+            if tok.type == _BAD_CHAR:
+                rec.bad_char(tok)
+                continue
+            if after_procedure and tok.type == "IDENTIFIER":
+                rec.proc = tok.value
+            after_procedure = tok.type == "PROCEDURE" or _as_sync(tok) == "PROCEDURE"
+            rec.feed(tok)
+
+    end = Token("$END", "", 0, lineno, 1 if tok is None else tok.end_column)
+    return rec.finish(end), rec.diagnostics
+
+
+class _Recovery:
+    """
+    Recuperación con la API pública del parser interactivo (feed_token,
+    accepts, feed_eof), sin tocar sus pilas.
+
+    Cada declaración de nivel superior (unidad) se parsea con su propio
+    parser interactivo, que guarda los tokens aceptados, el anidamiento de
+    BEGIN/REPEAT tras cada uno y dónde empieza cada sentencia. Descartar una sentencia es alimentar un parser nuevo con los
+    tokens de la unidad hasta el inicio de esa sentencia; una unidad que no
+    se puede cerrar se descarta entera. Al final se unen los programas de
+    las unidades completas (_merge).
+    """
+
+    def __init__(self, parser):
+        self.parser = parser
+        self.programs = []
+        self.diagnostics = []
+        self.proc = None
+        self._new_unit()
+
+    def _new_unit(self):
+        self.ip = self.parser.parse_interactive("")
+        self.tokens = []
+        self.levels = []    # anidamiento después de cada token
+        self.starts = [0]   # índices de self.tokens donde empieza una sentencia
+        self.cut = 0        # inicio de la sentencia con el error
+        self.skipping = False
+
+    def report(self, tok, kind, message, expected=()):
+        self.diagnostics.append({"line": tok.line, "column": tok.column, "type": kind,
+                                 "message": message, "token": tok.value,
+                                 "expected": sorted(expected), "procedure": self.proc})
+
+    def bad_char(self, tok):
+        if not self.skipping:
+            self.report(tok, "UnexpectedCharacters", f"Carácter inesperado {tok.value!r}.")
+            self._mark_cut()
+            self.skipping = True
+
+    def feed(self, tok):
+        sync = _as_sync(tok)
+        if (sync == "PROCEDURE" or tok.type in _UNIT_TOKENS) and not self.skipping \
+                and self.tokens and self._complete(self.ip):
+            self._close_unit(self.ip)
+        if self.skipping:
+            self.skipping = not self._resync(tok, sync)
+            return
+        try:
+            self._accept(tok)
+        except UnexpectedToken as e:
+            self.report(tok, "UnexpectedToken",
+                        f"Token inesperado {tok.value!r}; se esperaba "
+                        f"{_describe(self.parser, e.expected)}", e.expected)
+            self._mark_cut()
+            # El propio token puede ser el punto de resincronización.
+            self.skipping = not self._resync(tok, sync)
+
+    def finish(self, end):
+        if self.skipping:
+            ip = self._rebuild(self.cut)
+            if self.cut and self._complete(ip):
+                self._close_unit(ip)
+        elif self.tokens:
+            try:
+                self.programs.append(self.ip.feed_token(end))
+            except UnexpectedToken as e:
+                self.report(end, "UnexpectedEOF",
+                            f"Fin de la entrada inesperado; se esperaba "
+                            f"{_describe(self.parser, e.expected)}", e.expected)
+        return _merge(self.parser, self.programs)
+
+    def _accept(self, tok):
+        self.ip.feed_token(tok)
+        if tok.type not in _NOT_STATEMENT and self._at_statement(tok):
+            self.starts.append(len(self.tokens))
+        self.tokens.append(tok)
+        self.levels.append(self._level(len(self.tokens) - 1)
+                           + (tok.type in _OPEN) - (tok.type in _CLOSE))
+
+    def _at_statement(self, tok=None) -> bool:
+        pos = len(self.tokens)
+        if not pos or self.starts[-1] == pos:
+            return False
+        prev = self.tokens[-1].type
+        return prev in _AFTER_STATEMENT or tok is not None and (
+            tok.type in _STATEMENT_KEYWORDS
+            or (tok.type in _DECLARATION_START and prev in _OPERAND_END))
+
+    def _level(self, pos) -> int:
+        return self.levels[pos - 1] if pos else 0
+
+    def _mark_cut(self):
+        """El error descarta desde el inicio de su sentencia."""
+        if self._at_statement() or (self.tokens and self.starts[-1] != len(self.tokens)
+                                    and _STATEMENT_PROBE in self.ip.accepts()):
+            self.starts.append(len(self.tokens))
+        self.cut = self.starts[-1]
+
+    def _resync(self, tok, sync) -> bool:
+        """Intenta retomar el parseo en `tok`; True si el parser quedó listo."""
+        if sync == "PROCEDURE":
+            ip = self._rebuild(self.cut)
+            if self.cut and self._complete(ip):
+                self._close_unit(ip)
+            else:
+                self._new_unit()
+            self._accept(tok if tok.type == sync else Token.new_borrow_pos(sync, tok.value, tok))
+            return True
+        if sync is None or not self._level(self.cut):
+            # Fuera de un bloque no hay lista de sentencias donde retomar
+            # (p. ej. en la cabecera o tras el END del procedimiento).
+            return False
+        if sync == "SEMICOLON":
+            # Se descarta la sentencia junto con su ";".
+            self._truncate(self._rebuild(self.cut), self.cut)
+            return True
+        end = tok if tok.type == sync else Token.new_borrow_pos(sync, tok.value, tok)
+        level = self._level(self.cut)
+        for cut in reversed([s for s in self.starts if s <= self.cut and self._level(s)]):
+            if self._level(cut) > level:
+                continue    # dentro de una construcción ya cerrada
+            level = self._level(cut)
+            ip = self._rebuild(cut)
+            try:
+                ip.feed_token(end)
+            except UnexpectedToken:
+                # Ese END no cierra esta lista (p. ej. dentro de un REPEAT):
+                # se descarta la construcción y se prueba en la de fuera.
+                continue
+            self._truncate(ip, cut)
+            self.tokens.append(end)
+            self.levels.append(self._level(cut) - 1)
+            return True
+        return False
+
+    def _rebuild(self, cut):
+        """Parser nuevo alimentado con los tokens de la unidad anteriores a `cut`."""
+        ip = self.parser.parse_interactive("")
+        for tok in self.tokens[:cut]:
+            ip.feed_token(tok)
+        return ip
+
+    def _truncate(self, ip, cut):
+        self.ip = ip
+        del self.tokens[cut:]
+        del self.levels[cut:]
+        while self.starts[-1] > cut:
+            self.starts.pop()
+
+    @staticmethod
+    def _complete(ip) -> bool:
+        return "$END" in ip.accepts()
+
+    def _close_unit(self, ip):
+        self.programs.append(ip.feed_eof())
+        self._new_unit()
+
+
+def _merge(parser, programs):
+    """Une los programas de cada unidad como si se hubieran parseado juntos."""
+    transformer = parser.options.transformer
+    if transformer is None:
+        return Tree("start", [item for p in programs for item in p.children])
+    return transformer.start([item for p in programs
+                              for item in (*p["classes"], *p["procedures"])])
+
+
+def _lex_line(lexer, line: str, lineno: int, current):
+    """
+    Tokens de una línea con el lexer contextual, en el estado que devuelve
+    `current()` (cambia cuando la recuperación rehace el parser). Los
+    terminales válidos fuera de contexto se entregan igual (el parser los
+    rechaza) y cada carácter desconocido se entrega como un token _BAD_CHAR.
+    """
+    thread = LexerThread.from_text(lexer, line + "\n")
+    while True:
+        state = current()
+        try:
+            for tok in thread.lex(state):
+                tok.line = tok.end_line = lineno
+                yield tok
+                if current() is not state:
+                    break
+            else:
+                return
+        except UnexpectedToken as e:
+            # El lexer raíz ya avanzó sobre el token.
+            e.token.line = e.token.end_line = lineno
+            yield e.token
+        except UnexpectedCharacters as e:
+            yield Token(_BAD_CHAR, line[e.pos_in_stream], e.pos_in_stream, lineno, e.column)
+            thread.state.line_ctr.feed(line[e.pos_in_stream])
+
+
+def _as_sync(tok):
+    if tok.type in SYNC_TOKENS:
+        return tok.type
+    # En contextos que esperan un nombre, END y PROCEDURE se leen como IDENTIFIER.
+    if tok.type == "IDENTIFIER" and tok.value in SYNC_TOKENS:
+        return tok.value
+    return None
+
+
+def _describe(parser, expected, limit: int = 6) -> str:
+    """Terminales esperados, terminados en "." o, si se recortan, en "..."."""
+    names = []
+    for name in sorted(expected):
+        try:
+            pattern = parser.get_terminal(name).pattern
+        except KeyError:
+            names.append(name)
+            continue
+        names.append(repr(pattern.value) if pattern.type == "str" else name)
+    if len(names) > limit:
+        return ", ".join(names[:limit]) + ", ..."
+    return ", ".join(names) + "."
@@ -0,0 +1,98 @@
+# src/analyzer/pipeline.py
+"""
+Pipeline completo para una fuente:
+normalize -> parse -> AST -> patrones -> complejidad.
+"""
+from typing import Any, Dict, Optional, Tuple
+
+from . import instrumentation
+from .preprocessor import normalize_source
+from .parser import parse_recovering, parse_source, parse_to_ast
+from .ast_transformer import tree_to_ast
+from .static_analyzer import analyze_ast_for_patterns
+from .complexity_engine import infer_complexity
+
+
+def run_pipeline(source: str, proc_name: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Any], Dict[str, Any]]:
+    """
+    Ejecuta todas las fases sobre `source`.
+
+    Returns:
+        (ast, contexto de patrones, salida de infer_complexity)
+    """
+    with instrumentation.stage("preprocess"):
+        norm = normalize_source(source)
+    return _run_normalized(norm, proc_name)
+
+
+def _run_normalized(norm: str, proc_name: Optional[str] = None, diagnostics=None):
+    """Con `diagnostics` (lista), parsea en modo de recuperación y añade ahí los errores."""
+    inst = instrumentation.current()
+    if diagnostics is not None:
+        with instrumentation.stage("parse"):
+            ast, found = parse_recovering(norm)
+        diagnostics.extend(found)
+    elif inst is not None and inst.split_parse:
+        # Con instrumentación se parsea en dos pasos para medir cada uno.
+        with inst.stage("parse"):
+            tree = parse_source(norm)
+        with inst.stage("ast_transform"):
+            ast = tree_to_ast(tree)
+        del tree
+    else:
+        # Parseo inline: el AST se construye en las reducciones LALR, sin árbol intermedio.
+        with instrumentation.stage("parse"):
+            ast = parse_to_ast(norm)
+    with instrumentation.stage("patterns"):
+        ctx = analyze_ast_for_patterns(ast)
+    with instrumentation.stage("inference"):
+        out = infer_complexity(ctx, proc_name)
+    return ast, ctx, out
+
+
+def analyze_source(source: str, proc_name: Optional[str] = None, cache=None,
+                   include_ast: bool = False, recover: bool = False) -> Dict[str, Any]:
+    """
+    Como run_pipeline, pero consultando primero una ResultCache (opcional).
+
+    Con recover=True los errores de sintaxis no interrumpen el análisis: se
+    analizan los procedimientos que se pudieron recuperar (ver
+    parser.parse_recovering) y los errores van en "diagnostics".
+
+    Returns:
+        { "analysis": salida de infer_complexity [, "ast": AST] [, "diagnostics": [...]] }
+    """
+    diagnostics = [] if recover else None
+    with instrumentation.stage("preprocess"):
+        norm = normalize_source(source)
+    if cache is None:
+        ast, _, out = _run_normalized(norm, proc_name, diagnostics)
+        return _result(ast, out, include_ast, diagnostics)
+
+    from .result_cache import cache_key
+
+    key = cache_key(norm)
+    entry = cache.get(key)
+    # Una entrada con diagnósticos viene de una fuente con errores: sin
+    # recover hay que volver a parsear para que el error se propague.
+    stale = entry is not None and entry.get("diagnostics") and not recover
+    if entry is None or stale or (include_ast and "ast" not in entry):
+        # Se guarda el análisis completo; el filtro por proc_name se aplica al leer.
+        ast, _, out = _run_normalized(norm, diagnostics=diagnostics)
+        entry = _result(ast, out, include_ast, diagnostics)
+        cache.put(key, entry)
+
+    out = entry["analysis"]
+    if proc_name:
+        out = {"procedures": {proc_name: out["procedures"][proc_name]}}
+    return _result(entry.get("ast"), out, include_ast,
+                    entry.get("diagnostics", []) if recover else None)
+
+
+def _result(ast, out, include_ast, diagnostics=None):
+    result = {"analysis": out}
+    if include_ast:
+        result["ast"] = ast
+    if diagnostics:
+        result["diagnostics"] = diagnostics
+    return result
@@ -5,9 +5,117 @@ Preprocessor: limpia y normaliza el pseudocódigo de entrada para el parser.
 - normaliza asignación '🡨' -> ':=' (si quieres)
 - asegura saltos de línea consistentes
 - devuelve texto listo para Lark
+
+Todas las normalizaciones se aplican en una sola pasada, línea a línea, sobre
+un str, un archivo abierto o cualquier iterable de fragmentos de texto
+(iter_normalized_lines). LineMap guarda, para cada línea normalizada, su
+número de línea en la fuente original.
 """
 
-from typing import Tuple
+import re
+from array import array
+from typing import Iterable, Iterator, Optional, Tuple, Union
+
+Source = Union[str, Iterable[str]]
+
+_ARROWS = (("🡨", ":="), ("←", ":="), ("→", "->"))
+_WS_RUN = re.compile(r"[ \t]+")
+_NEWLINE = re.compile(r"\r\n|\r|\n")
+
+
+class LineMap:
+    """Línea normalizada (1-based) -> línea de la fuente original (1-based)."""
+
+    def __init__(self):
+        self._orig = array("I")
+
+    def append(self, original_line: int) -> None:
+        self._orig.append(original_line)
+
+    def original_line(self, normalized_line: int) -> int:
+        if 1 <= normalized_line <= len(self._orig):
+            return self._orig[normalized_line - 1]
+        return normalized_line
+
+    def __len__(self):
+        return len(self._orig)
+
+
+def _iter_raw_lines(source: Source) -> Iterator[str]:
+    """
+    Divide la entrada en líneas sin el salto final, aceptando '\\n', '\\r\\n'
+    y '\\r'. Igual que str.split("\\n"): siempre produce la última línea,
+    aunque esté vacía.
+    """
+    if isinstance(source, str):
+        source = (source,)
+
+    pending = ""
+    for chunk in source:
+        if not chunk:
+            continue
+        text = pending + chunk
+        # Un CR final puede ser la mitad de un CRLF partido entre fragmentos.
+        hold_cr = text.endswith("\r")
+        if hold_cr:
+            text = text[:-1]
+        parts = _NEWLINE.split(text)
+        pending = parts.pop()
+        if hold_cr:
+            pending += "\r"
+        yield from parts
+
+    if pending.endswith("\r"):
+        yield pending[:-1]
+        yield ""
+    else:
+        yield pending
+
+
+def _iter_numbered(source: Source, normalize_assign_arrow: bool = True,
+                   compact_whitespace: bool = False) -> Iterator[Tuple[int, str]]:
+    """Una pasada: (línea original, línea normalizada)."""
+    prev_blank = False
+    for lineno, line in enumerate(_iter_raw_lines(source), 1):
+        if not compact_whitespace:
+            # Quitar comentarios '►' hasta el final de la línea
+            if "►" in line:
+                line = line.split("►", 1)[0]
+            line = line.rstrip()
+            if normalize_assign_arrow:
+                for old, new in _ARROWS:
+                    if old in line:
+                        line = line.replace(old, new)
+            # Mantener una sola línea vacía seguida
+            if not line.strip():
+                if prev_blank:
+                    continue
+                prev_blank = True
+                line = ""
+            else:
+                prev_blank = False
+            yield lineno, line
+        else:
+            # Modo del antiguo normalizer.py: sin líneas vacías ni indentación
+            # y con espacios internos colapsados.
+            line = line.strip()
+            if line:
+                yield lineno, _WS_RUN.sub(" ", line)
+
+
+def iter_normalized_lines(source: Source, line_map: Optional[LineMap] = None,
+                          normalize_assign_arrow: bool = True,
+                          compact_whitespace: bool = False) -> Iterator[str]:
+    """
+    Normaliza `source` (str, archivo abierto o iterable de fragmentos) en
+    streaming y produce las líneas resultantes, sin salto de línea.
+
+    Si se pasa `line_map`, se le añade la línea original de cada línea producida.
+    """
+    for lineno, line in _iter_numbered(source, normalize_assign_arrow, compact_whitespace):
+        if line_map is not None:
+            line_map.append(lineno)
+        yield line
 
 
 def normalize_source(code: str, normalize_assign_arrow: bool = True) -> str:
@@ -27,36 +135,4 @@ def normalize_source(code: str, normalize_assign_arrow: bool = True) -> str:
     if code is None:
         raise ValueError("code cannot be None")
 
-    # 1) Normalizar saltos de línea
-    text = code.replace("\r\n", "\n").replace("\r", "\n")
-
-    # 2) Quitar comentarios '►' hasta el final de la línea
-    out_lines = []
-    for line in text.split("\n"):
-        if "►" in line:
-            line = line.split("►", 1)[0]  # Eliminar comentario
-        out_lines.append(line.rstrip())
-
-    text = "\n".join(out_lines)
-
-    # 3) Normalizar asignación flecha a operador clásico (si se desea)
-    if normalize_assign_arrow:
-        text = (
-            text.replace("🡨", ":=")
-                .replace("←", ":=")
-                .replace("→", "->")
-        )
-
-    # 4) Eliminar líneas vacías excesivas (mantener una sola línea vacía seguida)
-    lines = []
-    prev_blank = False
-    for ln in text.split("\n"):
-        if ln.strip() == "":
-            if not prev_blank:
-                lines.append("")
-            prev_blank = True
-        else:
-            lines.append(ln)
-            prev_blank = False
-
-    return "\n".join(lines)
+    return "\n".join(iter_normalized_lines(code, normalize_assign_arrow=normalize_assign_arrow))
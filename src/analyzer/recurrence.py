@@ -0,0 +1,175 @@
+# src/analyzer/recurrence.py
+"""
+Resolución de recurrencias a partir de su forma estructurada.
+
+- Divide y vencerás: T(n) = sum a_i T(n / b_i) + Theta(n^k log^j n).
+  Con un solo b se aplican los tres casos del Teorema Maestro; con
+  particiones distintas, Akra–Bazzi (el exponente p se obtiene por
+  bisección de sum a_i b_i^-p = 1).
+- Sustracción: T(n) = sum a_i T(n - d_i) + Theta(n^k log^j n). Con una sola
+  llamada T(n - d) la suma telescópica da Theta(n^(k+1) log^j n); con más, la raíz dominante
+  r de la ecuación característica da Theta(r^n).
+
+Cada forma se canoniza (términos agrupados y ordenados) y su solución se
+memoiza: recurrencias estructuralmente iguales se resuelven una vez.
+"""
+import math
+from functools import lru_cache
+from typing import Iterable, NamedTuple, Tuple
+
+from .call_graph import Cost, format_cost
+
+PHI = (1 + math.sqrt(5)) / 2
+_EPS = 1e-9
+
+
+class Solution(NamedTuple):
+    cost: Cost
+    method: str
+    steps: Tuple[str, ...]
+
+
+def _num(x: float) -> str:
+    return str(int(round(x))) if abs(x - round(x)) < _EPS else f"{x:.3f}".rstrip("0")
+
+
+def _f_text(k: float, j: int = 0) -> str:
+    return format_cost((None, k, j)).replace("Theta", "O")
+
+
+def canonical_divide(terms: Iterable[Tuple[float, float]]) -> Tuple[Tuple[float, float], ...]:
+    """[(a_i, b_i)] con los b iguales agrupados, ordenado por b."""
+    merged = {}
+    for a, b in terms:
+        merged[b] = merged.get(b, 0) + a
+    return tuple(sorted((a, b) for b, a in merged.items()))
+
+
+def canonical_subtract(terms: Iterable[Tuple[float, int]]) -> Tuple[Tuple[float, int], ...]:
+    """[(a_i, d_i)] con los d iguales agrupados, ordenado por d."""
+    merged = {}
+    for a, d in terms:
+        merged[d] = merged.get(d, 0) + a
+    return tuple(sorted((a, d) for d, a in merged.items()))
+
+
+def recurrence_text(kind: str, terms, k: float, j: int = 0) -> str:
+    parts = []
+    for a, x in terms:
+        coef = "" if a == 1 else _num(a)
+        arg = f"n/{_num(x)}" if kind == "divide" else f"n-{_num(x)}"
+        parts.append(f"{coef}T({arg})")
+    return f"T(n) = {' + '.join(parts)} + {_f_text(k, j)}"
+
+
+def divide_and_conquer(terms, k: float = 0, j: int = 0) -> Solution:
+    return _solve_divide(canonical_divide(terms), float(k), int(j))
+
+
+def subtractive(terms, k: float = 0, j: int = 0) -> Solution:
+    return _solve_subtract(canonical_subtract(terms), float(k), int(j))
+
+
+def _compare(k: float, j: int, c: float, label: str):
+    """Compara f(n) = n^k log^j n con n^c (casos del Teorema Maestro)."""
+    if k < c - _EPS:
+        return (None, c, 0), f"Caso 1: f(n) = O(n^({label} - e)) -> Theta(n^{label})"
+    if abs(k - c) <= _EPS:
+        return (None, c, j + 1), f"Caso 2: f(n) = Theta(n^{label}{f' log^{j} n' if j else ''}) -> se multiplica por log n"
+    return (None, k, j), f"Caso 3: f(n) = Omega(n^({label} + e)) y a f(n/b) <= c f(n) -> Theta(f(n))"
+
+
+@lru_cache(maxsize=None)
+def _solve_divide(terms, k, j) -> Solution:
+    f_txt = _f_text(k, j)
+    if len(terms) == 1:
+        a, b = terms[0]
+        c = math.log(a) / math.log(b)
+        cost, case = _compare(k, j, c, "log_b a")
+        steps = (
+            "Forma del Teorema Maestro: T(n) = aT(n/b) + f(n)",
+            f"  -> a = {_num(a)} (llamadas), b = {_num(b)} (división), f(n) = {f_txt}",
+            f"  -> log_b(a) = log_{_num(b)}({_num(a)}) = {_num(c)}",
+            f"  -> {case}",
+            f"  -> Resultado: {format_cost(cost)}",
+        )
+        return Solution(cost, "master", steps)
+
+    # Akra–Bazzi: sum a_i b_i^-p = 1, decreciente en p.
+    def g(p):
+        return sum(a * b ** (-p) for a, b in terms) - 1
+
+    lo, hi = -1.0, 1.0
+    while g(lo) < 0:
+        lo *= 2
+    while g(hi) > 0:
+        hi *= 2
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        if g(mid) > 0:
+            lo = mid
+        else:
+            hi = mid
+    p = (lo + hi) / 2
+    cost, case = _compare(k, j, p, "p")
+    steps = (
+        "Particiones desiguales: método de Akra–Bazzi",
+        f"  -> {recurrence_text('divide', terms, k, j)}",
+        f"  -> p tal que sum a_i * b_i^(-p) = 1: p = {_num(p)}",
+        f"  -> Theta(n^p (1 + integral de f(u)/u^(p+1))): {case.split(': ', 1)[0]}",
+        f"  -> Resultado: {format_cost(cost)}",
+    )
+    return Solution(cost, "akra_bazzi", steps)
+
+
+@lru_cache(maxsize=None)
+def _solve_subtract(terms, k, j) -> Solution:
+    total = sum(a for a, _ in terms)
+    if total == 1:
+        _, d = terms[0]
+        cost = (None, k + 1, j)
+        steps = (
+            f"Reducción lineal del problema (T(n-{_num(d)})).",
+            f"  -> Profundidad de la recursión: n/{_num(d)}" if d != 1 else
+            "  -> Profundidad de la pila de recursión: n",
+            f"  -> Costo por nivel: {_f_text(k, j)} -> suma telescópica {format_cost(cost)}",
+        )
+        return Solution(cost, "telescoping", steps)
+
+    # Raíz dominante de x^D = sum a_i x^(D - d_i): h(x) = sum a_i x^-d_i - 1, decreciente en x > 0.
+    def h(x):
+        return sum(a * x ** (-d) for a, d in terms) - 1
+
+    lo, hi = 1.0, total + 1.0
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        if h(mid) > 0:
+            lo = mid
+        else:
+            hi = mid
+    r = (lo + hi) / 2
+    if abs(r - PHI) < 1e-6:
+        base = "phi"
+    else:
+        base = _num(r)
+    cost = (f"{base}^n", 0, 0)
+    D = max(d for _, d in terms)
+    rhs = " + ".join(("" if a == 1 else _num(a)) + (f"x^{D - d}" if D - d > 1 else "x" if D - d == 1 else "1")
+                     for a, d in terms)
+    steps = (
+        "Recurrencia Lineal Homogénea (por sustracción) detectada.",
+        f"  -> {recurrence_text('subtract', terms, k, j)}",
+        f"  -> Ecuación Característica: x^{D} = {rhs}",
+        f"  -> La raíz dominante es {_num(r)}" + (" (Phi)" if base == "phi" else "") +
+        " -> Crecimiento Exponencial.",
+    )
+    return Solution(cost, "characteristic", steps)
+
+
+def cache_info():
+    return {"divide": _solve_divide.cache_info(), "subtract": _solve_subtract.cache_info()}
+
+
+def cache_clear():
+    _solve_divide.cache_clear()
+    _solve_subtract.cache_clear()
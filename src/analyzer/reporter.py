@@ -1,27 +1,44 @@
 # src/analyzer/reporter.py
 """
 Formatea la salida final: AST JSON + analysis JSON + readable text.
+
+JsonlReporter es la alternativa en streaming a format_analysis_json: un
+registro JSON compacto por procedimiento, escrito en el sink a medida que
+se produce y con el AST sólo si se pide.
 """
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Optional, Union
 import json
 from datetime import datetime
 
+from . import instrumentation
+from .ast_nodes import Node, is_node, to_dict
+
 
 def generate_report(data):
     return "Reporte generado correctamente."
 
 
 def format_analysis_json(ast: Dict[str, Any], engine_output: Dict[str, Any], llm_output: Dict[str, Any] = None) -> Dict[str, Any]:
-    meta = {
-        "generated_at": datetime.utcnow().isoformat() + "Z",
-        "parser_version": "grammar_v1",
-    }
-    return {
-        "meta": meta,
-        "ast": ast,
-        "analysis": engine_output,
-        "llm": llm_output or {},
-    }
+    with instrumentation.stage("reporting"):
+        meta = {
+            "generated_at": datetime.utcnow().isoformat() + "Z",
+            "parser_version": "grammar_v1",
+        }
+        report = {
+            "meta": meta,
+            "ast": to_dict(ast),
+            "analysis": engine_output,
+            "llm": llm_output or {},
+        }
+    inst = instrumentation.current()
+    if inst is not None:
+        meta["instrumentation"] = inst.to_dict()
+    # Procedimientos cuya validación empírica contradice big_theta (ver empirical.py).
+    disagreements = [name for name, info in engine_output.get("procedures", {}).items()
+                     if (info.get("empirical") or {}).get("status") == "disagrees"]
+    if disagreements:
+        meta["empirical_disagreements"] = disagreements
+    return report
 
 
 def format_analysis_text(engine_output: Dict[str, Any]) -> str:
@@ -29,6 +46,11 @@ def format_analysis_text(engine_output: Dict[str, Any]) -> str:
     Produce un texto con razonamiento paso a paso para el usuario.
     engine_output is expected to have engine_output['procedures'][name]['reasoning'] etc.
     """
+    with instrumentation.stage("reporting"):
+        return _analysis_text(engine_output)
+
+
+def _analysis_text(engine_output: Dict[str, Any]) -> str:
     lines = []
     procs = engine_output.get("procedures", {})
     for name, info in procs.items():
@@ -39,8 +61,142 @@ def format_analysis_text(engine_output: Dict[str, Any]) -> str:
         lines.append(f"Big-Θ : {info.get('big_theta')}")
         if info.get("recurrence"):
             lines.append(f"Recurrence: {info.get('recurrence')}")
+        emp = info.get("empirical")
+        if emp:
+            flag = " (!) contradice Big-Θ" if emp["status"] == "disagrees" else ""
+            lines.append(f"Empirical: {emp.get('fit') or '-'} [{emp['status']}]{flag}")
         lines.append("Reasoning:")
         for step in info.get("reasoning", []):
             lines.append(f"  - {step}")
         lines.append("")  # blank line between procs
     return "\n".join(lines)
+
+
+def format_analysis_markdown(engine_output: Dict[str, Any]) -> str:
+    """Una sección Markdown por procedimiento (cotas, recurrencia y razonamiento)."""
+    with instrumentation.stage("reporting"):
+        lines = []
+        for name, info in engine_output.get("procedures", {}).items():
+            lines.append(f"### `{name}`")
+            lines.append("")
+            lines.append("| O | Ω | Θ |")
+            lines.append("|---|---|---|")
+            lines.append(f"| `{info.get('big_o')}` | `{info.get('big_omega')}` | `{info.get('big_theta')}` |")
+            if info.get("recurrence"):
+                lines.append("")
+                lines.append(f"**Recurrencia:** `{info.get('recurrence')}`")
+            if info.get("reasoning"):
+                lines.append("")
+                lines.extend(f"- {step.strip()}" for step in info["reasoning"])
+            lines.append("")
+        return "\n".join(lines)
+
+
+# =============================================================================
+# JSON LINES EN STREAMING
+# =============================================================================
+
+# Conjuntos de campos por registro: "analysis" son las cotas y demás claves
+# de infer_complexity salvo el razonamiento.
+FIELD_SETS = {
+    "analysis": frozenset(("analysis",)),
+    "reasoning": frozenset(("analysis", "reasoning")),
+    "ast": frozenset(("analysis", "ast")),
+    "full": frozenset(("analysis", "reasoning", "ast")),
+}
+
+
+def _json_default(obj):
+    # Nodos compactos: un nivel por llamada, los hijos se codifican al avanzar.
+    if isinstance(obj, Node):
+        out = {} if obj.type is None else {"type": obj.type}
+        for name in obj.fields:
+            out[name] = getattr(obj, name)
+        return out
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class JsonlReporter:
+    """
+    Uso:
+        with open("out.jsonl", "w") as f:
+            rep = JsonlReporter(f, fields="reasoning")
+            rep.write_analysis(ast, engine_output)          # o
+            rep.write_stream(analyze_stream(src, include_ast=True))
+
+    Cada línea: {<extra>, "procedure", "ok", <campos de FIELD_SETS[fields]>}; un
+    procedimiento que no parsea lleva ok=false y "error". `fields` puede ser
+    un nombre de FIELD_SETS o un iterable con "analysis", "reasoning", "ast".
+    """
+
+    def __init__(self, sink, fields: Union[str, Iterable[str]] = "analysis"):
+        self.sink = sink
+        self.fields = FIELD_SETS[fields] if isinstance(fields, str) else frozenset(fields)
+        self._encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"),
+                                         default=_json_default)
+        self.records = 0
+
+    def write(self, name: str, info: Optional[Dict[str, Any]] = None, ast=None,
+              error: Optional[Dict[str, Any]] = None, **extra) -> None:
+        record = dict(extra)
+        record["procedure"] = name
+        if error is not None:
+            record["ok"] = False
+            record["error"] = error
+        else:
+            record["ok"] = True
+            info = info or {}
+            if "analysis" in self.fields:
+                record.update((k, v) for k, v in info.items() if k != "reasoning")
+            if "reasoning" in self.fields:
+                record["reasoning"] = info.get("reasoning", [])
+            if "ast" in self.fields and ast is not None:
+                record["ast"] = ast
+
+        with instrumentation.stage("reporting"):
+            ast = record.pop("ast", None)
+            line = self._encoder.encode(record)
+            if ast is None:
+                self.sink.write(line + "\n")
+            else:
+                self.sink.write(line[:-1] + ',"ast":')
+                self._write_ast(ast)
+                self.sink.write("}\n")
+        self.records += 1
+
+    def _write_ast(self, ast) -> None:
+        """
+        Un Procedure se escribe sentencia a sentencia (cada una con el
+        codificador en C): la memoria queda acotada por la sentencia más
+        grande, no por el procedimiento.
+        """
+        encode, write = self._encoder.encode, self.sink.write
+        if not (is_node(ast) and ast.get("type") == "Procedure"):
+            write(encode(ast))
+            return
+        write('{"type":"Procedure","name":' + encode(ast.get("name")) +
+              ',"params":' + encode(ast.get("params")) + ',"body":[')
+        for i, stmt in enumerate(ast.get("body") or []):
+            write("," + encode(stmt) if i else encode(stmt))
+        write("]}")
+
+    def write_analysis(self, program, engine_output: Dict[str, Any],
+                       llm_output: Dict[str, Any] = None, **extra) -> None:
+        """Versión por procedimiento de format_analysis_json (sin construir el informe completo)."""
+        procs = {p.get("name"): p for p in program.get("procedures", [])} if program else {}
+        llm = (llm_output or {}).get("procedures", {})
+        for name, info in engine_output.get("procedures", {}).items():
+            kw = dict(extra)
+            if name in llm:
+                kw["llm"] = llm[name]
+            self.write(name, info, procs.get(name), **kw)
+
+    def write_stream(self, records: Iterable[Dict[str, Any]], **extra) -> None:
+        """Escribe los registros de streaming.analyze_stream a medida que llegan."""
+        for r in records:
+            if r["kind"] != "procedure":
+                continue
+            self.write(r["name"], r["analysis"], r.get("ast"),
+                       error=None if r["ok"] else r["error"], line=r["line"], **extra)
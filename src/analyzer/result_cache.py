@@ -0,0 +1,151 @@
+# src/analyzer/result_cache.py
+"""
+Caché en disco de resultados de análisis, direccionada por contenido.
+
+Clave: sha256( fuente normalizada + hash de la gramática + versión del motor ).
+Valor: salida de infer_complexity (y opcionalmente el AST).
+
+Almacenamiento en un archivo SQLite local con desalojo LRU acotado por
+tamaño total (bytes) y contadores de aciertos/fallos. Varios procesos
+pueden compartir el archivo: el total de bytes vive en la tabla `meta`
+(lo mantienen triggers) y la marca LRU se calcula en la misma sentencia
+que la escribe, así que no hay estado por proceso que se desincronice.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+from typing import Any, Dict, Optional
+
+from .parser import GRAMMAR_HASH
+from .complexity_engine import ENGINE_VERSION
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+EVICT_BATCH = 64
+
+# Marca LRU: una más que la mayor guardada (con el índice, O(log n)).
+_NEXT_STAMP = "SELECT COALESCE(MAX(last_access), 0) + 1 FROM results"
+
+
+def cache_key(normalized_source: str) -> str:
+    """Clave de caché para una fuente ya pasada por normalize_source."""
+    h = hashlib.sha256()
+    h.update(normalized_source.encode("utf-8"))
+    h.update(b"\0" + GRAMMAR_HASH.encode("ascii"))
+    h.update(b"\0" + ENGINE_VERSION.encode("ascii"))
+    return h.hexdigest()
+
+
+class ResultCache:
+    """
+    Caché LRU persistente.
+
+    Args:
+        path: archivo SQLite (None -> ANALYZER_CACHE_DIR/results.sqlite).
+        max_bytes: tamaño máximo de los valores almacenados; al superarlo se
+                   desalojan las entradas usadas hace más tiempo.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        if path is None:
+            base = os.environ.get("ANALYZER_CACHE_DIR") or os.path.join(
+                os.path.expanduser("~"), ".cache", "analizador_complejidades")
+            os.makedirs(base, exist_ok=True)
+            path = os.path.join(base, "results.sqlite")
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._db = sqlite3.connect(path, timeout=30.0)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " last_access INTEGER NOT NULL)")
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS results_lru ON results(last_access)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        self._db.execute(
+            "CREATE TRIGGER IF NOT EXISTS results_ins AFTER INSERT ON results BEGIN"
+            " UPDATE meta SET value = value + NEW.size WHERE name = 'bytes'; END")
+        self._db.execute(
+            "CREATE TRIGGER IF NOT EXISTS results_upd AFTER UPDATE OF size ON results BEGIN"
+            " UPDATE meta SET value = value + NEW.size - OLD.size WHERE name = 'bytes'; END")
+        self._db.execute(
+            "CREATE TRIGGER IF NOT EXISTS results_del AFTER DELETE ON results BEGIN"
+            " UPDATE meta SET value = value - OLD.size WHERE name = 'bytes'; END")
+        # Archivos anteriores a `meta`: el total se calcula una sola vez.
+        self._db.execute(
+            "INSERT OR IGNORE INTO meta(name, value)"
+            " SELECT 'bytes', COALESCE(SUM(size), 0) FROM results")
+        self._db.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        row = self._db.execute(
+            "SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self._db.execute(
+            "UPDATE results SET last_access = (" + _NEXT_STAMP + ") WHERE key = ?", (key,))
+        self._db.commit()
+        self.hits += 1
+        return pickle.loads(row[0])
+
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        # Upsert (no INSERT OR REPLACE): el REPLACE no dispara el trigger de borrado.
+        self._db.execute(
+            "INSERT INTO results(key, value, size, last_access)"
+            " VALUES (?, ?, ?, (" + _NEXT_STAMP + "))"
+            " ON CONFLICT(key) DO UPDATE SET value = excluded.value, size = excluded.size,"
+            " last_access = excluded.last_access",
+            (key, blob, len(blob)))
+        self._evict()
+        self._db.commit()
+
+    def _total(self) -> int:
+        return self._db.execute("SELECT value FROM meta WHERE name = 'bytes'").fetchone()[0]
+
+    def _evict(self) -> None:
+        total = self._total()
+        while total > self.max_bytes:
+            batch = self._db.execute(
+                "SELECT key, size FROM results ORDER BY last_access ASC LIMIT ?",
+                (EVICT_BATCH,)).fetchall()
+            if not batch:
+                break
+            for key, size in batch:
+                if total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+                total -= size
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        entries = self._db.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        size = self._total()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def clear(self) -> None:
+        self._db.execute("DELETE FROM results")
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,118 @@
+"""
+Compara el AST en forma de dict con el AST compacto (__slots__, ast_nodes.py):
+memoria retenida por nodo y tiempo de recorrido con traversal.scan_procedure.
+
+También compara el pico de memoria al parsear en dos pasos
+(parse_source + tree_to_ast) frente al parseo inline (parse_to_ast).
+
+Uso:
+    python src/analyzer/scripts/bench_ast_memory.py [--procs 50] [--stmts 40]
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../../'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from analyzer.parser import parse_source, parse_to_ast, inline_parser
+from analyzer.ast_transformer import tree_to_ast
+from analyzer.traversal import scan_procedure
+
+
+def synthetic_source(procs, stmts):
+    out = []
+    for p in range(procs):
+        out.append(f"PROCEDURE P{p}(A, n)\nBEGIN\n")
+        for s in range(stmts):
+            out.append(
+                f"    FOR i <- 1 TO n DO\n    BEGIN\n"
+                f"        FOR j <- i + 1 TO n - 1 DO\n        BEGIN\n"
+                f"            x <- A[i] * {s} + A[j] - (i + j) div 2;\n"
+                f"        END\n    END\n")
+        out.append("    RETURN x;\nEND\n")
+    return "".join(out)
+
+
+def _build(tree, compact):
+    # El tiempo se mide sin tracemalloc, que ralentiza mucho las asignaciones.
+    t0 = time.perf_counter()
+    tree_to_ast(tree, compact=compact)
+    elapsed = time.perf_counter() - t0
+
+    gc.collect()
+    tracemalloc.start()
+    ast = tree_to_ast(tree, compact=compact)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ast, size, elapsed
+
+
+def _walk(ast, repeat=3):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        visited = sum(scan_procedure(p)["visited"] for p in ast.get("procedures"))
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return visited, best
+
+
+def _two_step(src, compact):
+    return tree_to_ast(parse_source(src), compact=compact)
+
+
+def _peak(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - t0
+
+    gc.collect()
+    tracemalloc.start()
+    result = fn(*args)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return size, peak, elapsed
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="AST dict vs AST compacto")
+    ap.add_argument("--procs", type=int, default=50)
+    ap.add_argument("--stmts", type=int, default=40)
+    args = ap.parse_args(argv)
+
+    src = synthetic_source(args.procs, args.stmts)
+    tree = parse_source(src)
+
+    rows = []
+    for label, compact in (("dict", False), ("slots", True)):
+        ast, size, build = _build(tree, compact)
+        nodes, walk = _walk(ast)
+        rows.append((label, nodes, size, build, walk))
+        del ast
+
+    print(f"{'modelo':<8}{'nodos':>10}{'bytes/nodo':>12}{'MiB':>8}{'build ms':>10}{'recorrido ms':>14}")
+    for label, nodes, size, build, walk in rows:
+        print(f"{label:<8}{nodes:>10}{size / nodes:>12.1f}{size / 2**20:>8.1f}"
+              f"{build * 1000:>10.1f}{walk * 1000:>14.1f}")
+
+    del tree
+    inline_parser(False), inline_parser(True)   # construir fuera de la medición
+    print()
+    print(f"{'parseo':<18}{'AST MiB':>9}{'pico MiB':>10}{'ms':>9}")
+    for label, fn, compact in (("dos pasos/dict", _two_step, False),
+                               ("inline/dict", parse_to_ast, False),
+                               ("dos pasos/slots", _two_step, True),
+                               ("inline/slots", parse_to_ast, True)):
+        size, peak, elapsed = _peak(fn, src, compact)
+        print(f"{label:<18}{size / 2**20:>9.1f}{peak / 2**20:>10.1f}{elapsed * 1000:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
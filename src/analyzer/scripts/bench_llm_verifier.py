@@ -0,0 +1,63 @@
+"""
+Verificación LLM de un corpus contra el servidor simulado (sin red).
+
+Compara una petición por procedimiento en serie (como haría el stub
+síncrono) con LLMVerifier (concurrencia + keep-alive + lotes) y con una
+segunda pasada servida desde la caché.
+
+Uso:
+    python src/analyzer/scripts/bench_llm_verifier.py [--procs 1000] [--latency 0.05]
+        [--concurrency 16] [--batch 10] [--serial-sample 20]
+"""
+import argparse
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../../'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from analyzer.corpus import CorpusGenerator
+from analyzer.llm_verifier import LLMVerifier
+from analyzer.mock_llm_server import MockLLMServer
+from analyzer.pipeline import run_pipeline
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--procs", type=int, default=1000)
+    ap.add_argument("--latency", type=float, default=0.05, help="segundos por petición del servidor")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--batch", type=int, default=10)
+    ap.add_argument("--serial-sample", type=int, default=20,
+                    help="procedimientos medidos en serie (se extrapola al total)")
+    args = ap.parse_args()
+
+    ast, _, analysis = run_pipeline(CorpusGenerator(seed=0, procs=args.procs).source())
+    n = len(analysis["procedures"])
+
+    with MockLLMServer(latency=args.latency) as server:
+        serial = LLMVerifier(server.url, concurrency=1, batch_size=1)
+        names = list(analysis["procedures"])[:args.serial_sample]
+        t0 = time.perf_counter()
+        for name in names:
+            serial.verify_analysis(ast, analysis, proc_name=name)
+        per_proc = (time.perf_counter() - t0) / max(1, len(names))
+        print(f"en serie (estimado):  {per_proc * n:8.2f} s  ({n} peticiones)")
+
+        verifier = LLMVerifier(server.url, concurrency=args.concurrency, batch_size=args.batch)
+        t0 = time.perf_counter()
+        verifier.verify_analysis(ast, analysis)
+        print(f"LLMVerifier:          {time.perf_counter() - t0:8.2f} s  "
+              f"({verifier.requests} peticiones, {verifier.connections} conexiones)")
+
+        t0 = time.perf_counter()
+        verifier.verify_analysis(ast, analysis)
+        print(f"segunda pasada:       {time.perf_counter() - t0:8.2f} s  "
+              f"(aciertos de caché: {verifier.cache_hits})")
+
+
+if __name__ == "__main__":
+    main()
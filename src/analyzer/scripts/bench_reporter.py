@@ -0,0 +1,64 @@
+"""
+Salida de informes: format_analysis_json + json.dumps frente a
+JsonlReporter (por conjunto de campos), escribiendo a un archivo temporal.
+Mide tiempo, bytes escritos y pico de memoria (tracemalloc) de la fase de
+informe sobre un análisis ya calculado.
+
+Uso:
+    python src/analyzer/scripts/bench_reporter.py [--procs 2000] [--stmts 10]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../../'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from analyzer.pipeline import run_pipeline
+from analyzer.reporter import FIELD_SETS, JsonlReporter, format_analysis_json
+from bench_ast_memory import synthetic_source
+
+
+def _measure(fn, path):
+    t0 = time.perf_counter()
+    with open(path, "w", encoding="utf-8") as f:
+        fn(f)
+    elapsed = time.perf_counter() - t0
+    # Segunda pasada sólo para el pico de memoria (tracemalloc ralentiza).
+    tracemalloc.start()
+    with open(path, "w", encoding="utf-8") as f:
+        fn(f)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, os.path.getsize(path), peak
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--procs", type=int, default=2000)
+    ap.add_argument("--stmts", type=int, default=10)
+    args = ap.parse_args()
+
+    ast, _, out = run_pipeline(synthetic_source(args.procs, args.stmts))
+    cases = [("format_analysis_json + dumps",
+              lambda f: f.write(json.dumps(format_analysis_json(ast, out), ensure_ascii=False)))]
+    for fields in FIELD_SETS:
+        cases.append((f"JsonlReporter({fields})",
+                      lambda f, fields=fields: JsonlReporter(f, fields).write_analysis(ast, out)))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "out")
+        print(f"{'modo':34} {'ms':>8} {'MiB escritos':>13} {'pico MiB':>9}")
+        for label, fn in cases:
+            ms, size, peak = _measure(fn, path)
+            print(f"{label:34} {ms:8.1f} {size / 2**20:13.2f} {peak / 2**20:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Latencia de AnalysisSession.update tras editar un procedimiento, frente a
+volver a ejecutar el pipeline completo.
+
+Uso:
+    python src/analyzer/scripts/bench_session.py [--procs 500] [--stmts 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../../'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from analyzer.parser import inline_parser
+from analyzer.pipeline import run_pipeline
+from analyzer.session import AnalysisSession
+from bench_ast_memory import synthetic_source
+
+
+def _ms(fn):
+    t0 = time.perf_counter()
+    fn()
+    return (time.perf_counter() - t0) * 1000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--procs", type=int, default=500)
+    ap.add_argument("--stmts", type=int, default=10)
+    args = ap.parse_args()
+
+    inline_parser()
+    source = synthetic_source(args.procs, args.stmts)
+    # Edición en un procedimiento del medio.
+    middle = f"PROCEDURE P{args.procs // 2}("
+    edited = source.replace(middle + "A, n)\nBEGIN\n", middle + "A, n)\nBEGIN\n    y <- 1;\n", 1)
+
+    session = AnalysisSession()
+    print(f"pipeline completo:      {_ms(lambda: run_pipeline(edited)):8.1f} ms")
+    print(f"session, primer update: {_ms(lambda: session.update(source)):8.1f} ms")
+    print(f"session, 1 editado:     {_ms(lambda: session.update(edited)):8.1f} ms "
+          f"(reparsed={session.reparsed}, reused={session.reused})")
+    print(f"session, sin cambios:   {_ms(lambda: session.update(edited)):8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
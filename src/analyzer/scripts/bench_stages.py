@@ -0,0 +1,215 @@
+"""
+Benchmark por etapas del pipeline, con baselines en JSON y comparación.
+
+Etapas: preprocess (normalize_source), parse (parse_source), ast
+(tree_to_ast), patterns (analyze_ast_for_patterns), engine
+(infer_complexity), report_json (format_analysis_json + json.dumps),
+report_text (format_analysis_text) y trace_dot (TraceGenerator.build_graph
++ fuente DOT, sin renderizar).
+
+Grupos de entrada:
+    examples        los 10 programas de generate_all_diagrams.ALGORITHMS
+                    (los examples/*.pseudo usan otra sintaxis y no parsean
+                    con grammar.lark).
+    synthetic_<N>   N procedimientos de bench_ast_memory.synthetic_source.
+
+Uso:
+    python src/analyzer/scripts/bench_stages.py run [-o actual.json] [--repeat 5] [--scales 10,50]
+    python src/analyzer/scripts/bench_stages.py compare baseline.json [actual.json] [--threshold 15]
+
+`compare` sin segundo archivo ejecuta el benchmark en el momento. Sale con
+código 1 si alguna etapa es más lenta que la baseline en más de
+--threshold por ciento (y más de --min-ms en valor absoluto).
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../../'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+if current_dir not in sys.path:
+    sys.path.insert(0, current_dir)
+
+import lark
+
+from analyzer.preprocessor import normalize_source
+from analyzer.parser import GRAMMAR_HASH, parse_source
+from analyzer.ast_transformer import tree_to_ast
+from analyzer.static_analyzer import analyze_ast_for_patterns
+from analyzer.complexity_engine import ENGINE_VERSION, infer_complexity
+from analyzer.reporter import format_analysis_json, format_analysis_text
+from analyzer.diagram_generator import TraceGenerator
+from bench_ast_memory import synthetic_source
+from generate_all_diagrams import ALGORITHMS
+
+STAGES = ("preprocess", "parse", "ast", "patterns", "engine",
+          "report_json", "report_text", "trace_dot")
+
+DEFAULT_BASELINE = os.path.abspath(
+    os.path.join(src_path, "..", "docs", "benchmarks", "baseline.json"))
+
+
+def input_groups(scales=(10, 50), stmts=10):
+    groups = {"examples": list(ALGORITHMS.values())}
+    for n in scales:
+        groups[f"synthetic_{n}"] = [synthetic_source(n, stmts)]
+    return groups
+
+
+def _trace_dot(ast):
+    gen = TraceGenerator(ast, output_format="svg")
+    return [gen.build_graph(proc).source for proc in ast.get("procedures", [])]
+
+
+def _run_once(sources):
+    """Ejecuta todas las etapas sobre `sources`; devuelve segundos por etapa."""
+    times = dict.fromkeys(STAGES, 0.0)
+    clock = time.perf_counter
+    for src in sources:
+        t0 = clock()
+        norm = normalize_source(src)
+        t1 = clock()
+        tree = parse_source(norm)
+        t2 = clock()
+        ast = tree_to_ast(tree)
+        t3 = clock()
+        ctx = analyze_ast_for_patterns(ast)
+        t4 = clock()
+        out = infer_complexity(ctx)
+        t5 = clock()
+        json.dumps(format_analysis_json(ast, out), ensure_ascii=False)
+        t6 = clock()
+        format_analysis_text(out)
+        t7 = clock()
+        _trace_dot(ast)
+        t8 = clock()
+        marks = (t0, t1, t2, t3, t4, t5, t6, t7, t8)
+        for stage, start, end in zip(STAGES, marks, marks[1:]):
+            times[stage] += end - start
+    return times
+
+
+def run(groups=None, repeat=5):
+    groups = groups if groups is not None else input_groups()
+    results = {}
+    for name, sources in groups.items():
+        _run_once(sources)  # calentamiento
+        samples = []
+        for _ in range(repeat):
+            # Como timeit: sin GC durante la medición, para reducir el ruido.
+            gc.collect()
+            gc.disable()
+            try:
+                samples.append(_run_once(sources))
+            finally:
+                gc.enable()
+        results[name] = {
+            stage: {
+                "min_ms": round(min(s[stage] for s in samples) * 1000, 4),
+                "median_ms": round(statistics.median(s[stage] for s in samples) * 1000, 4),
+            }
+            for stage in STAGES
+        }
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            "python": platform.python_version(),
+            "lark": lark.__version__,
+            "machine": platform.machine(),
+            "grammar_hash": GRAMMAR_HASH,
+            "engine_version": ENGINE_VERSION,
+            "repeat": repeat,
+        },
+        "results": results,
+    }
+
+
+def compare(baseline, current, threshold=15.0, min_ms=0.05, metric="min_ms"):
+    """
+    Compara dos resultados de run(). Devuelve (filas, regresiones); cada fila
+    es (grupo, etapa, baseline_ms, actual_ms, cambio_%). Sólo se comparan las
+    etapas presentes en ambos.
+    """
+    rows, regressions = [], []
+    for group, stages in baseline["results"].items():
+        cur_stages = current["results"].get(group)
+        if cur_stages is None:
+            continue
+        for stage, base in stages.items():
+            if stage not in cur_stages:
+                continue
+            b, c = base[metric], cur_stages[stage][metric]
+            change = (c - b) / b * 100 if b > 0 else 0.0
+            row = (group, stage, b, c, change)
+            rows.append(row)
+            if change > threshold and c - b > min_ms:
+                regressions.append(row)
+    return rows, regressions
+
+
+def _print_rows(rows, regressions):
+    print(f"{'grupo':<14} {'etapa':<12} {'base ms':>10} {'actual ms':>10} {'cambio':>8}")
+    for row in rows:
+        group, stage, b, c, change = row
+        flag = "  REGRESIÓN" if row in regressions else ""
+        print(f"{group:<14} {stage:<12} {b:>10.3f} {c:>10.3f} {change:>+7.1f}%{flag}")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="ejecuta el benchmark y guarda el JSON")
+    run_p.add_argument("-o", "--output", default=None,
+                       help=f"archivo de salida (defecto: stdout); la baseline es {DEFAULT_BASELINE}")
+    cmp_p = sub.add_parser("compare", help="compara contra una baseline")
+    cmp_p.add_argument("baseline")
+    cmp_p.add_argument("current", nargs="?", default=None)
+    cmp_p.add_argument("--threshold", type=float, default=15.0,
+                       help="regresión máxima permitida, en %% (defecto 15)")
+    cmp_p.add_argument("--min-ms", type=float, default=0.05,
+                       help="diferencia absoluta mínima para contar como regresión")
+    cmp_p.add_argument("--metric", choices=("min_ms", "median_ms"), default="min_ms")
+    for p in (run_p, cmp_p):
+        p.add_argument("--repeat", type=int, default=5)
+        p.add_argument("--scales", default="10,50",
+                       help="tamaños sintéticos (procedimientos), separados por comas")
+    args = ap.parse_args(argv)
+
+    scales = [int(x) for x in args.scales.split(",") if x]
+    if args.command == "run":
+        result = run(input_groups(scales), args.repeat)
+        text = json.dumps(result, indent=2)
+        if args.output:
+            os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+            with open(args.output, "w", encoding="utf-8") as f:
+                f.write(text + "\n")
+        else:
+            print(text)
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current, encoding="utf-8") as f:
+            current = json.load(f)
+    else:
+        current = run(input_groups(scales), args.repeat)
+    rows, regressions = compare(baseline, current, args.threshold, args.min_ms, args.metric)
+    _print_rows(rows, regressions)
+    if regressions:
+        print(f"\n{len(regressions)} etapa(s) por encima del umbral de {args.threshold}%")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
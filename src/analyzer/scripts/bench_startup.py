@@ -0,0 +1,80 @@
+"""
+Benchmark de arranque: latencia import -> primer parse en un proceso nuevo.
+
+Mide cada modo de construcción del parser (ver analyzer/parser.py):
+  - compile : compila grammar.lark en cada arranque (sin caché).
+  - cold    : modo "cache" con el directorio de caché vacío (compila y guarda).
+  - warm    : modo "cache" con las tablas ya guardadas en disco.
+  - tables  : módulo pre-generado _parser_tables.py (si existe).
+
+Uso:
+    python src/analyzer/scripts/bench_startup.py [--runs 10]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../../'))
+
+# Se mide dentro del proceso hijo: desde antes del import hasta el primer parse.
+CHILD = """
+import time
+t0 = time.perf_counter()
+from analyzer.parser import parse_source
+parse_source("PROCEDURE P(n) BEGIN x <- n + 1; END")
+print((time.perf_counter() - t0) * 1000.0)
+"""
+
+
+def _run_once(env) -> float:
+    out = subprocess.run([sys.executable, "-c", CHILD], env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def _env(mode, cache_dir):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = src_path + os.pathsep + env.get("PYTHONPATH", "")
+    env["ANALYZER_PARSER_MODE"] = mode
+    env["ANALYZER_CACHE_DIR"] = cache_dir
+    return env
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--runs", type=int, default=10)
+    args = ap.parse_args(argv)
+
+    results = {}
+    cache_dir = tempfile.mkdtemp(prefix="analyzer_bench_")
+    try:
+        results["compile"] = [_run_once(_env("compile", cache_dir)) for _ in range(args.runs)]
+
+        cold = []
+        for _ in range(args.runs):
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            cold.append(_run_once(_env("cache", cache_dir)))
+        results["cold"] = cold
+
+        results["warm"] = [_run_once(_env("cache", cache_dir)) for _ in range(args.runs)]
+
+        if os.path.exists(os.path.join(src_path, "analyzer", "_parser_tables.py")):
+            results["tables"] = [_run_once(_env("tables", cache_dir)) for _ in range(args.runs)]
+        else:
+            print("(tables) omitido: ejecuta scripts/build_parser_tables.py primero.")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"{'modo':<10}{'mediana ms':>12}{'min ms':>10}{'max ms':>10}")
+    for mode, samples in results.items():
+        print(f"{mode:<10}{statistics.median(samples):>12.1f}{min(samples):>10.1f}{max(samples):>10.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Pico de memoria y tiempo al analizar un archivo grande de una vez
+(pipeline.run_pipeline) frente al análisis por procedimiento
+(streaming.analyze_stream), leyendo el archivo desde disco.
+
+Uso:
+    python src/analyzer/scripts/bench_streaming.py [--procs 500] [--stmts 10]
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../../'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from analyzer.parser import inline_parser
+from analyzer.pipeline import run_pipeline
+from analyzer.streaming import analyze_stream
+from bench_ast_memory import synthetic_source
+
+
+def _whole(path):
+    with open(path, encoding="utf-8") as f:
+        out = run_pipeline(f.read())[2]
+    return len(out["procedures"])
+
+
+def _stream(path):
+    with open(path, encoding="utf-8") as f:
+        return sum(1 for _ in analyze_stream(f))
+
+
+def _measure(fn, path):
+    t0 = time.perf_counter()
+    count = fn(path)
+    elapsed = time.perf_counter() - t0
+    gc.collect()
+    tracemalloc.start()
+    fn(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, peak, elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--procs", type=int, default=500)
+    ap.add_argument("--stmts", type=int, default=10)
+    args = ap.parse_args()
+
+    inline_parser()
+    with tempfile.NamedTemporaryFile("w", suffix=".pseudo", delete=False,
+                                     encoding="utf-8") as f:
+        f.write(synthetic_source(args.procs, args.stmts))
+        path = f.name
+    try:
+        print(f"{'modo':<10} {'procs':>6} {'pico MiB':>9} {'ms':>8}")
+        for label, fn in (("completo", _whole), ("streaming", _stream)):
+            count, peak, elapsed = _measure(fn, path)
+            print(f"{label:<10} {count:>6} {peak / 2**20:>9.1f} {elapsed * 1000:>8.0f}")
+    finally:
+        os.unlink(path)
+
+
+if __name__ == "__main__":
+    main()
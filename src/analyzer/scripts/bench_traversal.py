@@ -0,0 +1,170 @@
+"""
+Benchmark del recorrido del AST: detector bus (traversal.py, una pasada)
+frente a los dos recorridos recursivos anteriores (ProcAnalyzer.visit y
+patterns._walk), que se ejecutaban por separado sobre el mismo procedimiento.
+
+Se construyen procedimientos sintéticos directamente como AST (dicts):
+  - "ancho": muchas sentencias con bucles anidados, llamadas y expresiones.
+  - "profundo": bucles anidados a gran profundidad (los recorridos
+    recursivos agotan la pila de Python).
+
+Uso:
+    python src/analyzer/scripts/bench_traversal.py [--stmts 5000] [--depth 3000]
+"""
+import argparse
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../../'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from analyzer.traversal import scan_procedure
+
+
+# =============================================================================
+# Recorridos anteriores (copia de referencia, contando nodos visitados)
+# =============================================================================
+
+class _LegacyProcAnalyzer:
+    def __init__(self, proc_name):
+        self.proc_name = proc_name
+        self.loops, self.recursions, self.calls = [], [], []
+        self.max_nesting = self.current_nesting = 0
+        self.visited = 0
+
+    def visit(self, node):
+        if isinstance(node, list):
+            for item in node:
+                self.visit(item)
+            return
+        if not isinstance(node, dict):
+            return
+        self.visited += 1
+        typ = node.get("type")
+        is_loop = typ in ("For", "While", "Repeat")
+        if is_loop:
+            self.current_nesting += 1
+            self.max_nesting = max(self.max_nesting, self.current_nesting)
+            self.loops.append({"type": typ, "nesting": self.current_nesting})
+        if typ == "Call":
+            if node.get("name") == self.proc_name:
+                self.recursions.append({"args": node.get("args", [])})
+            else:
+                self.calls.append({"name": node.get("name"), "args": node.get("args", [])})
+        for key, value in node.items():
+            if key in ("type", "name", "var", "op", "param_type"):
+                continue
+            self.visit(value)
+        if is_loop:
+            self.current_nesting -= 1
+
+
+def _legacy_walk(node, depth, current_proc, ctx):
+    if isinstance(node, list):
+        for x in node:
+            _legacy_walk(x, depth, current_proc, ctx)
+        return
+    if not isinstance(node, dict):
+        return
+    ctx["visited"] += 1
+    nodetype = node.get("type")
+    if nodetype in ("For", "While", "Repeat"):
+        ctx["loops"].append({"type": nodetype})
+        ctx["max_nesting"] = max(ctx["max_nesting"], depth + 1)
+        _legacy_walk(node.get("body", []), depth + 1, current_proc, ctx)
+        return
+    if nodetype == "Call":
+        ctx["calls"].append({"name": node.get("name")})
+    if nodetype == "Return":
+        _legacy_walk(node.get("value"), depth, current_proc, ctx)
+        return
+    for v in node.values():
+        if isinstance(v, (dict, list)):
+            _legacy_walk(v, depth, current_proc, ctx)
+
+
+def _legacy(proc):
+    pa = _LegacyProcAnalyzer(proc["name"])
+    pa.visit(proc["body"])
+    ctx = {"loops": [], "calls": [], "max_nesting": 0, "visited": 0}
+    _legacy_walk(proc, 0, proc["name"], ctx)
+    return pa.visited + ctx["visited"]
+
+
+# =============================================================================
+# Procedimientos sintéticos
+# =============================================================================
+
+def _var(name):
+    return {"type": "LValue", "name": name}
+
+
+def _expr(length):
+    e = _var("x")
+    for k in range(length):
+        e = {"type": "BinOp", "left": e, "op": "+", "right": {"type": "Number", "value": k}}
+    return e
+
+
+def wide_procedure(stmts, nesting=3, expr_len=6):
+    body = []
+    for s in range(stmts):
+        inner = [
+            {"type": "Assign", "target": _var("x"), "value": _expr(expr_len)},
+            {"type": "Call", "name": "Helper", "args": [_var("x"), _expr(2)]},
+        ]
+        for d in range(nesting):
+            inner = [{"type": "For", "var": f"i{d}", "start": {"type": "Number", "value": 1},
+                      "end": _var("n"), "body": inner}]
+        body.extend(inner)
+    return {"type": "Procedure", "name": "Wide", "params": [{"name": "n", "param_type": "any"}], "body": body}
+
+
+def deep_procedure(depth):
+    body = [{"type": "Assign", "target": _var("x"), "value": _expr(2)}]
+    for d in range(depth):
+        body = [{"type": "While", "cond": _var("c"), "body": body}]
+    return {"type": "Procedure", "name": "Deep", "params": [], "body": body}
+
+
+def _time(fn, *args, repeat=3):
+    best = None
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best * 1000.0, out
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Detector bus vs recorridos anteriores")
+    ap.add_argument("--stmts", type=int, default=5000)
+    ap.add_argument("--depth", type=int, default=3000)
+    args = ap.parse_args(argv)
+
+    wide = wide_procedure(args.stmts)
+    legacy_ms, legacy_visits = _time(_legacy, wide)
+    bus_ms, scan = _time(scan_procedure, wide)
+    print(f"Procedimiento ancho ({args.stmts} sentencias, {len(scan['loops'])} bucles):")
+    print(f"  anterior : 2 pasadas, {legacy_visits:>8} visitas de nodo, {legacy_ms:8.1f} ms")
+    print(f"  bus      : 1 pasada,  {scan['visited']:>8} visitas de nodo, {bus_ms:8.1f} ms")
+
+    deep = deep_procedure(args.depth)
+    try:
+        legacy_ms, _ = _time(_legacy, deep, repeat=1)
+        legacy_txt = f"{legacy_ms:8.1f} ms"
+    except RecursionError:
+        legacy_txt = "RecursionError"
+    bus_ms, scan = _time(scan_procedure, deep, repeat=1)
+    print(f"Procedimiento profundo (anidamiento {args.depth}):")
+    print(f"  anterior : {legacy_txt}")
+    print(f"  bus      : {bus_ms:8.1f} ms (max_nesting={scan['max_nesting']})")
+
+
+if __name__ == "__main__":
+    main()
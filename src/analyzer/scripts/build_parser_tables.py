@@ -0,0 +1,44 @@
+"""
+Genera src/analyzer/_parser_tables.py: el parser LALR de grammar.lark
+guardado con Lark.save() dentro de un módulo de Python.
+
+Al importarse, parser.py lo recupera con Lark.load() sin recompilar la
+gramática (ANALYZER_PARSER_MODE=tables). El archivo guarda GRAMMAR_HASH; si la gramática
+cambia, parser.py lo ignora hasta que se vuelva a ejecutar este script.
+
+Uso:
+    python src/analyzer/scripts/build_parser_tables.py
+"""
+import io
+import os
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../../'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+import lark
+from lark import Lark
+
+from analyzer.parser import GRAMMAR, GRAMMAR_HASH, LARK_OPTIONS
+
+OUTPUT_PATH = os.path.abspath(os.path.join(current_dir, '..', '_parser_tables.py'))
+
+
+def main():
+    parser = Lark(GRAMMAR, **LARK_OPTIONS)
+    buffer = io.BytesIO()
+    parser.save(buffer)
+
+    with open(OUTPUT_PATH, "w", encoding="utf-8") as f:
+        f.write("# Archivo generado por scripts/build_parser_tables.py. NO EDITAR.\n")
+        f.write(f"# Lark v{lark.__version__}\n")
+        f.write(f"GRAMMAR_HASH = {GRAMMAR_HASH!r}\n")
+        f.write(f"DATA = {buffer.getvalue()!r}\n")
+
+    print(f"Tablas LALR generadas en: {OUTPUT_PATH} (hash {GRAMMAR_HASH})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
-from analyzer.diagram_generator import TraceGenerator
+import argparse
+
+from analyzer.diagram_generator import NODE_BUDGET, RENDER_TIMEOUT, TraceGenerator
 from analyzer.ast_transformer import tree_to_ast
 from analyzer.parser import parse_source
 import sys
@@ -194,35 +196,43 @@ ALGORITHMS = {
 
 
 def main():
-    print("\n🚀 INICIANDO GENERACIÓN MASIVA DE DIAGRAMAS CFG\n")
+    ap = argparse.ArgumentParser(description="Genera los diagramas CFG de ALGORITHMS.")
+    ap.add_argument("--out", default=os.path.abspath(os.path.join(src_path, '../docs/diagrams')),
+                    help="directorio de salida")
+    ap.add_argument("-j", "--jobs", type=int, default=None, help="renders en paralelo")
+    ap.add_argument("--format", default="png")
+    ap.add_argument("--force", action="store_true", help="re-renderizar aunque el DOT no cambie")
+    ap.add_argument("--max-depth", type=int, default=None,
+                    help="niveles de IF/bucles que se dibujan; los más profundos se resumen")
+    ap.add_argument("--budget", type=int, default=NODE_BUDGET, help="nodos visibles por diagrama")
+    ap.add_argument("--timeout", type=float, default=RENDER_TIMEOUT,
+                    help="segundos por render antes de pasar a la vista resumida")
+    args = ap.parse_args()
 
-    output_dir = os.path.abspath(os.path.join(src_path, '../docs/diagrams'))
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        print(f"📂 Directorio creado: {output_dir}")
-
-    success_count = 0
+    print("\n🚀 INICIANDO GENERACIÓN MASIVA DE DIAGRAMAS CFG\n")
 
+    procedures = []
     for name, code in ALGORITHMS.items():
         try:
-            print(f"🎨 Generando: {name}...", end=" ")
             tree = parse_source(code)
             ast = tree_to_ast(tree)
-
-            # Instanciar generador
-            gen = TraceGenerator(ast)
             # Sobrescribimos el nombre en el AST para que el archivo tenga el nombre de la clave (ej: 1_LinearSearch)
             ast["procedures"][0]["name"] = name
-
-            gen.generate()
-            print("✅ Hecho.")
-            success_count += 1
+            procedures.append(ast["procedures"][0])
         except Exception as e:
-            print(f"❌ Error: {e}")
+            print(f"❌ Error en {name}: {e}")
+
+    # Un solo generador para todos: los renders corren en paralelo y se
+    # omiten los que no cambiaron.
+    gen = TraceGenerator({"procedures": procedures}, output_format=args.format, output_dir=args.out,
+                         max_depth=args.max_depth, node_budget=args.budget, timeout=args.timeout)
+    status = gen.generate(workers=args.jobs, force=args.force)
+    done = sum(1 for s in status.values() if s != "error")
+    skipped = sum(1 for s in status.values() if s == "skipped")
 
     print(
-        f"\n✨ PROCESO COMPLETADO: {success_count}/{len(ALGORITHMS)} diagramas generados.")
-    print(f"📂 Ubicación: {output_dir}")
+        f"\n✨ PROCESO COMPLETADO: {done}/{len(ALGORITHMS)} diagramas al día ({skipped} sin cambios).")
+    print(f"📂 Ubicación: {args.out}")
 
 
 if __name__ == "__main__":
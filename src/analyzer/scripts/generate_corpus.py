@@ -0,0 +1,85 @@
+"""
+Genera un corpus sintético (analyzer.corpus.CorpusGenerator) en disco, con
+su manifiesto JSON Lines de complejidades esperadas.
+
+Con --verify analiza el corpus con streaming.analyze_stream y compara cada
+procedimiento con el manifiesto (correctitud y tiempo).
+
+Uso:
+    python src/analyzer/scripts/generate_corpus.py out.pseudo [--seed 0] [--procs 1000]
+        [--stmts 10] [--depth 3] [--expr-len 3] [--recursion 0.25]
+        [--patterns linear,divide_conquer,binary] [--classes 0] [--verify]
+
+El manifiesto se escribe en <out>.manifest.jsonl.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+src_path = os.path.abspath(os.path.join(current_dir, '../../'))
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
+
+from analyzer.corpus import CorpusGenerator, RECURSION_PATTERNS
+from analyzer.streaming import analyze_stream
+
+
+def verify(path, manifest_path):
+    """Devuelve (procedimientos, discrepancias, segundos)."""
+    with open(manifest_path, encoding="utf-8") as f:
+        expected = {r["name"]: r for r in map(json.loads, f)}
+    mismatches = []
+    count = 0
+    t0 = time.perf_counter()
+    with open(path, encoding="utf-8") as f:
+        for rec in analyze_stream(f):
+            if rec["kind"] != "procedure":
+                continue
+            count += 1
+            want = expected.get(rec["name"], {}).get("expected", {}).get("big_theta")
+            got = rec["analysis"]["big_theta"] if rec["ok"] else rec["error"]["type"]
+            if got != want:
+                mismatches.append((rec["name"], want, got))
+    return count, mismatches, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("output")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--procs", type=int, default=1000)
+    ap.add_argument("--stmts", type=int, default=10)
+    ap.add_argument("--depth", type=int, default=3)
+    ap.add_argument("--expr-len", type=int, default=3)
+    ap.add_argument("--recursion", type=float, default=0.25)
+    ap.add_argument("--patterns", default=",".join(RECURSION_PATTERNS))
+    ap.add_argument("--classes", type=int, default=0)
+    ap.add_argument("--verify", action="store_true")
+    args = ap.parse_args()
+
+    gen = CorpusGenerator(seed=args.seed, procs=args.procs, stmts=args.stmts,
+                          depth=args.depth, expr_len=args.expr_len,
+                          recursion=args.recursion,
+                          patterns=tuple(p for p in args.patterns.split(",") if p),
+                          classes=args.classes)
+    manifest_path = args.output + ".manifest.jsonl"
+    t0 = time.perf_counter()
+    size = gen.write(args.output, manifest_path)
+    print(f"{args.output}: {size / 2**20:.1f} MiB, {args.procs} procedimientos "
+          f"({time.perf_counter() - t0:.1f} s); manifiesto en {manifest_path}")
+
+    if args.verify:
+        count, mismatches, elapsed = verify(args.output, manifest_path)
+        print(f"verificados {count} procedimientos en {elapsed:.1f} s "
+              f"({count / elapsed:.0f} proc/s), {len(mismatches)} discrepancias")
+        for name, want, got in mismatches[:20]:
+            print(f"  {name}: esperado {want}, obtenido {got}")
+        return 1 if mismatches else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# src/analyzer/session.py
+"""
+Re-análisis incremental para integraciones con editores.
+
+AnalysisSession guarda, por cada procedimiento, el AST, el contexto de
+patrones y la salida del motor, indexados por el hash del texto del
+procedimiento (ya normalizado, sin números de línea). En cada update sólo
+se parsean y analizan los procedimientos cuyo hash cambió; la propagación
+de costos por el grafo de llamadas se rehace siempre, sobre los resultados
+guardados.
+"""
+import hashlib
+from typing import Any, Dict, List
+
+from .ast_nodes import Program
+from .parser import parse_lines
+from .static_analyzer import analyze_ast_for_patterns
+from .complexity_engine import infer_complexity, infer_procedure
+from .call_graph import propagate_costs
+from .streaming import iter_chunks
+
+
+def _chunk_hash(chunk) -> str:
+    h = hashlib.sha256(chunk.kind.encode("utf-8"))
+    for _, text in chunk.lines:
+        h.update(b"\n")
+        h.update(text.encode("utf-8"))
+    return h.hexdigest()
+
+
+class _Entry:
+    """Resultado de un fragmento; `error_offset` es relativo a su primera línea."""
+    __slots__ = ("program", "patterns", "analysis", "error", "error_offset")
+
+    def __init__(self):
+        self.program = None
+        self.patterns = {}
+        self.analysis = {}
+        self.error = None
+        self.error_offset = None
+
+
+class AnalysisSession:
+    """
+    Uso:
+        session = AnalysisSession()
+        out = session.update(source)      # {"procedures": {...}} como infer_complexity
+        session.program                   # último Program
+        session.patterns                  # salida de analyze_ast_for_patterns
+        session.errors                    # [{name, line, type, message}]
+
+    `reparsed` y `reused` cuentan los fragmentos del último update.
+    """
+
+    def __init__(self, compact: bool = False, hashcons: bool = False):
+        self.compact = compact
+        self.hashcons = hashcons
+        self._entries: Dict[str, _Entry] = {}
+        self.program = None
+        self.patterns = {"procedures": {}}
+        self.analysis = {"procedures": {}}
+        self.errors: List[Dict[str, Any]] = []
+        self.reparsed = 0
+        self.reused = 0
+
+    def update(self, source) -> Dict[str, Any]:
+        entries = {}
+        classes, procedures = [], []
+        patterns, analysis = {}, {}
+        errors = []
+        self.reparsed = self.reused = 0
+
+        for chunk in iter_chunks(source):
+            key = _chunk_hash(chunk)
+            entry = entries.get(key) or self._entries.get(key)
+            if entry is None:
+                entry = self._analyze(chunk)
+                self.reparsed += 1
+            else:
+                self.reused += 1
+            entries[key] = entry
+
+            if entry.error is not None:
+                errors.append(dict(entry.error, name=chunk.name,
+                                   line=chunk.start_line + entry.error_offset))
+                continue
+            classes.extend(entry.program.get("classes", []))
+            procedures.extend(entry.program.get("procedures", []))
+            patterns.update(entry.patterns)
+            analysis.update(entry.analysis)
+
+        # Sólo se conservan los fragmentos presentes en la última versión.
+        self._entries = entries
+        if self.compact:
+            self.program = Program(classes=classes, procedures=procedures)
+        else:
+            self.program = {"type": "Program", "classes": classes, "procedures": procedures}
+        self.patterns = {"procedures": patterns}
+        # Los resultados por fragmento son locales; el costo de las llamadas
+        # entre procedimientos se propaga sobre el programa completo (lineal).
+        final = propagate_costs(patterns, lambda name, calls: self._local(name, calls, patterns, analysis))
+        self.analysis = {"procedures": {name: final[name] for name in analysis}}
+        self.errors = errors
+        return self.analysis
+
+    @staticmethod
+    def _local(name, calls, patterns, analysis):
+        # Cada fragmento se analizó solo; un procedimiento recursivo que llama
+        # a otros se rehace para sumar ese costo a su recurrencia.
+        if calls is None or not patterns[name].get("recursions"):
+            return analysis[name]
+        return infer_procedure(name, patterns[name], calls)
+
+    def _analyze(self, chunk) -> _Entry:
+        entry = _Entry()
+        try:
+            entry.program = parse_lines(chunk.lines, to_ast=True, compact=self.compact,
+                                        hashcons=self.hashcons)
+        except Exception as e:
+            line = getattr(e, "line", None) or chunk.start_line
+            entry.error = {"type": type(e).__name__, "message": str(e)}
+            entry.error_offset = line - chunk.start_line
+            return entry
+        if chunk.kind == "procedure":
+            ctx = analyze_ast_for_patterns(entry.program)
+            entry.patterns = ctx["procedures"]
+            entry.analysis = infer_complexity(ctx)["procedures"]
+        return entry
@@ -1,90 +1,137 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
+
+from . import instrumentation
+from .ast_nodes import is_node
+from .cfg import CFG, build_cfg
+from .traversal import CallDetector, DetectorBus, scan_procedure
+
+
+class PatternContext(dict):
+    """
+    Salida de analyze_ast_for_patterns: un dict de datos (se copia, se
+    serializa a JSON y con pickle queda como dict). Los CFG de los
+    procedimientos van aparte, en `cfgs`, y viven lo que el contexto.
+    """
+    __slots__ = ("cfgs",)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cfgs: Dict[str, CFG] = {}
+
+    def cfg(self, proc) -> Optional[CFG]:
+        """CFG ya construido de `proc`, o None si no es el analizado."""
+        cfg = self.cfgs.get(proc.get("name"))
+        return cfg if cfg is not None and cfg.proc is proc else None
+
+    def __reduce__(self):
+        return dict, (dict(self),)
 
 
 def analyze_ast_for_patterns(ast: Dict[str, Any]) -> Dict[str, Any]:
     procedures = {}
-    if not ast or not isinstance(ast, dict):
-        return {"procedures": {}}
+    ctx = PatternContext(procedures=procedures)
+    if not ast or not is_node(ast):
+        return ctx
 
     procs_list = ast.get("procedures", [])
 
+    inst = instrumentation.current()
     for proc in procs_list:
         proc_name = proc.get("name")
-        body = proc.get("body", [])
-
-        analyzer = ProcAnalyzer(proc_name)
-        analyzer.visit(body)
-
-        procedures[proc_name] = {
-            "loops": analyzer.loops,
-            "recursions": analyzer.recursions,
-            "calls": analyzer.calls,
-            "max_nesting": analyzer.max_nesting
-        }
-
-    return {"procedures": procedures}
+        scan = scan_procedure(proc)
+        cfg = ctx.cfgs[proc_name] = build_cfg(proc)
+        procedures[proc_name] = _proc_context(scan, cfg)
+        if inst is not None:
+            inst.count("procedures")
+            inst.count("ast_nodes", scan["visited"])
+            inst.count("loops", len(scan["loops"]))
+            inst.count("recursions", sum(1 for c in scan["calls"] if c["recursive"]))
+
+    return ctx
+
+
+def _proc_context(scan: Dict[str, Any], cfg) -> Dict[str, Any]:
+    """
+    Contexto de un procedimiento: sólo datos (se puede copiar, serializar o
+    guardar en caché). El anidamiento, la complejidad ciclomática y las
+    salidas tempranas se leen de `cfg`; el CFG mismo queda en PatternContext.cfgs.
+    """
+    recursions = []
+    calls = []
+    for c in scan["calls"]:
+        if c["recursive"]:
+            recursions.append({"args": c["args"], "nesting": c["nesting"], "branch": c["branch"]})
+        else:
+            calls.append({"name": c["name"], "args": c["args"], "nesting": c["nesting"],
+                          "branch": c["branch"]})
+    return {
+        "params": scan["params"],
+        "loops": scan["loops"],
+        "recursions": recursions,
+        "calls": calls,
+        "max_nesting": cfg.max_loop_depth,
+        "allocations": scan["allocations"],
+        "midpoints": scan["midpoints"],
+        "size_guards": scan["size_guards"],
+        "cyclomatic": cfg.cyclomatic(),
+        "early_exits": [{"depth": cfg.depth[b], "loop": cfg.node[cfg.head[b]].get("type")}
+                        for b in cfg.early_exits()],
+        "min_recursions": _min_recursions(cfg, scan["size_guards"]) if recursions else 0,
+    }
+
+
+def _block_parts(cfg: CFG, b: int) -> List[Any]:
+    """Lo que se evalúa en el bloque b: sus sentencias o la condición / límites."""
+    kind, node = cfg.kind[b], cfg.node[b]
+    if kind == "block":
+        return cfg.stmts[b]
+    if kind in ("cond", "until") or (kind == "loop" and node.get("type") == "While"):
+        return [node.get("cond")]
+    if kind == "loop" and node.get("type") == "For":
+        return [node.get("start"), node.get("end")]
+    return []
+
+
+def _min_recursions(cfg: CFG, size_guards) -> Optional[int]:
+    """
+    Mínimo de autollamadas en un camino que se puede tomar con n grande
+    (un RETURN sin llamadas en cualquier rama da 0). En un IF de
+    `size_guards` (caso base) se toma la rama con más llamadas.
+    """
+    weight = []
+    for b in range(len(cfg)):
+        parts = [p for p in _block_parts(cfg, b) if p is not None]
+        if not parts:
+            weight.append(0)
+            continue
+        calls = CallDetector(cfg.name)
+        DetectorBus([calls]).run(parts)
+        weight.append(sum(1 for c in calls.calls if c["recursive"]))
+    guards = set(size_guards)
+    costliest = frozenset(b for b in range(len(cfg))
+                          if cfg.kind[b] == "cond" and id(cfg.node[b]) in guards)
+    return cfg.min_path(weight, costliest)
 
 
 class ProcAnalyzer:
+    """
+    Interfaz anterior (visit + atributos). Internamente usa el recorrido
+    único de traversal.scan_procedure.
+    """
+
     def __init__(self, proc_name):
         self.proc_name = proc_name
         self.loops = []
         self.recursions = []
         self.calls = []
+        self.allocations = []
         self.max_nesting = 0
-        self.current_nesting = 0
 
     def visit(self, node):
-        # 1. Iterar listas (ej: body, args)
-        if isinstance(node, list):
-            for item in node:
-                self.visit(item)
-            return
-
-        # 2. Ignorar primitivos
-        if not isinstance(node, dict):
-            return
-
-        typ = node.get("type")
-
-        # --- DETECTAR BUCLES ---
-        is_loop = typ in ("For", "While", "Repeat")
-        if is_loop:
-            self.current_nesting += 1
-            self.max_nesting = max(self.max_nesting, self.current_nesting)
-
-            if typ == "For":
-                self.loops.append({
-                    "type": "For",
-                    "var": node.get("var"),
-                    "start": node.get("start"),
-                    "end": node.get("end"),
-                    "nesting": self.current_nesting
-                })
-            else:
-                self.loops.append(
-                    {"type": typ, "nesting": self.current_nesting})
-
-        # --- DETECTAR LLAMADAS ---
-        if typ == "Call":
-            name = node.get("name")
-            args = node.get("args", [])
-            if name == self.proc_name:
-                self.recursions.append({"args": args})
-            else:
-                self.calls.append({"name": name, "args": args})
-            # No retornamos aquí, dejamos que el crawler visite los argumentos abajo
-
-        # --- CRAWLER UNIVERSAL (Fuerza Bruta) ---
-        # Visitamos TODOS los valores del diccionario, sin importar la clave.
-        # Esto entra en 'value', 'left', 'right', 'cond', 'then', 'body', 'args', etc.
-        for key, value in node.items():
-            # Evitamos metadatos simples para eficiencia
-            if key in ("type", "name", "var", "op", "param_type"):
-                continue
-
-            self.visit(value)
-
-        # Restaurar nesting
-        if is_loop:
-            self.current_nesting -= 1
+        proc = {"name": self.proc_name, "body": node}
+        ctx = _proc_context(scan_procedure(proc), build_cfg(proc))
+        self.loops.extend(ctx["loops"])
+        self.recursions.extend(ctx["recursions"])
+        self.calls.extend(ctx["calls"])
+        self.allocations.extend(ctx["allocations"])
+        self.max_nesting = max(self.max_nesting, ctx["max_nesting"])
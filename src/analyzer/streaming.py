@@ -0,0 +1,128 @@
+# src/analyzer/streaming.py
+"""
+Análisis en streaming de archivos con muchos procedimientos.
+
+En lugar de parsear el archivo como un único Program, se localizan los
+límites PROCEDURE ... END de primer nivel (contando BEGIN/END) y cada
+procedimiento se parsea y analiza por separado. Las declaraciones de clase
+(que la gramática sólo admite al principio) se parsean una vez, antes del
+primer procedimiento.
+
+La memoria queda acotada por el procedimiento más grande y un error de
+sintaxis sólo afecta al procedimiento que lo contiene.
+"""
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .preprocessor import Source, _iter_numbered
+from .parser import parse_lines
+from .static_analyzer import analyze_ast_for_patterns
+from .complexity_engine import infer_complexity
+
+_KEYWORDS = re.compile(r"\b(PROCEDURE|BEGIN|END)\b")
+_PROC_NAME = re.compile(r"PROCEDURE\s+([A-Za-z_][A-Za-z0-9_]*)")
+
+
+class SourceChunk(NamedTuple):
+    """Fragmento de primer nivel: "classes" (preámbulo) o "procedure"."""
+    kind: str
+    name: Optional[str]
+    start_line: int
+    lines: List[Tuple[int, str]]   # (línea original, texto normalizado)
+
+
+def _chunk(kind, buf):
+    name = None
+    if kind == "procedure":
+        m = _PROC_NAME.match(buf[0][1].lstrip())
+        name = m.group(1) if m else None
+    return SourceChunk(kind, name, buf[0][0], buf)
+
+
+def iter_chunks(source: Source) -> Iterator[SourceChunk]:
+    """
+    Divide la fuente en fragmentos de primer nivel, en una pasada y sin
+    cargarla entera. Un PROCEDURE que aparece antes de cerrar el anterior
+    abre un fragmento nuevo (los procedimientos no se anidan), así un END
+    que falta no arrastra al resto del archivo.
+    """
+    buf: List[Tuple[int, str]] = []
+    kind = "classes"
+    in_proc = False
+    depth = 0
+
+    for lineno, line in _iter_numbered(source):
+        pos = 0
+        for m in _KEYWORDS.finditer(line):
+            kw = m.group(1)
+            if kw == "PROCEDURE":
+                head = line[pos:m.start()]
+                if head.strip():
+                    buf.append((lineno, head))
+                if buf:
+                    yield _chunk(kind, buf)
+                buf = []
+                pos = m.start()
+                kind = "procedure"
+                in_proc = True
+                depth = 0
+            elif not in_proc:
+                continue
+            elif kw == "BEGIN":
+                depth += 1
+            elif depth > 0:
+                depth -= 1
+                if depth == 0:
+                    buf.append((lineno, line[pos:m.end()]))
+                    yield _chunk(kind, buf)
+                    buf = []
+                    pos = m.end()
+                    in_proc = False
+        rest = line[pos:]
+        if rest.strip():
+            buf.append((lineno, rest))
+
+    if buf:
+        yield _chunk(kind, buf)
+
+
+def analyze_stream(source: Source, include_ast: bool = False,
+                   compact: bool = False) -> Iterator[Dict[str, Any]]:
+    """
+    Analiza `source` (str, archivo abierto o iterable de fragmentos)
+    procedimiento a procedimiento y produce un registro por fragmento:
+
+        {"kind": "procedure", "name", "line", "ok", "analysis", "error" [, "ast"]}
+
+    "analysis" es la entrada de infer_complexity para ese procedimiento,
+    analizado solo: el costo de las llamadas a otros procedimientos no se
+    propaga (ver call_graph; AnalysisSession sí lo hace). Si el
+    fragmento no parsea, ok=False y error={type, message, line} (línea original).
+    Si hay declaraciones de clase, el primer registro es de kind "classes"
+    (analysis None; con include_ast, "ast" es la lista de nodos Class).
+    """
+    for chunk in iter_chunks(source):
+        record = {"kind": chunk.kind, "name": chunk.name, "line": chunk.start_line,
+                  "ok": True, "analysis": None, "error": None}
+        try:
+            program = parse_lines(chunk.lines, to_ast=True, compact=compact)
+        except Exception as e:
+            record.update(ok=False, error={"type": type(e).__name__, "message": str(e),
+                                           "line": getattr(e, "line", None)})
+            yield record
+            continue
+
+        if chunk.kind == "classes":
+            if include_ast:
+                record["ast"] = program.get("classes", [])
+            yield record
+            continue
+
+        # El fragmento contiene un único procedimiento.
+        out = infer_complexity(analyze_ast_for_patterns(program))
+        for proc in program.get("procedures", []):
+            name = proc.get("name")
+            record = dict(record, name=name, analysis=out["procedures"][name])
+            if include_ast:
+                record["ast"] = proc
+            yield record
@@ -0,0 +1,308 @@
+# src/analyzer/traversal.py
+"""
+Recorrido único del AST con despacho por tipo de nodo.
+
+Los detectores se registran para ciertos tipos de nodo ("For", "Call", ...)
+y el DetectorBus los atiende a todos en una sola pasada por procedimiento.
+El recorrido es iterativo (pila explícita), en preorden y en el mismo orden
+de claves que el AST, así que procedimientos muy anidados no consumen pila
+de Python.
+
+Acepta el AST en forma de dict o con nodos compactos (ast_nodes.Node); con
+estos últimos los hijos se leen de `child_fields_rev` sin recorrer claves.
+"""
+import sys
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Tuple
+
+from .ast_nodes import Node, is_node
+
+LOOP_TYPES = ("For", "While", "Repeat")
+
+# Claves con metadatos escalares: nunca contienen subárboles.
+SKIP_KEYS = frozenset(("type", "name", "var", "op", "param_type", "var_type"))
+
+
+class Detector:
+    """
+    Base de los detectores. `node_types` indica los tipos que escucha;
+    `visit(node, depth)` recibe el nodo y el número de bucles que lo encierran
+    (sin contar el propio nodo). Durante la visita, `self.bus.branch` es la
+    rama actual (ver DetectorBus).
+    """
+    node_types: Tuple[str, ...] = ()
+    bus: "DetectorBus" = None
+
+    def visit(self, node: Dict[str, Any], depth: int) -> None:
+        """Por defecto no hace nada; cada detector la redefine."""
+
+
+# Campos de If cuyos subárboles son ramas excluyentes.
+BRANCH_FIELDS = ("then", "else_")
+
+
+class DetectorBus:
+    """
+    `branch` identifica la rama en la que está el nodo visitado: una tupla de
+    (id del If, "then" | "else_") desde el If más externo. Dos nodos son
+    excluyentes si sus ramas difieren en algún If común.
+    """
+
+    def __init__(self, detectors: Iterable[Detector]):
+        self.detectors = list(detectors)
+        self._dispatch: Dict[str, List[Callable]] = {}
+        for det in self.detectors:
+            det.bus = self
+            for typ in det.node_types:
+                self._dispatch.setdefault(typ, []).append(det.visit)
+        self.visited = 0
+        self.branch: Tuple = ()
+
+    def run(self, root: Any) -> "DetectorBus":
+        dispatch = self._dispatch
+        stack = []
+        pop, push = stack.pop, stack.append
+
+        node_types = (dict, Node)
+
+        def push_list(items, depth, branch):
+            for item in reversed(items):
+                if isinstance(item, node_types):
+                    push((item, depth, branch))
+                elif isinstance(item, list):
+                    push_list(item, depth, branch)
+
+        if isinstance(root, node_types):
+            push((root, 0, ()))
+        elif isinstance(root, list):
+            push_list(root, 0, ())
+        visited = 0
+
+        while stack:
+            node, depth, branch = pop()
+            visited += 1
+            compact = isinstance(node, Node)
+            typ = node.type if compact else node.get("type")
+            handlers = dispatch.get(typ)
+            if handlers:
+                self.branch = branch
+                for handler in handlers:
+                    handler(node, depth)
+
+            if typ in LOOP_TYPES:
+                depth += 1
+            is_if = typ == "If"
+            # Hijos en orden inverso para conservar el preorden al desapilar.
+            if compact:
+                for field in node.child_fields_rev:
+                    value = getattr(node, field)
+                    b = branch + ((id(node), field),) if is_if and field in BRANCH_FIELDS else branch
+                    if isinstance(value, list):
+                        push_list(value, depth, b)
+                    elif isinstance(value, Node):
+                        push((value, depth, b))
+                continue
+            for key, value in reversed(node.items()):
+                if key in SKIP_KEYS:
+                    continue
+                b = branch + ((id(node), key),) if is_if and key in BRANCH_FIELDS else branch
+                if isinstance(value, list):
+                    push_list(value, depth, b)
+                elif isinstance(value, node_types):
+                    push((value, depth, b))
+
+        self.visited += visited
+        return self
+
+
+# =============================================================================
+# Símbolos libres
+# =============================================================================
+
+EMPTY_SYMBOLS: FrozenSet[str] = frozenset()
+# Un único objeto por conjunto distinto: los bucles con los mismos símbolos
+# comparten el frozenset.
+_SYMBOL_SETS: Dict[FrozenSet[str], FrozenSet[str]] = {EMPTY_SYMBOLS: EMPTY_SYMBOLS}
+
+
+def intern_symbols(names: Iterable[str]) -> FrozenSet[str]:
+    fs = frozenset(names)
+    return _SYMBOL_SETS.setdefault(fs, fs)
+
+
+def free_symbols(*exprs: Any) -> FrozenSet[str]:
+    """
+    Identificadores que aparecen en las expresiones, en minúsculas e
+    internados (como compara el motor). El nombre de una llamada no cuenta,
+    sus argumentos sí; en "a.b" cuentan "a" y "b".
+    """
+    names = set()
+    stack = [e for e in exprs if e is not None]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, list):
+            stack.extend(node)
+            continue
+        if not isinstance(node, (dict, Node)):
+            continue
+        typ = node.get("type")
+        if typ in ("Identifier", "LValue", "ArrayAccess"):
+            for part in (node.get("name") or "").split("."):
+                if part:
+                    names.add(sys.intern(part.lower()))
+        if typ in ("Identifier", "LValue", "Number", "Literal"):
+            continue
+        for key, value in node.items():
+            if key not in SKIP_KEYS and isinstance(value, (list, dict, Node)):
+                stack.append(value)
+    return intern_symbols(names) if names else EMPTY_SYMBOLS
+
+
+# =============================================================================
+# Detectores
+# =============================================================================
+
+class LoopDetector(Detector):
+    node_types = LOOP_TYPES
+
+    def __init__(self):
+        self.loops: List[Dict[str, Any]] = []
+
+    def visit(self, node, depth):
+        typ = node.get("type")
+        if typ == "For":
+            start, end = node.get("start"), node.get("end")
+            self.loops.append({
+                "type": "For",
+                "var": node.get("var"),
+                "start": start,
+                "end": end,
+                "symbols": free_symbols(start, end),
+                "nesting": depth + 1,
+            })
+        else:
+            self.loops.append({"type": typ, "nesting": depth + 1})
+
+
+class NestingDetector(Detector):
+    node_types = LOOP_TYPES
+
+    def __init__(self):
+        self.max_nesting = 0
+
+    def visit(self, node, depth):
+        if depth + 1 > self.max_nesting:
+            self.max_nesting = depth + 1
+
+
+class CallDetector(Detector):
+    """Llamadas en orden de aparición; `recursive` marca las autollamadas."""
+    node_types = ("Call",)
+
+    def __init__(self, proc_name: str):
+        self.proc_name = proc_name
+        self.calls: List[Dict[str, Any]] = []
+
+    def visit(self, node, depth):
+        name = node.get("name")
+        self.calls.append({
+            "name": name,
+            "args": node.get("args", []),
+            "nesting": depth,
+            "recursive": name == self.proc_name,
+            "branch": self.bus.branch if self.bus is not None else (),
+        })
+
+
+class ArrayAllocDetector(Detector):
+    node_types = ("ArrayDecl",)
+
+    def __init__(self):
+        self.allocations: List[Dict[str, Any]] = []
+
+    def visit(self, node, depth):
+        self.allocations.append({
+            "name": node.get("name"),
+            "size": node.get("size"),
+            "nesting": depth,
+        })
+
+
+class MidpointDetector(Detector):
+    """Asignaciones `v <- expr / c` o `v <- expr div c` (c > 1): v parte el rango en c."""
+    node_types = ("Assign",)
+
+    def __init__(self):
+        self.midpoints: Dict[str, int] = {}
+
+    def visit(self, node, depth):
+        target, value = node.get("target"), node.get("value")
+        if not (is_node(target) and target.get("type") in ("LValue", "Identifier")):
+            return
+        if is_node(value) and value.get("type") == "BinOp" and value.get("op") in ("/", "div"):
+            right = value.get("right")
+            if is_node(right) and right.get("type") == "Number" and right.get("value") > 1:
+                self.midpoints[target.get("name")] = right.get("value")
+
+
+# Operadores de una condición de IF (comparaciones y conectores lógicos).
+CONDITION_OPS = frozenset(("<", ">", "<=", ">=", "=", "<>", "≠", "≤", "≥", "and", "or"))
+
+
+def is_size_test(cond, params: FrozenSet[str]) -> bool:
+    """¿La condición sólo compara parámetros y constantes (p. ej. `n <= 1`, `low < high`)?"""
+    if not (is_node(cond) and cond.get("type") == "BinOp" and cond.get("op") in CONDITION_OPS):
+        return False
+    stack = [cond]
+    while stack:
+        node = stack.pop()
+        if not is_node(node):
+            return False
+        typ = node.get("type")
+        if typ in ("Identifier", "LValue"):
+            if node.get("name") not in params:
+                return False
+        elif typ == "BinOp":
+            stack.append(node.get("left"))
+            stack.append(node.get("right"))
+        elif typ == "Unary":
+            stack.append(node.get("expr"))
+        elif typ != "Number":
+            return False
+    return True
+
+
+class GuardDetector(Detector):
+    """IF cuya condición es un test de tamaño sobre los parámetros (caso base), por id del nodo."""
+    node_types = ("If",)
+
+    def __init__(self, params: Iterable[str]):
+        self.params = frozenset(params)
+        self.size_guards: List[int] = []
+
+    def visit(self, node, depth):
+        if is_size_test(node.get("cond"), self.params):
+            self.size_guards.append(id(node))
+
+
+def scan_procedure(proc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Una pasada sobre el cuerpo de `proc` con todos los detectores estándar.
+    """
+    loops = LoopDetector()
+    nesting = NestingDetector()
+    calls = CallDetector(proc.get("name"))
+    allocs = ArrayAllocDetector()
+    mids = MidpointDetector()
+    params = [p.get("name") for p in proc.get("params", []) or []]
+    guards = GuardDetector(params)
+    bus = DetectorBus([loops, nesting, calls, allocs, mids, guards]).run(proc.get("body", []))
+    return {
+        "params": params,
+        "loops": loops.loops,
+        "calls": calls.calls,
+        "max_nesting": nesting.max_nesting,
+        "allocations": allocs.allocations,
+        "midpoints": mids.midpoints,
+        "size_guards": guards.size_guards,
+        "visited": bus.visited,
+    }
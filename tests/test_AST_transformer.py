@@ -15,3 +15,54 @@ def test_ast_has_program():
     ast = tree_to_ast(tree)
     assert ast["type"] == "Program"
     assert len(ast["procedures"]) == 1
+
+
+COMPACT_SRC = """
+Clase Nodo {valor siguiente}
+
+PROCEDURE Suma(int n, A)
+BEGIN
+    int B[n];
+    total <- 0;
+    FOR i <- 1 TO n DO
+    BEGIN
+        IF A[i] > 0 and not F THEN
+        BEGIN
+            total <- total + A[i] * 2;
+        END
+    END
+    WHILE total > 10 DO
+    BEGIN
+        total <- total - length(A);
+    END
+    RETURN -total;
+END
+"""
+
+
+def test_compact_ast_round_trips_to_dict():
+    from analyzer.ast_nodes import Node, NodeKind
+
+    tree = parse_source(COMPACT_SRC)
+    ast = tree_to_ast(tree)
+    compact = tree_to_ast(tree, compact=True)
+
+    assert isinstance(compact, Node)
+    assert compact.to_dict() == ast
+
+    proc = compact["procedures"][0]
+    assert proc.kind == NodeKind.PROCEDURE
+    assert proc.get("type") == "Procedure"
+    assert proc["params"][0].get("type") is None
+    cond = proc["body"][2]["body"][0]["cond"]
+    assert cond["op"] == "and"
+    assert cond["left"]["op"] == ">"
+    assert cond["right"]["op"] == "not"
+
+
+def test_conditions_and_unary_minus_are_ast_nodes():
+    ast = tree_to_ast(parse_source(COMPACT_SRC))
+    body = ast["procedures"][0]["body"]
+    assert body[2]["body"][0]["cond"]["type"] == "BinOp"
+    assert body[-1]["value"] == {"type": "Unary", "op": "-",
+                                 "expr": {"type": "LValue", "name": "total"}}
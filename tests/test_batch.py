@@ -0,0 +1,47 @@
+from analyzer.batch import analyze_many
+
+LINEAR = """
+PROCEDURE Linear(n)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        x <- i;
+    END
+END
+"""
+
+QUADRATIC = """
+PROCEDURE Quad(n)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        FOR j <- 1 TO n DO
+        BEGIN
+            x <- i;
+        END
+    END
+END
+"""
+
+BROKEN = "PROCEDURE X ( BEGIN"
+
+
+def test_analyze_many_keeps_order_and_isolates_errors():
+    sources = [LINEAR, BROKEN, QUADRATIC] * 4
+    results = analyze_many(sources, workers=2, chunksize=2)
+
+    assert [r["index"] for r in results] == list(range(len(sources)))
+    for r, src in zip(results, sources):
+        if src is BROKEN:
+            assert r["ok"] is False
+            assert r["error"]["type"]
+        else:
+            assert r["ok"] is True
+
+    assert results[0]["analysis"]["procedures"]["Linear"]["big_theta"] == "Theta(n)"
+    assert results[2]["analysis"]["procedures"]["Quad"]["big_theta"] == "Theta(n**2)"
+
+
+def test_analyze_many_single_worker_includes_ast():
+    results = analyze_many([LINEAR], workers=1, include_ast=True)
+    assert results[0]["ast"]["type"] == "Program"
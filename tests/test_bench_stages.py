@@ -0,0 +1,27 @@
+import os
+import sys
+
+SCRIPTS = os.path.join(os.path.dirname(__file__), "..", "src", "analyzer", "scripts")
+sys.path.insert(0, os.path.abspath(SCRIPTS))
+
+import bench_stages  # noqa: E402
+
+
+def test_run_reports_every_stage():
+    groups = {"examples": list(bench_stages.ALGORITHMS.values())[:2]}
+    result = bench_stages.run(groups, repeat=1)
+    stages = result["results"]["examples"]
+    assert set(stages) == set(bench_stages.STAGES)
+    assert all(v["min_ms"] >= 0 for v in stages.values())
+
+
+def test_compare_flags_regressions_over_threshold():
+    def res(parse_ms, ast_ms):
+        return {"results": {"g": {"parse": {"min_ms": parse_ms},
+                                  "ast": {"min_ms": ast_ms}}}}
+
+    _, regressions = bench_stages.compare(res(10.0, 1.0), res(12.5, 1.1), threshold=20)
+    assert [r[1] for r in regressions] == ["parse"]
+    # Por debajo de min_ms no cuenta aunque el porcentaje sea alto.
+    _, regressions = bench_stages.compare(res(0.01, 1.0), res(0.03, 1.0), threshold=20)
+    assert regressions == []
@@ -0,0 +1,169 @@
+import time
+
+from analyzer.call_graph import format_cost, parse_cost, strongly_connected
+from analyzer.complexity_engine import infer_complexity
+from analyzer.pipeline import run_pipeline
+from analyzer.session import AnalysisSession
+
+HELPER_IN_LOOP = """
+PROCEDURE Helper(A, n)
+BEGIN
+    FOR j <- 1 TO n DO
+    BEGIN
+        x <- A[j];
+    END
+END
+
+PROCEDURE Main(A, n)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        CALL Helper(A, n);
+    END
+END
+
+PROCEDURE Top(A, n)
+BEGIN
+    FOR k <- 1 TO n DO
+    BEGIN
+        CALL Main(A, n);
+    END
+END
+"""
+
+MUTUAL = """
+PROCEDURE Even(n)
+BEGIN
+    CALL Odd(n - 1);
+END
+
+PROCEDURE Odd(n)
+BEGIN
+    CALL Even(n - 1);
+END
+
+PROCEDURE Uses(n)
+BEGIN
+    CALL Even(n);
+END
+"""
+
+
+def test_callee_cost_substituted_in_loop():
+    out = run_pipeline(HELPER_IN_LOOP)[2]["procedures"]
+    assert out["Helper"]["big_theta"] == "Theta(n)"
+    assert out["Main"]["big_theta"] == "Theta(n**2)"
+    assert out["Top"]["big_theta"] == "Theta(n**3)"
+    assert list(out) == ["Helper", "Main", "Top"]
+
+
+LOG_HELPER = """
+PROCEDURE Halve(n)
+BEGIN
+    IF n <= 1 THEN
+    BEGIN
+        RETURN 0;
+    END
+    CALL Halve(n / 2);
+END
+
+PROCEDURE Caller(n)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        CALL Halve(n);
+    END
+END
+
+PROCEDURE Maybe(A, n)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        IF A[i] = 0 THEN
+        BEGIN
+            CALL Halve(n);
+        END
+    END
+END
+"""
+
+
+def test_omega_follows_calls_on_every_path():
+    out = run_pipeline(HELPER_IN_LOOP)[2]["procedures"]
+    assert [out[p]["big_omega"] for p in ("Helper", "Main", "Top")] == [
+        "Theta(n)", "Theta(n**2)", "Theta(n**3)"]
+    out = run_pipeline(LOG_HELPER)[2]["procedures"]
+    assert out["Caller"]["big_theta"] == out["Caller"]["big_omega"] == "Theta(n log n)"
+    # Dentro de un IF la llamada puede no ejecutarse: Omega queda local.
+    assert out["Maybe"]["big_theta"] == "Theta(n log n)"
+    assert out["Maybe"]["big_omega"] == "Theta(n)"
+
+
+def test_single_target_evaluates_callees():
+    ctx = run_pipeline(HELPER_IN_LOOP)[1]
+    out = infer_complexity(ctx, "Main")
+    assert list(out["procedures"]) == ["Main"]
+    assert out["procedures"]["Main"]["big_theta"] == "Theta(n**2)"
+
+
+def test_mutual_recursion_reported():
+    out = run_pipeline(MUTUAL)[2]["procedures"]
+    assert out["Even"]["mutual_recursion"] == ["Even", "Odd"]
+    assert out["Odd"]["big_theta"] == "Theta(?)"
+    assert "mutual_recursion" not in out["Uses"]
+    assert any("desconocido" in r for r in out["Uses"]["reasoning"])
+    # El costo desconocido del callee se propaga al llamador.
+    assert out["Uses"]["big_theta"] == "Theta(?)"
+    assert out["Uses"]["big_o"] == "Theta(?)"
+
+
+def test_session_propagates_across_chunks():
+    session = AnalysisSession()
+    assert session.update(HELPER_IN_LOOP) == run_pipeline(HELPER_IN_LOOP)[2]
+
+
+def test_cost_round_trip():
+    for theta in ("Theta(1)", "Theta(log n)", "Theta(n)", "Theta(n log n)",
+                  "Theta(n**3)", "Theta(phi^n)", "Theta(n**2 * phi^n)"):
+        assert format_cost(parse_cost(theta)) == theta
+    assert parse_cost("Theta(?)") is None
+
+
+def test_long_chain_is_linear_and_iterative():
+    n = 20000
+    graph = {f"P{i}": [(f"P{i + 1}", 1)] if i + 1 < n else [] for i in range(n)}
+    t0 = time.perf_counter()
+    sccs = strongly_connected(graph)
+    assert time.perf_counter() - t0 < 2
+    assert sccs[0] == [f"P{n - 1}"] and len(sccs) == n
+
+
+RECURSIVE_WITH_HELPER = """
+PROCEDURE Linear(A, n)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        x <- A[i];
+    END
+END
+
+PROCEDURE Rec(A, n)
+BEGIN
+    IF n <= 1 THEN
+    BEGIN
+        RETURN 0;
+    END
+    CALL Linear(A, n);
+    CALL Rec(A, n / 2);
+    CALL Rec(A, n / 2);
+END
+"""
+
+
+def test_callee_cost_enters_recurrence():
+    out = run_pipeline(RECURSIVE_WITH_HELPER)[2]["procedures"]["Rec"]
+    assert out["recurrence"] == "T(n) = 2T(n/2) + O(n)"
+    assert out["big_theta"] == out["big_omega"] == "Theta(n log n)"
+    assert any("f(n) incluye" in r for r in out["reasoning"])
+    session = AnalysisSession()
+    assert session.update(RECURSIVE_WITH_HELPER)["procedures"]["Rec"] == out
@@ -0,0 +1,132 @@
+import gc
+import json
+import pickle
+
+from analyzer.ast_transformer import tree_to_ast
+from analyzer.cfg import CFG, ENTRY, EXIT, build_cfg
+from analyzer.complexity_engine import infer_complexity
+from analyzer.diagram_generator import TraceGenerator
+from analyzer.parser import parse_source
+from analyzer.static_analyzer import analyze_ast_for_patterns
+from analyzer.streaming import analyze_stream
+from analyzer.traversal import scan_procedure
+
+LINEAR = """
+PROCEDURE LinearSearch(A, n, x)
+BEGIN
+    FOR i 🡨 1 TO n DO
+    BEGIN
+        IF A[i] = x THEN
+        BEGIN
+            RETURN i;
+        END
+    END
+    RETURN (-1);
+END
+"""
+
+NESTED = """
+PROCEDURE Nested(n)
+BEGIN
+    s 🡨 0;
+    FOR i 🡨 1 TO n DO
+    BEGIN
+        j 🡨 n;
+        WHILE j > 0 DO
+        BEGIN
+            j 🡨 j - 1;
+        END
+        REPEAT
+            s 🡨 s + 1;
+        UNTIL s > i
+    END
+    RETURN s;
+END
+"""
+
+
+def _proc(code):
+    return tree_to_ast(parse_source(code))["procedures"][0]
+
+
+def test_blocks_and_edges():
+    cfg = build_cfg(_proc(LINEAR))
+    assert cfg.kind[ENTRY] == "entry" and cfg.kind[EXIT] == "exit"
+    [h] = cfg.loop_headers
+    assert cfg.node[h].get("type") == "For"
+    assert sorted(cfg.label[h]) == ["Do", "Done"]
+    # Los dos RETURN saltan a la salida.
+    assert len(cfg.exits()) == 2
+    assert all(cfg.stmts[b][-1].get("type") == "Return" for b in cfg.exits())
+
+
+def test_dominators_and_natural_loops():
+    cfg = build_cfg(_proc(NESTED))
+    idom = cfg.dominators()
+    assert idom[ENTRY] == ENTRY
+    headers = cfg.loop_headers
+    assert len(headers) == 3
+    loops = cfg.natural_loops()
+    assert set(loops) == set(headers)
+    outer = min(headers, key=lambda h: cfg.depth[h])
+    for h in headers:
+        assert cfg.dominates(outer, h)
+        assert set(loops[h]) <= set(loops[outer])
+    assert all(cfg.dominates(h, u) for u, h in cfg.back_edges())
+    assert cfg.max_loop_depth == 2
+
+
+def test_metrics_match_traversal():
+    for code, cyclomatic in ((LINEAR, 3), (NESTED, 4)):
+        proc = _proc(code)
+        cfg = build_cfg(proc)
+        assert cfg.max_loop_depth == scan_procedure(proc)["max_nesting"]
+        assert cfg.cyclomatic() == cyclomatic
+
+
+def test_unreachable_code_after_return():
+    cfg = build_cfg(_proc("""
+PROCEDURE Dead(n)
+BEGIN
+    RETURN n;
+    x 🡨 1;
+END
+"""))
+    reach = cfg.reachable()
+    dead = [b for b in range(len(cfg)) if cfg.stmts[b] and not reach[b]]
+    assert len(dead) == 1
+    assert cfg.dominators()[dead[0]] == -1
+    assert cfg.cyclomatic() == 1
+
+
+def test_context_caches_cfg_and_early_exit():
+    ast = tree_to_ast(parse_source(LINEAR + NESTED))
+    ctx = analyze_ast_for_patterns(ast)
+    info = ctx["procedures"]["LinearSearch"]
+    assert info["early_exits"] == [{"depth": 1, "loop": "For"}]
+    assert ctx["procedures"]["Nested"]["early_exits"] == []
+
+    out = infer_complexity(ctx)["procedures"]
+    assert out["LinearSearch"]["big_theta"] == "Theta(n)"
+    assert out["LinearSearch"]["big_omega"] == "Theta(1)"
+    assert any("Salida temprana" in r for r in out["LinearSearch"]["reasoning"])
+
+    # El contexto es sólo datos; el diagrama reutiliza el CFG del análisis.
+    assert "cfg" not in info
+    assert pickle.loads(pickle.dumps(ctx)) == ctx
+    json.dumps(ctx, default=sorted)  # symbols: frozenset
+    gen = TraceGenerator(ast, context=ctx)
+    assert gen.cfg_for(ast["procedures"][0]) is ctx.cfgs["LinearSearch"]
+    dot = gen.sources()["LinearSearch"]
+    assert "label=Next" in dot and "constraint=false" in dot
+
+
+def test_streaming_does_not_retain_cfgs():
+    def live_cfgs():
+        gc.collect()
+        return sum(1 for o in gc.get_objects() if isinstance(o, CFG))
+
+    before = live_cfgs()
+    records = list(analyze_stream(NESTED * 200))
+    assert len(records) == 200 and all(r["ok"] for r in records)
+    assert live_cfgs() == before
@@ -0,0 +1,85 @@
+import io
+import json
+
+from analyzer.cli import expand_inputs, main
+
+LINEAR = """
+PROCEDURE LinearSearch(A, n, x)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        IF A[i] = x THEN
+        BEGIN
+            RETURN i;
+        END
+    END
+    RETURN (-1);
+END
+"""
+
+TWO = """
+PROCEDURE One(n)
+BEGIN
+    x <- 1;
+END
+
+PROCEDURE Two(n)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        CALL One(n);
+    END
+END
+"""
+
+
+def _tree(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.pseudo").write_text(LINEAR, encoding="utf-8")
+    (tmp_path / "sub" / "b.pseudo").write_text(TWO, encoding="utf-8")
+    (tmp_path / "notes.txt").write_text("x", encoding="utf-8")
+    return tmp_path
+
+
+def _run(argv):
+    out = io.StringIO()
+    code = main(argv, out=out)
+    return code, out.getvalue()
+
+
+def test_expand_directories_and_globs(tmp_path):
+    root = _tree(tmp_path)
+    files, missing = expand_inputs([str(root), str(root / "**" / "*.pseudo"), str(root / "nope")])
+    assert sorted(f.replace(str(root), "") for f in files) == ["/a.pseudo", "/sub/b.pseudo"]
+    assert missing == [str(root / "nope")]
+
+
+def test_jsonl_one_record_per_procedure(tmp_path):
+    root = _tree(tmp_path)
+    code, text = _run([str(root), "-j", "2"])
+    assert code == 0
+    records = {r["procedure"]: r for r in map(json.loads, text.splitlines())}
+    assert set(records) == {"LinearSearch", "One", "Two"}
+    assert records["Two"]["big_theta"] == "Theta(n)"
+    assert records["One"]["file"].endswith("b.pseudo")
+
+
+def test_parse_failure_sets_exit_code(tmp_path):
+    root = _tree(tmp_path)
+    (root / "bad.pseudo").write_text("PROCEDURE X(\nBEGIN END", encoding="utf-8")
+    code, text = _run([str(root), "-j", "1"])
+    assert code == 1
+    bad = [json.loads(l) for l in text.splitlines() if not json.loads(l)["ok"]]
+    assert bad[0]["file"].endswith("bad.pseudo") and bad[0]["error"]["line"] == 2
+
+
+def test_text_and_markdown(tmp_path):
+    path = str(_tree(tmp_path) / "a.pseudo")
+    code, text = _run([path, "-f", "text", "-j", "1"])
+    assert code == 0 and "Procedure: LinearSearch" in text
+    code, md = _run([path, "-f", "md", "-j", "1"])
+    assert "### `LinearSearch`" in md
+
+
+def test_missing_input(tmp_path):
+    assert _run([str(tmp_path / "none.pseudo")])[0] == 2
@@ -0,0 +1,56 @@
+import json
+
+import pytest
+
+from analyzer.call_graph import format_cost
+from analyzer.corpus import CorpusGenerator, GrammarSampler, expected_cost
+from analyzer.streaming import analyze_stream
+
+
+def test_same_seed_same_corpus():
+    a = CorpusGenerator(seed=7, procs=20, classes=2).source()
+    b = CorpusGenerator(seed=7, procs=20, classes=2).source()
+    c = CorpusGenerator(seed=8, procs=20, classes=2).source()
+    assert a == b and a != c
+
+
+def test_generated_procedures_match_expected_complexity():
+    gen = CorpusGenerator(seed=1, procs=60, stmts=5, depth=3, expr_len=4,
+                          recursion=0.4, classes=1)
+    manifest = [r for _, r in gen.iter_program() if r is not None]
+    assert {r["kind"] for r in manifest} >= {"loops", "linear", "divide_conquer", "binary"}
+
+    results = [r for r in analyze_stream(gen.source()) if r["kind"] == "procedure"]
+    assert len(results) == len(manifest)
+    for want, got in zip(manifest, results):
+        assert got["ok"], got["error"]
+        assert (got["name"], got["line"]) == (want["name"], want["line"])
+        assert got["analysis"]["big_theta"] == want["expected"]["big_theta"]
+
+
+def test_write_streams_corpus_and_manifest(tmp_path):
+    out, manifest = tmp_path / "c.pseudo", tmp_path / "c.jsonl"
+    gen = CorpusGenerator(seed=2, procs=15)
+    size = gen.write(str(out), str(manifest))
+    assert size == len(gen.source().encode("utf-8"))
+    records = [json.loads(line) for line in manifest.read_text().splitlines()]
+    assert [r["name"] for r in records] == [f"P{i}" for i in range(15)]
+
+
+def test_expected_cost_comes_from_the_generator_shape():
+    assert format_cost(expected_cost("loops", 0)) == "Theta(1)"
+    assert format_cost(expected_cost("loops", 3)) == "Theta(n**3)"
+    assert format_cost(expected_cost("linear", 1)) == "Theta(n**2)"
+    assert format_cost(expected_cost("divide_conquer", 0)) == "Theta(n)"
+    assert format_cost(expected_cost("divide_conquer", 1)) == "Theta(n log n)"
+    assert format_cost(expected_cost("divide_conquer", 2)) == "Theta(n**2)"
+    assert format_cost(expected_cost("binary", 0)) == "Theta(phi^n)"
+
+
+def test_statements_are_grammar_productions():
+    g = GrammarSampler()
+    ret = g.build("statement", ("return_stmt", g.build("return_stmt", ("expr", ["n"]))))
+    assert g.render(ret) == ["RETURN n;"]
+    with pytest.raises(ValueError):
+        g.build("return_stmt", ("lvalue", ["n"]))
+    assert g.seq("arg_list", "expr", [["A"], ["n"]]) == ["A", ",", "n"]
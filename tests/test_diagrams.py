@@ -50,3 +50,109 @@ def test_diagram_generation_execution():
     # En CI/CD a veces no hay Graphviz instalado, así que capturamos ese caso específico.
     # Si no hay graphviz, el código imprime un error pero NO lanza excepción (según tu implementación).
     # Por lo tanto, si llegamos aquí, el test pasa.
+
+
+SECOND = """
+PROCEDURE Other(n)
+BEGIN
+    y 🡨 n;
+END
+"""
+
+
+def _fake_pipe(calls):
+    def pipe(engine, fmt, data, timeout=None):
+        calls.append(data)
+        return b"<svg>" + data[:10] + b"</svg>"
+    return pipe
+
+
+def test_render_bytes_in_memory(tmp_path, monkeypatch):
+    ast = tree_to_ast(parse_source(COMPLEX_CODE + SECOND))
+    monkeypatch.chdir(tmp_path)
+    gen = TraceGenerator(ast)
+    out = gen.render_bytes("dot")
+    assert set(out) == {"TestDiagram", "Other"}
+    assert out["Other"].startswith(b"digraph")
+    calls = []
+    monkeypatch.setattr("analyzer.diagram_generator._pipe", _fake_pipe(calls))
+    assert gen.render_bytes("svg", workers=2)["Other"].startswith(b"<svg>")
+    assert len(calls) == 2
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_generate_skips_unchanged_diagrams(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr("analyzer.diagram_generator._pipe", _fake_pipe(calls))
+    ast = tree_to_ast(parse_source(COMPLEX_CODE + SECOND))
+
+    gen = TraceGenerator(ast, output_format="svg", output_dir=str(tmp_path))
+    assert gen.generate(workers=2) == {"TestDiagram": "rendered", "Other": "rendered"}
+    assert (tmp_path / "Other_trace.svg").read_bytes().startswith(b"<svg>")
+    assert (tmp_path / "Other_trace.svg.sha256").exists()
+
+    assert gen.generate() == {"TestDiagram": "skipped", "Other": "skipped"}
+    assert len(calls) == 2
+
+    changed = tree_to_ast(parse_source(COMPLEX_CODE + SECOND.replace("y 🡨 n", "y 🡨 n + 1")))
+    status = TraceGenerator(changed, output_format="svg", output_dir=str(tmp_path)).generate()
+    assert status == {"TestDiagram": "skipped", "Other": "rendered"}
+    assert gen.generate(force=True)["Other"] == "rendered"
+
+    # Otro motor de diseño: mismo DOT, otra imagen.
+    neato = TraceGenerator(ast, output_format="svg", output_dir=str(tmp_path), engine="neato")
+    assert neato.generate() == {"TestDiagram": "rendered", "Other": "rendered"}
+    assert neato.generate() == {"TestDiagram": "skipped", "Other": "skipped"}
+
+
+def _big_procedure(loops=40, inner=30):
+    lines = ["PROCEDURE Big(n)", "BEGIN"]
+    for i in range(loops):
+        lines += [f"    FOR i{i} 🡨 1 TO n DO", "    BEGIN",
+                  f"        FOR j{i} 🡨 1 TO n DO", "        BEGIN"]
+        lines += [f"            x{k} 🡨 x{k} + j{i};" for k in range(inner)]
+        lines += ["        END", "    END"]
+    lines += ["    RETURN 0;", "END"]
+    return "\n".join(lines) + "\n"
+
+
+def test_level_of_detail_collapses_large_procedures():
+    ast = tree_to_ast(parse_source(_big_procedure()))
+    full = TraceGenerator(ast, node_budget=None).sources()["Big"]
+    assert "splines=line" in full and "sentencias" not in full
+
+    dot = TraceGenerator(ast).sources()["Big"]
+    # Los bucles internos quedan resumidos con su costo.
+    assert dot.count("sentencias · Theta(n)") == 40
+    assert dot.count(" -> ") < full.count(" -> ") / 5
+    assert "splines=polyline" in dot
+
+    shallow = TraceGenerator(ast, max_depth=0, node_budget=None).sources()["Big"]
+    assert shallow.count("sentencias · Theta(n**2)") == 40
+
+    small = tree_to_ast(parse_source(COMPLEX_CODE))
+    assert "splines=ortho" in TraceGenerator(small).sources()["TestDiagram"]
+
+
+def test_render_timeout_falls_back_to_collapsed_view(tmp_path, monkeypatch):
+    import subprocess
+    rendered = []
+
+    def pipe(engine, fmt, data, timeout=None):
+        assert timeout == 0.5
+        if b"sentencias" not in data:
+            raise subprocess.TimeoutExpired(engine, timeout)
+        rendered.append(data)
+        return b"<svg/>"
+
+    monkeypatch.setattr("analyzer.diagram_generator._pipe", pipe)
+    ast = tree_to_ast(parse_source(_big_procedure(loops=3, inner=3)))
+    gen = TraceGenerator(ast, output_format="svg", output_dir=str(tmp_path), timeout=0.5)
+    assert gen.generate() == {"Big": "collapsed"}
+    # Vista de respaldo: cada bucle de primer nivel en un nodo, diseño más barato.
+    assert rendered[0].count("sentencias".encode()) == 3
+    assert b"splines=line" in rendered[0]
+    assert (tmp_path / "Big_trace.svg").read_bytes() == b"<svg/>"
+    # La vista resumida no deja el hash de la completa: se vuelve a intentar.
+    assert gen.generate() == {"Big": "collapsed"}
+    assert len(rendered) == 2
@@ -0,0 +1,118 @@
+import sys
+
+from analyzer.empirical import check, fit_growth, measure, sweep, validate_empirically
+from analyzer.pipeline import run_pipeline
+from analyzer.reporter import format_analysis_json, format_analysis_text
+
+SRC = """
+PROCEDURE Pairs(A, n)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        FOR j <- i + 1 TO n DO
+        BEGIN
+            IF A[i] < A[j] THEN
+            BEGIN
+                c <- c + 1;
+            END
+        END
+    END
+END
+
+PROCEDURE BinarySearch(A, left, right, x)
+BEGIN
+    IF left > right THEN
+    BEGIN
+        RETURN (-1);
+    END
+    mid <- (left + right) / 2;
+    IF A[mid] = x THEN
+    BEGIN
+        RETURN mid;
+    END
+    ELSE
+    BEGIN
+        IF A[mid] < x THEN
+        BEGIN
+            RETURN BinarySearch(A, mid+1, right, x);
+        END
+        ELSE
+        BEGIN
+            RETURN BinarySearch(A, left, mid-1, x);
+        END
+    END
+END
+
+PROCEDURE Fib(n)
+BEGIN
+    IF n <= 1 THEN
+    BEGIN
+        RETURN n;
+    END
+    RETURN Fib(n - 1) + Fib(n - 2);
+END
+"""
+
+SIZES = (4, 6, 8, 11, 16, 23, 32, 45, 64)
+
+
+def test_measure_counts_operations():
+    ast, _, _ = run_pipeline(SRC)
+    # Fib(1): IF + RETURN
+    assert measure(ast, "Fib", 1) == 2
+    assert measure(ast, "Fib", 10**6, max_ops=1000) is None
+    small, big = measure(ast, "Pairs", 16), measure(ast, "Pairs", 32)
+    assert 3.5 < big / small < 4.5
+
+
+def test_fit_prefers_true_class():
+    points = [(n, 3 * n * n + 5) for n in SIZES]
+    residuals = fit_growth(points)
+    assert min(residuals, key=residuals.get) == "Theta(n**2)"
+
+
+def test_validation_agrees_with_engine():
+    ast, _, out = run_pipeline(SRC)
+    validate_empirically(ast, out, sizes=SIZES, workers=1)
+    procs = out["procedures"]
+    assert procs["Pairs"]["empirical"]["status"] == "agrees"
+    assert procs["BinarySearch"]["empirical"]["fit"] == "Theta(log n)"
+    assert procs["Fib"]["empirical"]["status"] == "agrees"
+
+
+def test_disagreement_is_flagged_in_report():
+    ast, _, out = run_pipeline(SRC, "Pairs")
+    out["procedures"]["Pairs"]["big_theta"] = "Theta(n)"
+    validate_empirically(ast, out, sizes=SIZES, workers=1)
+    info = out["procedures"]["Pairs"]
+    assert info["empirical"]["status"] == "disagrees"
+    assert "ADVERTENCIA" in info["reasoning"][-1]
+    assert format_analysis_json(ast, out)["meta"]["empirical_disagreements"] == ["Pairs"]
+    assert "contradice" in format_analysis_text(out)
+
+
+def test_parallel_sweep_matches_sequential():
+    ast, _, _ = run_pipeline(SRC)
+    assert sweep(ast, "Pairs", SIZES, workers=2) == sweep(ast, "Pairs", SIZES, workers=1)
+
+
+def test_too_few_points_is_inconclusive():
+    assert check([(4, 10), (8, 20)], "Theta(n)")["status"] == "inconclusive"
+
+
+def test_fit_ignores_sizes_below_two():
+    points = [(1, 4)] + [(n, 3 * n * n + 5) for n in SIZES]
+    residuals = fit_growth(points)
+    assert min(residuals, key=residuals.get) == "Theta(n**2)"
+    assert check([(1, 1), (2, 4), (4, 16), (8, 64)], "Theta(n**2)")["status"] == "inconclusive"
+
+
+def test_shared_pool_and_recursion_limit():
+    limit = sys.getrecursionlimit()
+    ast, _, serial = run_pipeline(SRC)
+    _, _, parallel = run_pipeline(SRC)
+    validate_empirically(ast, serial, sizes=SIZES, workers=1)
+    validate_empirically(ast, parallel, sizes=SIZES, workers=2)
+    assert sys.getrecursionlimit() == limit
+    for name, info in serial["procedures"].items():
+        assert parallel["procedures"][name]["empirical"] == info["empirical"]
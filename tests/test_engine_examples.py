@@ -240,3 +240,26 @@ END
 def test_count_pairs_complexity():
     out = run(COUNT, "CountPairs")
     assert "n**2" in out["big_theta"].lower()
+
+
+# --------------------------
+# Símbolos exactos: "index" no menciona ni 'n' ni 'i'
+# --------------------------
+INDEX_BOUND = """
+PROCEDURE Prefix(A, index)
+BEGIN
+    FOR i <- 1 TO index DO
+    BEGIN
+        FOR j <- 1 TO index DO
+        BEGIN
+            x <- A[j];
+        END
+    END
+END
+"""
+
+
+def test_loop_symbols_are_not_substrings():
+    out = run(INDEX_BOUND, "Prefix")
+    assert not any("Dependencia" in r for r in out["reasoning"])
+    assert any("'n' no encontrado" in r for r in out["reasoning"])
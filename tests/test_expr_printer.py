@@ -0,0 +1,55 @@
+import sys
+
+from analyzer import expr_printer
+from analyzer.ast_transformer import tree_to_ast
+from analyzer.complexity_engine import infer_complexity
+from analyzer.expr_printer import canonical, display
+from analyzer.parser import parse_source
+from analyzer.static_analyzer import analyze_ast_for_patterns
+
+
+def _value(expr):
+    ast = tree_to_ast(parse_source(f"PROCEDURE P(n)\nBEGIN\n    x 🡨 {expr};\nEND\n"))
+    return ast["procedures"][0]["body"][0]["value"]
+
+
+def test_display_and_canonical_forms():
+    node = _value("(left + right) div 2")
+    assert display(node) == "left + right div 2"
+    assert canonical(node) == "((left+right) div 2)"
+    assert canonical(_value("a - b - c")) != canonical(_value("a - (b - c)"))
+    assert display(_value("A[i] + f(n, 2.0)")) == "A[i] + f(n, 2.0)"
+    assert canonical(_value("A[i] + f(n, 2.0)")) == "(A[i]+f(n,2))"
+
+
+def test_memoized_per_node():
+    expr_printer.cache_clear()
+    node = _value("n - 1")
+    assert display(node) == "n - 1"
+    assert expr_printer.cache_info()["display"] == 1
+    assert display(node) == "n - 1"
+    assert expr_printer.cache_info()["display"] == 1
+    # Otro nodo con la misma estructura: misma forma canónica, entrada propia.
+    assert canonical(_value("n - 1")) == canonical(node)
+
+
+def test_long_chains_do_not_recurse():
+    expr = " + ".join(f"x{i}" for i in range(sys.getrecursionlimit() + 100))
+    text = display(_value(expr))
+    assert text.startswith("x0 + x1 + ") and text.endswith(" + x" + str(sys.getrecursionlimit() + 99))
+
+
+def test_engine_groups_identical_calls():
+    ast = tree_to_ast(parse_source("""
+PROCEDURE Halves(n)
+BEGIN
+    IF n <= 1 THEN
+    BEGIN
+        RETURN 1;
+    END
+    RETURN Halves(n / 2) + Halves(n / 2);
+END
+"""))
+    out = infer_complexity(analyze_ast_for_patterns(ast))["procedures"]["Halves"]
+    assert "  -> 2 x Halves(n / 2): T(n/2)." in out["reasoning"]
+    assert out["big_theta"] == "Theta(n)"
@@ -0,0 +1,96 @@
+import json
+import pickle
+
+import pytest
+from lark.exceptions import UnexpectedInput
+
+from analyzer.ast_nodes import structural_hash
+from analyzer.complexity_engine import infer_complexity
+from analyzer.parser import inline_parser, parse_recovering, parse_stream, parse_to_ast
+from analyzer.session import AnalysisSession
+from analyzer.static_analyzer import analyze_ast_for_patterns
+
+CODE = """
+PROCEDURE BinarySearch(A, left, right, x)
+BEGIN
+    IF left > right THEN
+    BEGIN
+        RETURN (-1);
+    END
+    mid 🡨 (left + right) div 2;
+    IF A[mid] < x THEN
+    BEGIN
+        RETURN BinarySearch(A, mid + 1, right, x);
+    END
+    RETURN BinarySearch(A, left, mid - 1, x) + BinarySearch(A, left, mid - 1, x);
+END
+"""
+
+
+def _to_dict(ast):
+    return ast.to_dict() if hasattr(ast, "to_dict") else ast
+
+
+def _returns(ast):
+    body = ast["procedures"][0]["body"]
+    return [s for s in body if s["type"] == "Return"]
+
+
+def test_identical_subtrees_are_shared():
+    for compact in (False, True):
+        ast = parse_to_ast(CODE, compact=compact, hashcons=True)
+        call = _returns(ast)[-1]["value"]
+        assert call["left"] is call["right"]
+        # Las hojas se comparten entre sentencias: `mid` en `mid + 1` y en `mid - 1`.
+        guard = ast["procedures"][0]["body"][2]
+        inner = guard["then"][0]["value"]["args"][1]
+        assert inner["left"] is call["left"]["args"][2]["left"]
+        # Sin hash-consing son objetos distintos.
+        plain = _returns(parse_to_ast(CODE, compact=compact))[-1]["value"]
+        assert plain["left"] is not plain["right"]
+
+
+def test_same_output_and_hash_across_modes():
+    plain = parse_to_ast(CODE)
+    for compact in (False, True):
+        shared = parse_to_ast(CODE, compact=compact, hashcons=True)
+        assert json.dumps(_to_dict(shared), sort_keys=True) == json.dumps(plain, sort_keys=True)
+        a = _returns(plain)[-1]["value"]
+        b = _returns(shared)[-1]["value"]
+        assert structural_hash(a) == structural_hash(b)
+    # Distinto tipo de hoja, distinto hash.
+    one = parse_to_ast(CODE, hashcons=True)["procedures"][0]["body"][0]["cond"]
+    assert structural_hash(one["left"]) != structural_hash(one["right"])
+
+
+def test_analysis_unchanged_and_pickle_keeps_sharing():
+    plain = infer_complexity(analyze_ast_for_patterns(parse_to_ast(CODE)))
+    for compact in (False, True):
+        ast = parse_to_ast(CODE, compact=compact, hashcons=True)
+        out = infer_complexity(analyze_ast_for_patterns(ast))
+        assert out["procedures"]["BinarySearch"]["big_o"] == plain["procedures"]["BinarySearch"]["big_o"]
+        copy = pickle.loads(pickle.dumps(ast))
+        call = _returns(copy)[-1]["value"]
+        assert call["left"] is call["right"]
+        assert structural_hash(call["left"]) == structural_hash(_returns(ast)[-1]["value"]["left"])
+
+
+def test_session_hashcons():
+    session = AnalysisSession(hashcons=True)
+    out = session.update(CODE)
+    assert out == AnalysisSession().update(CODE)
+
+
+def test_table_is_emptied_after_every_parse():
+    broken = CODE.replace("mid 🡨 (left + right) div 2;", "mid 🡨 (left + right) div 2")
+    for compact in (False, True):
+        table = inline_parser(compact, True).options.transformer._interner.table
+        with pytest.raises(UnexpectedInput):
+            parse_to_ast(broken, compact=compact, hashcons=True)
+        assert not table
+        with pytest.raises(UnexpectedInput):
+            parse_stream(broken, to_ast=True, compact=compact, hashcons=True)
+        assert not table
+        program, diagnostics = parse_recovering(broken, compact=compact, hashcons=True)
+        assert diagnostics and program["procedures"]
+        assert not table
@@ -0,0 +1,53 @@
+from analyzer.instrumentation import instrumented
+from analyzer.pipeline import run_pipeline
+from analyzer.reporter import format_analysis_json
+
+SRC = """
+PROCEDURE Fib(n)
+BEGIN
+    IF n <= 1 THEN
+    BEGIN
+        RETURN n;
+    END
+    RETURN Fib(n - 1) + Fib(n - 2);
+END
+
+PROCEDURE Sum(A, n)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        s <- s + A[i];
+    END
+END
+"""
+
+
+def test_stages_and_counters_in_report_meta():
+    seen = []
+    with instrumented(hooks=[lambda stage, rec: seen.append(stage)]) as inst:
+        ast, _, out = run_pipeline(SRC)
+        report = format_analysis_json(ast, out)
+
+    meta = report["meta"]["instrumentation"]
+    assert list(meta["stages"]) == ["preprocess", "parse", "ast_transform",
+                                    "patterns", "inference", "reporting"]
+    assert seen == list(meta["stages"])
+    parse = meta["stages"]["parse"]
+    assert parse["calls"] == 1 and parse["wall_ms"] > 0 and "peak_kib" in parse
+    assert meta["counters"]["procedures"] == 2
+    assert meta["counters"]["loops"] == 1
+    assert meta["counters"]["recursions"] == 2
+    assert meta["counters"]["ast_nodes"] > 10
+    assert inst.to_dict() == meta
+
+
+def test_disabled_by_default():
+    ast, _, out = run_pipeline(SRC)
+    assert "instrumentation" not in format_analysis_json(ast, out)["meta"]
+
+
+def test_inline_parse_when_not_split():
+    with instrumented(memory=False, split_parse=False) as inst:
+        run_pipeline(SRC)
+    assert "ast_transform" not in inst.stages
+    assert "peak_kib" not in inst.stages["parse"]
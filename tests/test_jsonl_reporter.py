@@ -0,0 +1,61 @@
+import io
+import json
+
+import pytest
+
+from analyzer.ast_nodes import to_dict
+from analyzer.parser import parse_to_ast
+from analyzer.reporter import JsonlReporter
+from analyzer.static_analyzer import analyze_ast_for_patterns
+from analyzer.complexity_engine import infer_complexity
+from analyzer.streaming import analyze_stream
+
+SRC = """
+PROCEDURE Sum(A, n)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        s <- s + A[i];
+    END
+    RETURN s;
+END
+
+PROCEDURE Const(x)
+BEGIN
+    y <- x * 2;
+END
+"""
+
+
+def _lines(buf):
+    return [json.loads(l) for l in buf.getvalue().splitlines()]
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_field_sets(compact):
+    ast = parse_to_ast(SRC, compact=compact)
+    out = infer_complexity(analyze_ast_for_patterns(ast))
+    expected_ast = {p["name"]: p for p in to_dict(ast)["procedures"]}
+
+    buf = io.StringIO()
+    JsonlReporter(buf, "analysis").write_analysis(ast, out, file="x.pseudo")
+    rows = _lines(buf)
+    assert [r["procedure"] for r in rows] == ["Sum", "Const"]
+    assert rows[0]["file"] == "x.pseudo" and rows[0]["big_theta"] == "Theta(n)"
+    assert "reasoning" not in rows[0] and "ast" not in rows[0]
+
+    buf = io.StringIO()
+    JsonlReporter(buf, "full").write_analysis(ast, out)
+    for row in _lines(buf):
+        assert row["reasoning"] == out["procedures"][row["procedure"]]["reasoning"]
+        assert row["ast"] == expected_ast[row["procedure"]]
+
+
+def test_write_stream_reports_errors():
+    src = SRC + "\nPROCEDURE Bad(n)\nBEGIN\n    x <- ;\nEND\n"
+    buf = io.StringIO()
+    JsonlReporter(buf, "ast").write_stream(analyze_stream(src, include_ast=True))
+    rows = _lines(buf)
+    assert [r["ok"] for r in rows] == [True, True, False]
+    assert rows[2]["error"]["line"] == 18 and rows[2]["line"] == 16
+    assert rows[0]["ast"]["name"] == "Sum"
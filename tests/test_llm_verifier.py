@@ -0,0 +1,56 @@
+from analyzer.corpus import CorpusGenerator
+from analyzer.llm_verifier import LLMVerifier, query_llm_for_analysis
+from analyzer.mock_llm_server import MockLLMServer
+from analyzer.pipeline import run_pipeline
+from analyzer.result_cache import ResultCache
+
+
+def _corpus(procs=25):
+    ast, _, analysis = run_pipeline(CorpusGenerator(seed=3, procs=procs).source())
+    return ast, analysis
+
+
+def test_batches_share_keep_alive_connections():
+    ast, analysis = _corpus()
+    with MockLLMServer() as server:
+        verifier = LLMVerifier(server.url, concurrency=2, batch_size=4)
+        llm = verifier.verify_analysis(ast, analysis)
+        assert server.requests == 7          # ceil(25 / 4)
+        assert server.connections <= 2
+    for name, info in analysis["procedures"].items():
+        assert llm["procedures"][name]["suggested_complexity"]["Theta"] == info["big_theta"]
+
+
+def test_retries_with_backoff():
+    ast, analysis = _corpus(3)
+    with MockLLMServer(fail_first=2) as server:
+        verifier = LLMVerifier(server.url, concurrency=1, batch_size=10, backoff=0.001)
+        llm = verifier.verify_analysis(ast, analysis)
+    assert verifier.retried == 2
+    assert all("error" not in r for r in llm["procedures"].values())
+
+
+def test_errors_are_reported_and_not_cached():
+    ast, analysis = _corpus(2)
+    with MockLLMServer(fail_first=10) as server:
+        verifier = LLMVerifier(server.url, retries=1, backoff=0.001)
+        llm = verifier.verify_analysis(ast, analysis)
+        assert all(r["error"] == "HTTP 503" for r in llm["procedures"].values())
+        assert not verifier.cache
+
+
+def test_cache_avoids_requests(tmp_path):
+    ast, analysis = _corpus(5)
+    cache = ResultCache(str(tmp_path / "llm.sqlite"))
+    with MockLLMServer() as server:
+        first = LLMVerifier(server.url, cache=cache).verify_analysis(ast, analysis)
+        sent = server.requests
+        again = LLMVerifier(server.url, cache=cache)
+        assert again.verify_analysis(ast, analysis) == first
+        assert server.requests == sent
+        assert again.cache_hits == 5
+
+
+def test_stub_without_api_key():
+    out = query_llm_for_analysis("PROCEDURE P() BEGIN END")
+    assert out["suggested_complexity"]["Theta"] is None
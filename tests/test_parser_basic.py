@@ -20,3 +20,24 @@ def test_parser_syntax_error():
         assert False
     except Exception:
         assert True
+
+
+def test_parse_to_ast_matches_two_step():
+    from analyzer.parser import parse_to_ast
+    from analyzer.ast_transformer import tree_to_ast
+
+    src = """
+    PROCEDURE P(n)
+    BEGIN
+        FOR i <- 1 TO n DO
+        BEGIN
+            IF i mod 2 = 0 or i > n div 2 THEN
+            BEGIN
+                x <- -i;
+            END
+        END
+    END
+    """
+    expected = tree_to_ast(parse_source(src))
+    assert parse_to_ast(src) == expected
+    assert parse_to_ast(src, compact=True).to_dict() == expected
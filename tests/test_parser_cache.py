@@ -0,0 +1,50 @@
+from analyzer import parser
+from analyzer.parser import build_parser, grammar_hash, GRAMMAR, GRAMMAR_HASH
+
+SRC = """
+PROCEDURE P(n)
+BEGIN
+    x <- n + 1;
+END
+"""
+
+
+def test_grammar_hash_changes_with_grammar_and_options():
+    assert grammar_hash() == GRAMMAR_HASH
+    assert grammar_hash(GRAMMAR + "\n// cambio") != GRAMMAR_HASH
+    opts = dict(parser.LARK_OPTIONS, propagate_positions=False)
+    assert grammar_hash(GRAMMAR, opts) != GRAMMAR_HASH
+
+
+def test_cache_mode_writes_and_reuses_tables(tmp_path, monkeypatch):
+    monkeypatch.setenv("ANALYZER_CACHE_DIR", str(tmp_path))
+    first = build_parser("cache")
+    cache_file = tmp_path / f"grammar_{GRAMMAR_HASH}.lark_cache"
+    assert cache_file.exists()
+
+    second = build_parser("cache")
+    assert first.parse(SRC) == second.parse(SRC)
+
+
+def test_tables_mode_falls_back_without_module(tmp_path, monkeypatch):
+    monkeypatch.setenv("ANALYZER_CACHE_DIR", str(tmp_path))
+    p = build_parser("tables")
+    assert p.parse(SRC) is not None
+
+
+def test_tables_mode_loads_saved_parser(monkeypatch):
+    import io
+    import sys
+    import types
+
+    buffer = io.BytesIO()
+    build_parser("compile").save(buffer)
+    tables = types.ModuleType("analyzer._parser_tables")
+    tables.GRAMMAR_HASH = GRAMMAR_HASH
+    tables.DATA = buffer.getvalue()
+    monkeypatch.setitem(sys.modules, "analyzer._parser_tables", tables)
+    monkeypatch.setattr(parser, "_parser_tables", tables, raising=False)
+
+    p = build_parser("tables")
+    assert p.source_path == "<deserialized>"
+    assert p.parse(SRC) == build_parser("compile").parse(SRC)
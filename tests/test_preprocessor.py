@@ -19,3 +19,56 @@ def test_blank_lines_collapse():
     src = "a:=1\n\n\nb:=2"
     out = normalize_source(src)
     assert out.count("\n") == 2
+
+
+def test_chunked_input_matches_str():
+    from analyzer.preprocessor import iter_normalized_lines
+
+    src = "a <- 1;\r\n\r\n\r\nb <- 2; ► c\rd <- 3;\n"
+    chunks = [src[i:i + 3] for i in range(0, len(src), 3)]
+    assert "\n".join(iter_normalized_lines(chunks)) == normalize_source(src)
+
+
+def test_line_map_points_to_original_lines():
+    from analyzer.preprocessor import LineMap, iter_normalized_lines
+
+    line_map = LineMap()
+    lines = list(iter_normalized_lines("a\n\n\n\nb\n", line_map=line_map))
+    assert lines == ["a", "", "b", ""]
+    assert [line_map.original_line(i) for i in range(1, 5)] == [1, 2, 5, 6]
+
+
+def test_normalizer_compat():
+    from analyzer.normalizer import normalize_source as compact
+
+    assert compact("  a   b \n\n\t c\r\n") == "a b\nc\n"
+
+
+def test_parse_stream_matches_parse_source():
+    import io
+    from analyzer.parser import parse_source, parse_stream, parse_to_ast
+
+    src = """
+    PROCEDURE P(n)  ► comentario
+    BEGIN
+        FOR i 🡨 1 TO n DO
+        BEGIN
+            x <- i;
+        END
+    END
+    """
+    norm = normalize_source(src)
+    assert parse_stream(io.StringIO(src)) == parse_source(norm)
+    assert parse_stream(src, to_ast=True) == parse_to_ast(norm)
+
+
+def test_parse_stream_reports_original_line():
+    from lark.exceptions import UnexpectedInput
+    from analyzer.parser import parse_stream
+
+    src = "\n\n► nota\n\n\nPROCEDURE P(n)\nBEGIN\n  x <- ;\nEND"
+    try:
+        parse_stream(src)
+        assert False
+    except UnexpectedInput as e:
+        assert e.line == 8
@@ -0,0 +1,190 @@
+import io
+import json
+
+import pytest
+from lark.exceptions import UnexpectedInput
+
+from analyzer.ast_nodes import to_dict
+from analyzer.batch import analyze_many
+from analyzer.cli import main
+from analyzer.parser import parse_recovering, parse_stream, parse_to_ast
+from analyzer.pipeline import analyze_source
+
+BROKEN = """
+PROCEDURE Sum(A, n)
+BEGIN
+    s <- 0;
+    x <- 1 + ;
+    FOR i <- 1 TO n DO
+    BEGIN
+        y <- ) ;
+        s <- s + A[i];
+    END
+    RETURN s;
+END
+
+PROCEDURE Bad(n,, m)
+BEGIN
+    RETURN n;
+END
+
+PROCEDURE Count(n)
+BEGIN
+    REPEAT
+        n <- n - 1;
+        k <- $ 3;
+    UNTIL n < 1
+    RETURN n;
+END
+"""
+
+CLEAN = """
+PROCEDURE Loop(n)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        x <- i;
+    END
+END
+"""
+
+
+def _names(program):
+    return [p["name"] for p in program["procedures"]]
+
+
+def test_clean_source_matches_normal_parse():
+    for compact in (False, True):
+        program, diagnostics = parse_recovering(CLEAN, compact=compact)
+        assert diagnostics == []
+        assert to_dict(program) == to_dict(parse_stream(CLEAN, to_ast=True, compact=compact))
+    tree, diagnostics = parse_recovering(CLEAN, to_ast=False)
+    assert diagnostics == [] and tree == parse_stream(CLEAN)
+
+
+def test_statements_and_procedures_are_isolated():
+    with pytest.raises(UnexpectedInput):
+        parse_to_ast(BROKEN)
+    program, diagnostics = parse_recovering(BROKEN)
+    # La cabecera de Bad no se recupera; de Sum y Count sólo caen las sentencias erróneas.
+    assert _names(program) == ["Sum", "Count"]
+    body = program["procedures"][0]["body"]
+    assert [s["type"] for s in body] == ["Assign", "For", "Return"]
+    assert [s["target"]["name"] for s in body[1]["body"]] == ["s"]
+    assert len(program["procedures"][1]["body"][0]["body"]) == 1
+
+    where = [(d["line"], d["column"], d["procedure"], d["type"]) for d in diagnostics]
+    assert where == [(5, 14, "Sum", "UnexpectedToken"), (8, 14, "Sum", "UnexpectedToken"),
+                     (14, 17, "Bad", "UnexpectedToken"), (23, 14, "Count", "UnexpectedCharacters")]
+    assert "';'" in diagnostics[0]["message"] and "IDENTIFIER" in diagnostics[0]["expected"]
+
+
+def test_missing_semicolon_and_unterminated_procedure():
+    program, diagnostics = parse_recovering(CLEAN + """
+PROCEDURE Tail(n)
+BEGIN
+    x <- n
+    y <- 2;
+    RETURN n;
+END
+
+PROCEDURE Open(n)
+BEGIN
+    RETURN n;
+""")
+    assert _names(program) == ["Loop", "Tail"]
+    # Sin ";" el error se extiende hasta el ";" de la sentencia siguiente.
+    assert [s["type"] for s in program["procedures"][1]["body"]] == ["Return"]
+    assert [d["type"] for d in diagnostics] == ["UnexpectedToken", "UnexpectedEOF"]
+    assert diagnostics[1]["procedure"] == "Open"
+
+
+def test_pipeline_batch_and_cli(tmp_path):
+    with pytest.raises(UnexpectedInput):
+        analyze_source(BROKEN)
+    result = analyze_source(BROKEN, recover=True)
+    assert set(result["analysis"]["procedures"]) == {"Sum", "Count"}
+    assert result["analysis"]["procedures"]["Sum"]["big_theta"] == "Theta(n)"
+    assert len(result["diagnostics"]) == 4
+    assert "diagnostics" not in analyze_source(CLEAN, recover=True)
+
+    records = analyze_many([CLEAN, BROKEN], workers=1, recover=True)
+    assert all(r["ok"] for r in records)
+    assert "diagnostics" not in records[0] and len(records[1]["diagnostics"]) == 4
+
+    path = tmp_path / "broken.pseudo"
+    path.write_text(BROKEN, encoding="utf-8")
+    out = io.StringIO()
+    assert main([str(path), "-j", "1", "--recover"], out=out) == 1
+    lines = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [(r["procedure"], r["ok"]) for r in lines] == [
+        ("Sum", True), ("Count", True), ("Sum", False), ("Sum", False), ("Bad", False), ("Count", False)]
+    assert lines[2]["error"]["line"] == 5
+
+
+def test_cache_does_not_hide_errors(tmp_path):
+    from analyzer.result_cache import ResultCache
+
+    cache = ResultCache(str(tmp_path / "results.sqlite"))
+    assert len(analyze_source(BROKEN, cache=cache, recover=True)["diagnostics"]) == 4
+    with pytest.raises(UnexpectedInput):
+        analyze_source(BROKEN, cache=cache)
+    assert len(analyze_source(BROKEN, cache=cache, recover=True)["diagnostics"]) == 4
+
+
+def test_end_that_does_not_close_the_list_drops_the_construct():
+    program, diagnostics = parse_recovering("""
+PROCEDURE Nested(n)
+BEGIN
+    s <- 0;
+    FOR i <- 1 TO n DO
+    BEGIN
+        IF i > 2 THEN
+        BEGIN
+            s <- 1;
+        END
+        REPEAT
+            s <- s + 1;
+            t <- ) ;
+        END
+    RETURN s;
+END
+""")
+    body = program["procedures"][0]["body"]
+    # El REPEAT sin UNTIL cae; el IF ya cerrado del mismo bloque se conserva.
+    assert [s["type"] for s in body] == ["Assign", "For", "Return"]
+    assert [s["type"] for s in body[1]["body"]] == ["If"]
+    assert [(d["line"], d["expected"]) for d in diagnostics][1:] == [(14, ["UNTIL"])]
+
+
+def test_statement_after_until_is_kept():
+    program, diagnostics = parse_recovering("""
+PROCEDURE Until(n)
+BEGIN
+    REPEAT
+        n <- n - 1;
+    UNTIL n < 1
+    x <- n
+    y <- ) ;
+    RETURN n;
+END
+""")
+    assert [s["type"] for s in program["procedures"][0]["body"]] == ["Repeat", "Return"]
+    assert [d["line"] for d in diagnostics] == [8]
+
+
+def test_tree_and_compact_modes_keep_classes():
+    source = "Clase C { a b }\n" + BROKEN
+    tree, _ = parse_recovering(source, to_ast=False)
+    assert [t.data for t in tree.children] == ["class_decl", "procedure", "procedure"]
+    program, _ = parse_recovering(source, compact=True, hashcons=True)
+    assert to_dict(program) == to_dict(parse_recovering(source)[0])
+    assert [c["name"] for c in program["classes"]] == ["C"]
+
+
+def test_long_expected_lists_end_in_a_single_ellipsis():
+    _, diagnostics = parse_recovering(BROKEN)
+    messages = [d["message"] for d in diagnostics]
+    assert any(m.endswith(", ...") for m in messages)
+    assert not any(m.endswith("....") for m in messages)
+    assert all(m.endswith(".") for m in messages)
@@ -0,0 +1,189 @@
+from analyzer import recurrence
+from analyzer.call_graph import format_cost
+
+from test_engine_examples import run
+
+
+def test_master_theorem_cases():
+    # Caso 1: 3T(n/2) + n
+    assert format_cost(recurrence.divide_and_conquer([(3, 2)], 1).cost) == "Theta(n**1.585)"
+    # Caso 2: 2T(n/2) + n
+    assert format_cost(recurrence.divide_and_conquer([(1, 2), (1, 2)], 1).cost) == "Theta(n log n)"
+    # Caso 3: 2T(n/2) + n^2
+    sol = recurrence.divide_and_conquer([(2, 2)], 2)
+    assert format_cost(sol.cost) == "Theta(n**2)"
+    assert sol.method == "master"
+
+
+def test_akra_bazzi_unequal_split():
+    sol = recurrence.divide_and_conquer([(1, 3), (1, 1.5)], 1)
+    assert sol.method == "akra_bazzi"
+    assert format_cost(sol.cost) == "Theta(n log n)"
+    # T(n/2) + T(n/4) + 1: p ~ 0.694
+    assert format_cost(recurrence.divide_and_conquer([(1, 2), (1, 4)], 0).cost) == "Theta(n**0.694)"
+
+
+def test_subtractive():
+    assert format_cost(recurrence.subtractive([(1, 1)], 1).cost) == "Theta(n**2)"
+    assert format_cost(recurrence.subtractive([(1, 1), (1, 2)]).cost) == "Theta(phi^n)"
+    assert format_cost(recurrence.subtractive([(2, 1)]).cost) == "Theta(2^n)"
+
+
+def test_equivalent_forms_share_cache_entry():
+    recurrence.cache_clear()
+    recurrence.divide_and_conquer([(1, 2), (1, 2)], 1)
+    recurrence.divide_and_conquer([(2, 2)], 1)
+    info = recurrence.cache_info()["divide"]
+    assert (info.hits, info.misses) == (1, 1)
+
+
+UNEQUAL = """
+PROCEDURE Split(n)
+BEGIN
+    IF n <= 1 THEN
+    BEGIN
+        RETURN 1;
+    END
+    FOR i <- 1 TO n DO
+    BEGIN
+        x <- i;
+    END
+    CALL Split(n / 3);
+    CALL Split((2 * n) / 3);
+END
+"""
+
+
+def test_engine_unequal_split():
+    out = run(UNEQUAL, "Split")
+    assert out["big_theta"] == "Theta(n log n)"
+    assert out["recurrence"] == "T(n) = T(n/1.5) + T(n/3) + O(n)"
+
+
+CUBIC_COMBINE = """
+PROCEDURE Cube(n)
+BEGIN
+    IF n <= 1 THEN
+    BEGIN
+        RETURN 1;
+    END
+    FOR i <- 1 TO n DO
+    BEGIN
+        FOR j <- 1 TO n DO
+        BEGIN
+            x <- i;
+        END
+    END
+    CALL Cube(n / 2);
+    CALL Cube(n / 2);
+END
+"""
+
+
+def test_engine_master_case_3():
+    assert run(CUBIC_COMBINE, "Cube")["big_theta"] == "Theta(n**2)"
+
+
+HANOI_GUARD = """
+PROCEDURE Hanoi(n)
+BEGIN
+    IF n > 0 THEN
+    BEGIN
+        CALL Hanoi(n - 1);
+        CALL Hanoi(n - 1);
+    END
+END
+"""
+
+HANOI_RETURN = """
+PROCEDURE Hanoi(n)
+BEGIN
+    IF n <= 0 THEN
+    BEGIN
+        RETURN 0;
+    END
+    CALL Hanoi(n - 1);
+    CALL Hanoi(n - 1);
+END
+"""
+
+SEARCH = """
+PROCEDURE Search(A, left, right, x)
+BEGIN
+    IF left > right THEN
+    BEGIN
+        RETURN (-1);
+    END
+    mid <- (left + right) div 2;
+    IF A[mid] = x THEN
+    BEGIN
+        RETURN mid;
+    END
+    ELSE
+    BEGIN
+        RETURN Search(A, mid + 1, right, x);
+    END
+END
+"""
+
+
+def test_base_case_guard_does_not_lower_omega():
+    # Las dos formas de escribir el caso base dan el mismo Omega.
+    for src in (HANOI_GUARD, HANOI_RETURN):
+        out = run(src, "Hanoi")
+        assert out["big_theta"] == "Theta(2^n)"
+        assert out["big_omega"] == "Theta(2^n)"
+    # Una rama sin llamadas que depende de los datos sí es un mejor caso.
+    out = run(SEARCH, "Search")
+    assert out["big_theta"] == "Theta(log n)"
+    assert out["big_omega"] == "Theta(1)"
+
+SEARCH_NO_ELSE = """
+PROCEDURE Search(A, left, right, x)
+BEGIN
+    IF left > right THEN
+    BEGIN
+        RETURN (-1);
+    END
+    mid <- (left + right) div 2;
+    IF A[mid] = x THEN
+    BEGIN
+        RETURN mid;
+    END
+    IF A[mid] < x THEN
+    BEGIN
+        RETURN Search(A, mid + 1, right, x);
+    END
+    ELSE
+    BEGIN
+        RETURN Search(A, left, mid - 1, x);
+    END
+END
+"""
+
+RETURN_AFTER_CALL = """
+PROCEDURE Count(n)
+BEGIN
+    IF n <= 0 THEN
+    BEGIN
+        RETURN 0;
+    END
+    s <- Count(n - 1);
+    IF s = 0 THEN
+    BEGIN
+        RETURN 0;
+    END
+    RETURN s + 1;
+END
+"""
+
+
+def test_early_return_without_else_is_a_best_case():
+    # Igual que SEARCH: el THEN sin llamadas que termina en RETURN es un camino.
+    out = run(SEARCH_NO_ELSE, "Search")
+    assert out["big_theta"] == "Theta(log n)"
+    assert out["big_omega"] == "Theta(1)"
+    # Si la llamada ya se hizo antes del RETURN, no hay camino sin llamadas.
+    out = run(RETURN_AFTER_CALL, "Count")
+    assert out["big_theta"] == "Theta(n)"
+    assert out["big_omega"] == "Theta(n)"
@@ -0,0 +1,83 @@
+from analyzer.batch import analyze_many
+from analyzer.pipeline import analyze_source
+from analyzer.preprocessor import normalize_source
+from analyzer.result_cache import ResultCache, cache_key
+
+SRC = """
+PROCEDURE Demo(n)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        x <- i;
+    END
+END
+"""
+
+
+def test_cache_hit_after_first_analysis(tmp_path):
+    with ResultCache(str(tmp_path / "r.sqlite")) as cache:
+        first = analyze_source(SRC, cache=cache)
+        # Cambios que normalize_source elimina no alteran la clave
+        second = analyze_source(SRC + "\n\n► comentario\n", cache=cache)
+
+        assert first == second
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+
+def test_cache_stores_ast_on_request(tmp_path):
+    with ResultCache(str(tmp_path / "r.sqlite")) as cache:
+        res = analyze_source(SRC, cache=cache, include_ast=True, proc_name="Demo")
+        assert res["ast"]["type"] == "Program"
+        assert list(res["analysis"]["procedures"]) == ["Demo"]
+        again = analyze_source(SRC, cache=cache, include_ast=True)
+        assert again["ast"] == res["ast"]
+
+
+def test_lru_eviction_bounded_by_size(tmp_path):
+    with ResultCache(str(tmp_path / "r.sqlite"), max_bytes=300) as cache:
+        cache.put("a", {"v": "x" * 100})
+        cache.put("b", {"v": "y" * 100})
+        assert cache.get("a") is not None   # 'a' pasa a ser el más reciente
+        cache.put("c", {"v": "z" * 100})
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.stats()["evictions"] >= 1
+        assert cache.stats()["bytes"] <= 300
+
+
+def test_key_depends_on_normalized_source():
+    assert cache_key(normalize_source(SRC)) == cache_key(normalize_source(SRC + "\n\n"))
+    assert cache_key(normalize_source(SRC)) != cache_key(normalize_source(SRC.replace("n DO", "m DO")))
+
+
+def test_batch_uses_shared_cache(tmp_path):
+    path = str(tmp_path / "r.sqlite")
+    analyze_many([SRC, SRC], workers=1, cache_path=path)
+    with ResultCache(path) as cache:
+        assert cache.stats()["entries"] == 1
+
+
+def test_lru_order_shared_between_connections(tmp_path):
+    # Dos workers sobre el mismo archivo: la marca LRU sale de la base, no de cada proceso.
+    path = str(tmp_path / "r.sqlite")
+    with ResultCache(path, max_bytes=300) as a, ResultCache(path, max_bytes=300) as b:
+        b.put("old", {"v": "x" * 100})
+        b.get("old")
+        b.get("old")
+        a.put("new", {"v": "y" * 100})
+        a.put("newer", {"v": "z" * 100})
+        assert a.get("old") is None
+        assert a.get("new") is not None and a.get("newer") is not None
+
+
+def test_running_total_matches_stored_sizes(tmp_path):
+    with ResultCache(str(tmp_path / "r.sqlite")) as cache:
+        cache.put("a", {"v": "x" * 100})
+        cache.put("a", {"v": "x" * 10})      # reemplazo
+        cache.put("b", {"v": "y" * 50})
+        real = cache._db.execute("SELECT SUM(size) FROM results").fetchone()[0]
+        assert cache.stats()["bytes"] == real
+        cache.clear()
+        assert cache.stats() == {"hits": 0, "misses": 0, "evictions": 0, "entries": 0, "bytes": 0}
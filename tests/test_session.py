@@ -0,0 +1,42 @@
+from analyzer.pipeline import run_pipeline
+from analyzer.session import AnalysisSession
+
+
+def _proc(name, body="x <- i;"):
+    return f"""
+PROCEDURE {name}(n)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        {body}
+    END
+END
+"""
+
+
+def test_only_edited_procedure_is_reanalyzed():
+    procs = [_proc(f"P{i}") for i in range(5)]
+    session = AnalysisSession()
+    first = session.update("".join(procs))
+    assert session.reparsed == 5 and session.reused == 0
+    assert first == run_pipeline("".join(procs))[2]
+
+    procs[2] = _proc("P2", "FOR j <- 1 TO n DO BEGIN x <- j; END")
+    second = session.update("".join(procs))
+    assert session.reparsed == 1 and session.reused == 4
+    assert second == run_pipeline("".join(procs))[2]
+    assert second["procedures"]["P2"]["big_o"] != first["procedures"]["P2"]["big_o"]
+    assert [p["name"] for p in session.program["procedures"]] == [f"P{i}" for i in range(5)]
+    assert set(session.patterns["procedures"]) == {f"P{i}" for i in range(5)}
+
+
+def test_reused_error_line_follows_edits():
+    broken = "\nPROCEDURE Roto(n)\nBEGIN\n    x <- ;\nEND\n"
+    session = AnalysisSession()
+    session.update(_proc("A") + broken)
+    assert session.errors[0]["name"] == "Roto" and session.errors[0]["line"] == 12
+
+    # Insertar dos líneas antes desplaza el error sin volver a parsear Roto.
+    session.update("\n\nClase C { a }\n" + _proc("A") + broken)
+    assert session.reparsed == 1
+    assert session.errors[0]["line"] == 15
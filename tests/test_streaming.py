@@ -0,0 +1,60 @@
+import io
+
+from analyzer.pipeline import run_pipeline
+from analyzer.streaming import analyze_stream, iter_chunks
+
+LINEAR = """
+PROCEDURE Linear(n)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        IF i > 2 THEN
+        BEGIN
+            x <- i;
+        END
+    END
+END
+"""
+
+QUADRATIC = """
+PROCEDURE Quad(n)
+BEGIN
+    FOR i <- 1 TO n DO
+    BEGIN
+        FOR j <- 1 TO n DO
+        BEGIN
+            x <- i;
+        END
+    END
+END
+"""
+
+BROKEN = """
+PROCEDURE Roto(n)
+BEGIN
+    x <- ;
+"""
+
+
+def test_chunks_split_top_level_procedures():
+    src = "Clase Nodo { a b }\n" + LINEAR + QUADRATIC
+    chunks = list(iter_chunks(src))
+    assert [(c.kind, c.name) for c in chunks] == [
+        ("classes", None), ("procedure", "Linear"), ("procedure", "Quad")]
+    assert chunks[1].start_line == 3
+
+
+def test_stream_matches_full_pipeline():
+    expected = run_pipeline(LINEAR + QUADRATIC)[2]["procedures"]
+    records = list(analyze_stream(io.StringIO(LINEAR + QUADRATIC)))
+    assert [r["name"] for r in records] == ["Linear", "Quad"]
+    for r in records:
+        assert r["ok"] and r["analysis"] == expected[r["name"]]
+
+
+def test_syntax_error_isolated_to_its_procedure():
+    # A Roto le falta el END: el PROCEDURE siguiente abre un fragmento nuevo.
+    records = list(analyze_stream(LINEAR + BROKEN + QUADRATIC))
+    assert [(r["name"], r["ok"]) for r in records] == [
+        ("Linear", True), ("Roto", False), ("Quad", True)]
+    assert records[1]["error"]["line"] == 15
@@ -0,0 +1,80 @@
+from analyzer.parser import parse_source
+from analyzer.ast_transformer import tree_to_ast
+from analyzer.static_analyzer import analyze_ast_for_patterns
+from analyzer.traversal import Detector, DetectorBus, scan_procedure
+
+SRC = """
+PROCEDURE P(n)
+BEGIN
+    int A[n];
+    FOR i <- 1 TO n DO
+    BEGIN
+        FOR j <- 1 TO i DO
+        BEGIN
+            CALL Helper(j);
+        END
+        x <- P(n - 1);
+    END
+END
+"""
+
+
+def _proc():
+    return tree_to_ast(parse_source(SRC))["procedures"][0]
+
+
+def test_scan_procedure_single_pass_results():
+    scan = scan_procedure(_proc())
+    assert [lp["nesting"] for lp in scan["loops"]] == [1, 2]
+    assert scan["max_nesting"] == 2
+    assert [(c["name"], c["nesting"], c["recursive"]) for c in scan["calls"]] == [
+        ("Helper", 2, False), ("P", 1, True)]
+    assert scan["allocations"][0]["name"] == "A"
+
+
+def test_static_analyzer_output_shape():
+    ctx = analyze_ast_for_patterns({"type": "Program", "procedures": [_proc()]})
+    info = ctx["procedures"]["P"]
+    assert len(info["recursions"]) == 1
+    assert [c["name"] for c in info["calls"]] == ["Helper"]
+    assert info["max_nesting"] == 2
+
+
+def test_custom_detector_and_deep_nesting_without_recursion():
+    class AssignCounter(Detector):
+        node_types = ("Assign",)
+        count = 0
+
+        def visit(self, node, depth):
+            self.count += 1
+
+    body = [{"type": "Assign", "target": {"type": "LValue", "name": "x"},
+             "value": {"type": "Number", "value": 1}}]
+    for _ in range(5000):
+        body = [{"type": "While", "cond": {"type": "LValue", "name": "c"}, "body": body}]
+
+    det = AssignCounter()
+    DetectorBus([det]).run(body)
+    assert det.count == 1
+    assert scan_procedure({"name": "Deep", "body": body})["max_nesting"] == 5000
+
+
+def test_free_symbols_are_exact_and_interned():
+    from analyzer.traversal import free_symbols
+
+    ast = tree_to_ast(parse_source("""
+    PROCEDURE P(A, n)
+    BEGIN
+        FOR i <- mid TO length(A) + Index DO
+        BEGIN
+            FOR j <- 1 TO A[k] DO
+            BEGIN
+                x <- 1;
+            END
+        END
+    END
+    """))
+    outer, inner = scan_procedure(ast["procedures"][0])["loops"]
+    assert outer["symbols"] == {"mid", "a", "index"}
+    assert inner["symbols"] == {"a", "k"}
+    assert free_symbols(inner["start"], inner["end"]) is inner["symbols"]